@@ -0,0 +1,345 @@
+# core/async_runtime.py
+
+"""
+asyncio runtime for live trading.
+
+Tasks on one event loop:
+    feed      native async WebSocket consumers, one per connection
+              shard: decode frames into TickRecords, hand them to the
+              strategy workers and note the latest price per instrument
+    orders    entry signals -> risk checks -> OrderDispatcher, whose
+              worker pool does the HTTP, so an order round-trip never
+              holds up decoding
+    exits     with EXIT_FIRST (default) open positions are checked inside
+              the feed task, before the frame reaches the strategy
+              workers; otherwise a task checks exits on fresh prices
+    monitor   event-loop lag and periodic stats
+
+Strategy evaluation stays on the FeedPipeline worker threads; anything
+that takes market_streamer's execution_lock (entries, exits) runs in a
+thread so a worker holding the lock never stalls the loop. SIGINT /
+SIGTERM (or request_stop()) cancel the feed, let in-flight work finish
+and close the recorder. Today's state is reloaded before the feed
+starts (market_streamer.warm_start) and snapshotted on shutdown.
+"""
+
+import asyncio
+import json
+import signal
+import time
+import uuid
+
+import requests
+from google.protobuf.message import DecodeError
+from websockets.asyncio.client import connect
+from websockets.exceptions import WebSocketException
+from upstox_client.feeder.proto import MarketDataFeedV3_pb2 as pb
+
+import core.market_streamer as ms
+from core.feed_decoder import decode_response
+from core.feed_shards import FeedShard, shard_stats, split_universe
+from core.metrics import LatencyStats
+from core.websocket_client import AUTHORIZE_URL, get_v3_authorized_url
+from strategy.feature_cache import aggregate_stats
+
+
+class AsyncTradingRuntime:
+    """
+    Runs market_streamer's pipeline on an event loop.
+    """
+
+    def __init__(
+        self,
+        instrument_keys=None,
+        mode=None,
+        connections=None,
+        authorize_url=AUTHORIZE_URL,
+        stats_interval=60,
+        lag_interval=0.1,
+        reconnect_delay=1.0,
+        max_reconnect_delay=30.0,
+        shutdown_timeout=10.0
+    ):
+        """
+        instrument_keys / mode: subscription (default: market_streamer's)
+        connections: feed sockets to split the universe over
+                     (default: market_streamer.FEED_CONNECTIONS)
+        authorize_url: feed authorization endpoint
+        stats_interval: seconds between stats prints (None = never)
+        lag_interval: event-loop lag probe period (seconds)
+        reconnect_delay / max_reconnect_delay: feed reconnect backoff
+        shutdown_timeout: max seconds to wait for workers / orders on stop
+        """
+        self.instrument_keys = list(instrument_keys or ms.INSTRUMENT_LIST)
+        self.mode = mode or ms.FEED_MODE
+        self.shards = [
+            FeedShard(i, keys)
+            for i, keys in enumerate(split_universe(
+                self.instrument_keys, connections or ms.FEED_CONNECTIONS, self.mode
+            ))
+        ]
+        self.authorize_url = authorize_url
+        self.stats_interval = stats_interval
+        self.lag_interval = lag_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.shutdown_timeout = shutdown_timeout
+
+        self.frames = 0
+        self.decode_errors = 0
+        self.frame_errors = 0
+        self.reconnects = 0
+        self.orders_sent = 0
+        self.signals_dropped = 0
+        self.loop_lag = LatencyStats()
+
+        self._loop = None
+        self._stop = None
+        self._signals = None
+        self._prices = {}
+        self._prices_ready = None
+        self._sockets = set()
+        self._stopping = False
+
+    # ---------------- feed ----------------
+
+    def _subscribe_request(self, shard):
+        return json.dumps({
+            "guid": str(uuid.uuid4()),
+            "method": "sub",
+            "data": {"mode": self.mode, "instrumentKeys": shard.keys}
+        }).encode()
+
+    def _on_frame(self, shard, frame):
+        received_at = time.perf_counter()
+        self.frames += 1
+
+        try:
+            response = pb.FeedResponse.FromString(frame)
+        except DecodeError:
+            self.decode_errors += 1
+            if ms.feed_recorder is not None:
+                ms.feed_recorder.record_raw(frame)
+            return
+
+        if ms.feed_recorder is not None:
+            ms.feed_recorder.record_raw(frame, instruments=list(response.feeds))
+
+        ticks = decode_response(response)
+        shard.record(len(ticks), response.currentTs, len(frame))
+
+        # exit-first: open positions are checked before the entry scan
+        ms.submit_ticks(ticks, received_at)
+
+        for tick in ticks:
+            self._prices[tick.inst_key] = tick.ltp
+
+        if ticks and not ms.EXIT_FIRST:
+            self._prices_ready.set()
+
+    async def _feed_task(self, shard):
+        delay = self.reconnect_delay
+
+        while not self._stopping:
+            try:
+                url = await asyncio.to_thread(get_v3_authorized_url, self.authorize_url)
+            except (requests.RequestException, ValueError) as e:
+                print(f"[AsyncRuntime] feed authorization failed: {e}")
+                url = None
+
+            if url:
+                try:
+                    async with connect(url, max_size=None, compression=None) as ws:
+                        self._sockets.add(ws)
+                        shard.on_open()
+                        try:
+                            await ws.send(self._subscribe_request(shard))
+                            print(f"[AsyncRuntime] feed {shard.index} connected, {len(shard.keys)} instruments")
+                            delay = self.reconnect_delay
+
+                            async for frame in ws:
+                                if not isinstance(frame, bytes):
+                                    continue
+                                try:
+                                    self._on_frame(shard, frame)
+                                except Exception as e:
+                                    # one bad frame must not drop the connection
+                                    self.frame_errors += 1
+                                    print(f"[AsyncRuntime] feed {shard.index} frame error: {e!r}")
+                        finally:
+                            self._sockets.discard(ws)
+                            shard.on_close()
+                except (WebSocketException, OSError) as e:
+                    print(f"[AsyncRuntime] feed {shard.index} disconnected: {e}")
+
+            if self._stopping:
+                return
+
+            self.reconnects += 1
+            print(f"[AsyncRuntime] feed {shard.index} reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    # ---------------- orders ----------------
+
+    def _submit_signal(self, signal_record):
+        """
+        market_streamer.signal_sink: called on a strategy worker thread.
+        """
+        if self._stopping:
+            self.signals_dropped += 1
+            return
+        self._loop.call_soon_threadsafe(self._signals.put_nowait, signal_record)
+
+    async def _order_task(self):
+        while True:
+            signal_record = await self._signals.get()
+            # checks under execution_lock, then queued: never waits on HTTP
+            order = await asyncio.to_thread(ms.execute_entry, signal_record, ms.trading_day())
+            if order is not None:
+                self.orders_sent += 1
+
+    # ---------------- exits ----------------
+
+    async def _exit_task(self):
+        while True:
+            await self._prices_ready.wait()
+            self._prices_ready.clear()
+
+            prices, self._prices = self._prices, {}
+            if ms.trade_monitor.active_trades:
+                await asyncio.to_thread(ms.handle_exits, prices)
+
+    # ---------------- monitoring ----------------
+
+    async def _lag_task(self):
+        while True:
+            start = self._loop.time()
+            await asyncio.sleep(self.lag_interval)
+            self.loop_lag.record(max(0.0, self._loop.time() - start - self.lag_interval))
+
+    async def _stats_task(self):
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            print(f"[AsyncRuntime] {self.stats()}")
+            print(f"[FeedShards] {shard_stats(self.shards)}")
+            print(f"[Pipeline] {ms.feed_pipeline.stats()}")
+            print(f"[FeatureCache] {aggregate_stats(list(ms.feature_caches.values()))}")
+            print(f"[Gates] {ms.strategy_pipeline.stats()}")
+            print(f"[OrderDispatcher] {ms.order_dispatcher.stats()}")
+            print(f"[TradeMonitor] {ms.trade_monitor.stats()}")
+            print(f"[ExitFirst] {ms.exit_scheduler.stats()}")
+            print(f"[TradeJournal] {ms.trade_journal.stats()}")
+            print(f"[StateJournal] {ms.state_journal.stats()}")
+            if ms.feed_recorder is not None:
+                print(f"[FeedRecorder] {ms.feed_recorder.stats()}")
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "decode_errors": self.decode_errors,
+            "frame_errors": self.frame_errors,
+            "reconnects": self.reconnects,
+            "orders_sent": self.orders_sent,
+            "signals_dropped": self.signals_dropped,
+            "loop_lag": self.loop_lag.snapshot(),
+        }
+
+    # ---------------- lifecycle ----------------
+
+    def request_stop(self):
+        """
+        Thread-safe; run() returns after a graceful shutdown.
+        """
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._signals = asyncio.Queue()
+        self._prices_ready = asyncio.Event()
+
+        ms.signal_sink = self._submit_signal
+        inline_exits, ms.INLINE_EXITS = ms.INLINE_EXITS, False
+        await asyncio.to_thread(ms.warm_start)
+        ms.feed_pipeline.start()
+        if ms.feed_recorder is not None:
+            ms.feed_recorder.start()
+            print(f"[FeedRecorder] capturing to {ms.feed_recorder.path}")
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self._loop.add_signal_handler(sig, self._stop.set)
+            except (NotImplementedError, RuntimeError):
+                # not the main thread / not supported on this platform
+                pass
+
+        feeds = [
+            asyncio.create_task(self._feed_task(shard), name=f"feed-{shard.index}")
+            for shard in self.shards
+        ]
+        others = [
+            asyncio.create_task(self._order_task(), name="orders"),
+            asyncio.create_task(self._exit_task(), name="exits"),
+            asyncio.create_task(self._lag_task(), name="loop-lag"),
+        ]
+        if self.stats_interval:
+            others.append(asyncio.create_task(self._stats_task(), name="stats"))
+
+        print("🚀 Trading system started (asyncio) — Live execution enabled.")
+        try:
+            await self._stop.wait()
+        finally:
+            await self._shutdown(feeds, others, inline_exits)
+
+    async def _shutdown(self, feeds, others, inline_exits):
+        print("[AsyncRuntime] shutting down ...")
+        self._stopping = True
+
+        # 1) no new market data: close the sockets cleanly, then the tasks
+        await asyncio.gather(*(ws.close() for ws in list(self._sockets)), return_exceptions=True)
+        for task in feeds:
+            task.cancel()
+        await asyncio.gather(*feeds, return_exceptions=True)
+
+        # 2) let the workers finish what they already have
+        idle = await asyncio.to_thread(ms.feed_pipeline.wait_idle, self.shutdown_timeout)
+        if not idle:
+            print("[AsyncRuntime] workers still busy at shutdown")
+        if hasattr(ms.feed_pipeline, "stop"):
+            await asyncio.to_thread(ms.feed_pipeline.stop)
+
+        # 3) signals that never reached the dispatcher are not sent
+        self.signals_dropped += self._signals.qsize()
+
+        # 4) orders already with the broker: wait for their outcome
+        await asyncio.to_thread(ms.order_dispatcher.wait_idle, self.shutdown_timeout)
+
+        # 5) one last exit pass on the final prices, then let the broker
+        #    legs catch up (open trades stay protected by their GTTs)
+        if self._prices and ms.trade_monitor.active_trades:
+            await asyncio.to_thread(ms.handle_exits, self._prices)
+        await asyncio.to_thread(ms.protective_orders.wait_idle, self.shutdown_timeout)
+
+        for task in others:
+            task.cancel()
+        await asyncio.gather(*others, return_exceptions=True)
+
+        if ms.feed_recorder is not None:
+            ms.feed_recorder.close()
+        ms.trade_journal.close()
+        # final snapshot: the next start needs no log replay
+        await asyncio.to_thread(ms.state_journal.close)
+
+        ms.signal_sink = None
+        ms.INLINE_EXITS = inline_exits
+        print(f"[AsyncRuntime] stopped: {self.stats()}")
+        print(f"[FeedShards] {shard_stats(self.shards)}")
+
+
+def start_async_runtime(**kwargs):
+    """
+    Blocking entry point: run until SIGINT / SIGTERM.
+    """
+    asyncio.run(AsyncTradingRuntime(**kwargs).run())
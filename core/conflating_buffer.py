@@ -0,0 +1,107 @@
+# core/conflating_buffer.py
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ConflatingBuffer:
+    """
+    Pending-work buffer that keeps only the latest snapshot per key.
+
+    - A new snapshot for a key already waiting replaces the old one
+      (the key keeps its place in line, so busy names cannot starve others).
+    - Snapshots that must all be seen (e.g. the last one of each bar)
+      need distinct keys; items under different keys never conflate.
+    - Snapshots older than max_age seconds are shed on the way out, except
+      one with a newer key of its series pending (see series): it is the
+      last snapshot of a closed bar and nothing later replaces it.
+    - Everything dropped is counted.
+    """
+
+    def __init__(self, max_age=None, max_keys=None, series=None):
+        """
+        max_age: drop snapshots that waited longer than this (seconds), None = never
+        max_keys: max distinct keys pending at once, None = unbounded
+        series: optional callable(key) -> series the key belongs to, e.g. the
+                instrument of an (instrument, bar) key; keys of a series
+                must be put in order
+        """
+        self.max_age = max_age
+        self.max_keys = max_keys
+        self.series = series
+
+        self._pending = OrderedDict()
+        # series -> number of its keys pending
+        self._series_pending = {}
+        self._cond = threading.Condition()
+
+        self.received = 0
+        self.conflated = 0
+        self.stale_dropped = 0
+        self.overflow_dropped = 0
+
+    def put(self, key, item, enqueued_at=None):
+        """
+        Returns False if the snapshot was rejected because the buffer is full.
+        """
+        if enqueued_at is None:
+            enqueued_at = time.perf_counter()
+
+        with self._cond:
+            self.received += 1
+            if key in self._pending:
+                self.conflated += 1
+            elif self.max_keys is not None and len(self._pending) >= self.max_keys:
+                self.overflow_dropped += 1
+                return False
+            elif self.series is not None:
+                series = self.series(key)
+                self._series_pending[series] = self._series_pending.get(series, 0) + 1
+
+            self._pending[key] = (enqueued_at, item)
+            self._cond.notify()
+            return True
+
+    def get(self):
+        """
+        Block until a fresh snapshot is available.
+
+        Returns:
+            (enqueued_at, item)
+        """
+        with self._cond:
+            while True:
+                while not self._pending:
+                    self._cond.wait()
+
+                key, (enqueued_at, item) = self._pending.popitem(last=False)
+
+                superseded = False
+                if self.series is not None:
+                    series = self.series(key)
+                    left = self._series_pending[series] - 1
+                    if left:
+                        self._series_pending[series] = left
+                        superseded = True
+                    else:
+                        del self._series_pending[series]
+
+                if (self.max_age is not None and not superseded
+                        and time.perf_counter() - enqueued_at > self.max_age):
+                    self.stale_dropped += 1
+                    continue
+
+                return enqueued_at, item
+
+    def qsize(self):
+        return len(self._pending)
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "received": self.received,
+            "conflated": self.conflated,
+            "stale_dropped": self.stale_dropped,
+            "overflow_dropped": self.overflow_dropped,
+        }
@@ -0,0 +1,69 @@
+# core/exit_scheduler.py
+
+"""
+Exit-first scheduling of feed frames.
+
+A frame carries updates for hundreds of instruments. Handing them all to
+the strategy workers first means a stop-loss on an open position waits
+behind the entry scan of every other instrument. The scheduler splits
+each frame instead:
+
+    1) instruments with an open position (TradeMonitor) -> exit check,
+       right here on the feed thread / event loop
+    2) the whole frame -> strategy pipeline for bar building and entries
+
+Latency from frame receipt is kept separately for the two decisions:
+    tick_to_exit    exits decided (and handed to the logger / risk)
+    tick_to_entry   entry gates evaluated after a bar close
+"""
+
+import time
+
+from core.metrics import LatencyHistogram
+
+
+class ExitFirstScheduler:
+    """
+    Runs exit checks for open positions ahead of entry scanning.
+    """
+
+    def __init__(self, trade_monitor, check_exits, pipeline):
+        """
+        trade_monitor: TradeMonitor, asked which instruments have positions
+        check_exits: callable({inst_key: ltp}) deciding / recording exits
+        pipeline: FeedPipeline or ProcessPipeline (entry scanning)
+        """
+        self.trade_monitor = trade_monitor
+        self.check_exits = check_exits
+        self.pipeline = pipeline
+
+        self.tick_to_exit = LatencyHistogram()
+        self.tick_to_entry = LatencyHistogram()
+
+    def schedule(self, ticks, received_at=None):
+        """
+        Handle one frame's TickRecords. Called from any feed thread.
+
+        received_at: time.perf_counter() when the frame arrived
+                     (default: now, i.e. after decode)
+        """
+        if received_at is None:
+            received_at = time.perf_counter()
+
+        has_position = self.trade_monitor.has_position
+        prices = {tick.inst_key: tick.ltp for tick in ticks if has_position(tick.inst_key)}
+
+        if prices:
+            self.check_exits(prices)
+            self.tick_to_exit.record(time.perf_counter() - received_at)
+
+        submit = self.pipeline.submit
+        for tick in ticks:
+            submit(tick, received_at)
+
+    def stats(self) -> dict:
+        return {
+            "open_instruments": self.trade_monitor.open_instruments(),
+            "tick_to_exit": self.tick_to_exit.snapshot(),
+            "tick_to_entry": self.tick_to_entry.snapshot(),
+        }
@@ -0,0 +1,174 @@
+# core/feed_decoder.py
+
+"""
+Direct protobuf -> tick decode for the V3 "full" feed.
+
+The SDK's MarketDataStreamerV3 turns every FeedResponse into nested dicts
+with MessageToDict (int64 fields become strings) and the pipeline then
+parses them back with float()/int(). Here the fields are read straight
+off the parsed message into one TickRecord per instrument.
+
+TickStreamerV3 is the SDK streamer with that decode in handle_message;
+it emits "ticks" (list of TickRecord, raw frame) instead of "message".
+"""
+
+import time
+
+from google.protobuf import json_format
+from upstox_client import MarketDataStreamerV3
+from upstox_client.feeder.proto import MarketDataFeedV3_pb2 as pb
+
+from core.records import TickRecord
+
+
+def decode_feed(inst_key, feed):
+    """
+    TickRecord from one pb Feed, or None if it has no full-mode data
+    or lacks the LTP / bar.
+    """
+    if not feed.HasField("fullFeed"):
+        return None
+    data = feed.fullFeed.marketFF
+
+    # Same completeness rules as normalize_full_feed on the SDK dict, where
+    # unset messages and zero scalars are simply absent
+    if not data.HasField("ltpc") or not data.ltpc.ltp:
+        return None
+    if not data.HasField("marketOHLC") or not data.marketOHLC.ohlc:
+        return None
+    ltpc = data.ltpc
+    ohlc = data.marketOHLC.ohlc
+
+    # Prefer the 1-minute candle; the list also carries the day candle
+    bar = ohlc[len(ohlc) - 1]
+    for candle in ohlc:
+        if candle.interval == "I1":
+            bar = candle
+            break
+    if not (bar.open and bar.high and bar.low and bar.close and bar.ts):
+        return None
+
+    quotes = data.marketLevel.bidAskQuote
+    if quotes:
+        top = quotes[0]
+        bid, bid_qty, ask, ask_qty = top.bidP, top.bidQ, top.askP, top.askQ
+    else:
+        bid = bid_qty = ask = ask_qty = None
+
+    return TickRecord(
+        inst_key,
+        ltpc.ltp,
+        bar.open,
+        bar.high,
+        bar.low,
+        bar.close,
+        float(bar.vol),
+        bar.ts,
+        bid,
+        bid_qty,
+        ask,
+        ask_qty,
+        ltpc.ltt
+    )
+
+
+def decode_frame(raw):
+    """
+    Raw FeedResponse bytes -> list of TickRecord.
+    """
+    return decode_response(pb.FeedResponse.FromString(raw))
+
+
+def decode_response(response):
+    """
+    Parsed FeedResponse -> list of TickRecord.
+    """
+    ticks = []
+    for inst_key, feed in response.feeds.items():
+        tick = decode_feed(inst_key, feed)
+        if tick is not None:
+            ticks.append(tick)
+    return ticks
+
+
+class TickStreamerV3(MarketDataStreamerV3):
+    """
+    MarketDataStreamerV3 that skips MessageToDict.
+
+    Events: "ticks" -> listener(ticks, raw). Listeners on "message" still
+    get the SDK's dict, at the SDK's cost.
+    """
+
+    def __init__(self, api_client=None, instrumentKeys=[], mode="full"):
+        super().__init__(api_client, instrumentKeys, mode)
+        self.listeners["ticks"] = []
+
+    def handle_message(self, ws, message):
+        self.emit("ticks", decode_frame(message), message)
+
+        if self.listeners["message"]:
+            super().handle_message(ws, message)
+
+
+# -----------------------------
+# Benchmark vs the SDK dict path
+# -----------------------------
+
+def benchmark(frames, repeat=5):
+    """
+    Decode the same raw frames through both paths.
+
+    Returns:
+        dict with per-frame / per-tick timings (us) and the speed-up
+    """
+    from core.feed_pipeline import normalize_full_feed
+
+    def dict_path(raw):
+        message = json_format.MessageToDict(pb.FeedResponse.FromString(raw))
+        ticks = []
+        for inst_key, feed_info in message.get("feeds", {}).items():
+            tick = normalize_full_feed(inst_key, feed_info)
+            if tick is not None:
+                ticks.append(tick)
+        return ticks
+
+    # both paths must agree before timing means anything
+    by_key = lambda t: t.inst_key
+    for raw in frames:
+        if sorted(dict_path(raw), key=by_key) != sorted(decode_frame(raw), key=by_key):
+            raise AssertionError("dict and protobuf decode disagree")
+
+    ticks = sum(len(decode_frame(raw)) for raw in frames)
+    timings = {}
+    for name, fn in (("dict", dict_path), ("proto", decode_frame)):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for raw in frames:
+                fn(raw)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+
+    return {
+        "frames": len(frames),
+        "ticks": ticks,
+        "dict_us_per_frame": round(timings["dict"] / len(frames) * 1e6, 2),
+        "proto_us_per_frame": round(timings["proto"] / len(frames) * 1e6, 2),
+        "dict_us_per_tick": round(timings["dict"] / ticks * 1e6, 3),
+        "proto_us_per_tick": round(timings["proto"] / ticks * 1e6, 3),
+        "speedup": round(timings["dict"] / timings["proto"], 2),
+    }
+
+
+if __name__ == "__main__":
+    import json
+    from core.mock_feed_server import SyntheticMarket
+
+    with open("data/nifty500_keys.json", "r") as f:
+        keys = json.load(f)[:480]
+
+    market = SyntheticMarket(keys, depth_levels=5, seed=7)
+    frames = [market.frame(keys[i % 24 * 20:i % 24 * 20 + 20]) for i in range(2000)]
+
+    print(f"[FeedDecoder] {benchmark(frames)}")
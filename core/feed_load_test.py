@@ -0,0 +1,214 @@
+# core/feed_load_test.py
+
+"""
+Load test of the feed client against core/mock_feed_server.py.
+
+The mock server runs in its own process (so frame generation does not
+share our GIL) and streams at a multiple of the baseline NIFTY500 rate.
+Frames go through core/websocket_client.py; with --target streamer they
+also go through market_streamer and the strategy workers, either as
+TickRecords (--decode proto) or as the SDK's message dicts (--decode dict).
+
+Usage:
+    python -m core.feed_load_test --multiplier 5 --duration 30
+    python -m core.feed_load_test --multiplier 10 --target streamer --burst open
+    python -m core.feed_load_test --multiplier 10 --target streamer --decode dict
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+import requests
+from google.protobuf import json_format
+
+import core.websocket_client as wsc
+from core.feed_decoder import decode_response
+from core.metrics import LatencyStats
+from core.mock_feed_server import BASELINE_FEEDS_PER_SEC, AUTHORIZE_PATH, STATS_PATH
+
+
+class LoadProbe:
+    """
+    Frame handler that counts feeds and measures frame lateness.
+    """
+
+    def __init__(self, late_ms=250, streamer=None, decode="proto"):
+        """
+        late_ms: frames received later than this after currentTs are late
+        streamer: optional market_streamer module to forward frames to
+        decode: "proto" (TickRecords -> on_ticks) or "dict" (SDK dicts -> on_message)
+        """
+        self.late_ms = late_ms
+        self.streamer = streamer
+        self.decode = decode
+
+        self.frames = 0
+        self.feeds = 0
+        self.late = 0
+        self.lag = LatencyStats()
+        self.convert = LatencyStats()
+        self.first_at = None
+        self.last_at = None
+
+    def __call__(self, feed_response):
+        now = time.time()
+        if self.first_at is None:
+            self.first_at = now
+        self.last_at = now
+
+        self.frames += 1
+        self.feeds += len(feed_response.feeds)
+
+        if feed_response.currentTs:
+            lag_ms = now * 1000 - feed_response.currentTs
+            self.lag.record(max(lag_ms, 0.0) / 1000)
+            if lag_ms > self.late_ms:
+                self.late += 1
+
+        if self.streamer is None:
+            return
+
+        start = time.perf_counter()
+        if self.decode == "dict":
+            # same conversion MarketDataStreamerV3 does before "message"
+            message = json_format.MessageToDict(feed_response)
+            self.convert.record(time.perf_counter() - start)
+            self.streamer.on_message(message)
+        else:
+            ticks = decode_response(feed_response)
+            self.convert.record(time.perf_counter() - start)
+            self.streamer.on_ticks(ticks)
+
+
+def start_server_process(port, args):
+    cmd = [
+        sys.executable, "-m", "core.mock_feed_server",
+        "--port", str(port),
+        "--feeds-per-sec", str(BASELINE_FEEDS_PER_SEC * args.multiplier),
+        "--feeds-per-frame", str(args.feeds_per_frame),
+        "--burst", args.burst,
+        "--depth", str(args.depth),
+        "--bar-seconds", str(args.bar_seconds),
+    ]
+    proc = subprocess.Popen(cmd)
+
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(base + STATS_PATH, timeout=0.5)
+            return proc, base
+        except requests.RequestException:
+            time.sleep(0.1)
+
+    proc.kill()
+    raise RuntimeError("Mock feed server did not start")
+
+
+def attach_streamer():
+    """
+    Wire market_streamer up for offline use and return its on_message.
+    """
+    import core.market_streamer as ms
+    from execution.fake_order_api import FakeOrderApi
+    from execution.order_executor import OrderExecutor
+    from execution.state_journal import StateJournal
+    from execution.trade_journal import TradeJournal
+    from execution.trade_logger import TradeLogger
+
+    ms.trade_journal.close()
+    ms.state_journal.close(checkpoint=False)
+
+    ms.feed_recorder = None
+    ms.order_executor = OrderExecutor(order_api=FakeOrderApi())
+    ms.protective_orders.executor = ms.order_executor
+    ms.trade_logger = TradeLogger("logs/load_test/trades.csv")
+    ms.trade_journal = TradeJournal("logs/load_test/journal", trade_log=ms.trade_logger)
+    ms.state_journal = StateJournal(enabled=False)
+    ms.feed_pipeline.start()
+    return ms
+
+
+def run_load_test(args):
+    with open("data/nifty500_keys.json", "r") as f:
+        keys = json.load(f)[:args.instruments]
+
+    proc, base = start_server_process(args.port, args)
+    ms = attach_streamer() if args.target == "streamer" else None
+    probe = LoadProbe(late_ms=args.late_ms, streamer=ms, decode=args.decode)
+
+    try:
+        ws = wsc.start_market_feed(
+            instrument_keys=keys,
+            mode="full",
+            authorize_url=base + AUTHORIZE_PATH,
+            handler=probe
+        )
+        if ws is None:
+            raise RuntimeError("Could not connect to mock feed")
+
+        time.sleep(args.duration)
+        ws.close()
+        time.sleep(0.5)
+
+        server = requests.get(base + STATS_PATH, timeout=2).json()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=5)
+
+    if ms is not None:
+        ms.feed_pipeline.wait_idle(timeout=10)
+        ms.trade_journal.close()
+
+    span = (probe.last_at - probe.first_at) if probe.frames > 1 else 0.0
+    report = {
+        "target": args.target,
+        "instruments": len(keys),
+        "offered_feeds_per_sec": BASELINE_FEEDS_PER_SEC * args.multiplier,
+        "burst": args.burst,
+        "frames_sent": server["frames_sent"],
+        "frames_received": wsc.frames_received,
+        # includes frames still in flight when the socket closed
+        "frames_dropped": server["frames_sent"] - wsc.frames_received,
+        "decode_errors": wsc.decode_errors,
+        "ingest_frames_per_sec": round(probe.frames / span, 1) if span else None,
+        "ingest_feeds_per_sec": round(probe.feeds / span, 1) if span else None,
+        "late_frames": probe.late,
+        "lag": probe.lag.snapshot(),
+        "decode": wsc.decode_stats.snapshot(),
+        "server": server,
+    }
+    if ms is not None:
+        report["decode_mode"] = args.decode
+        report["convert"] = probe.convert.snapshot()
+        report["pipeline"] = ms.feed_pipeline.stats()
+        report["journal"] = ms.trade_journal.stats()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feed client load test against the mock server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--instruments", type=int, default=480)
+    parser.add_argument("--multiplier", type=float, default=2.0, help="x baseline NIFTY500 rate")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds")
+    parser.add_argument("--feeds-per-frame", type=int, default=20)
+    parser.add_argument("--burst", default="steady", choices=["steady", "burst", "open"])
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--bar-seconds", type=float, default=60)
+    parser.add_argument("--late-ms", type=float, default=250)
+    parser.add_argument("--target", default="client", choices=["client", "streamer"])
+    parser.add_argument("--decode", default="proto", choices=["proto", "dict"])
+    args = parser.parse_args()
+
+    report = run_load_test(args)
+
+    print("\n[LoadTest] report")
+    for key, value in report.items():
+        print(f"  {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# core/feed_pipeline.py
+
+"""
+Ingestion stage for the market data feed.
+
+The SDK callback thread only normalizes each instrument's feed into a
+small TickRecord and hands it to a shard buffer. Worker threads drain the
+buffers and run the strategy. Every instrument is pinned to one shard, so
+ticks of the same instrument are always processed in order by the same
+worker.
+
+Shard buffers conflate: if the strategy lags, only the newest pending
+snapshot per instrument and bar is evaluated and snapshots older than
+max_age are shed, so the system catches up instead of trading on old
+prices. Neither crosses a bar rollover: the last update of the closing
+minute is still handed to the strategy, ahead of the new one, however
+long it waited.
+"""
+
+import threading
+import time
+import zlib
+
+from core.conflating_buffer import ConflatingBuffer
+from core.records import TickRecord
+from core.metrics import LatencyStats
+
+
+def normalize_full_feed(inst_key, feed_info):
+    """
+    Pull LTP, the forming 1-min OHLC + volume and top of book out of a
+    "full" mode feed dict (the SDK's MessageToDict output).
+
+    Returns:
+        TickRecord or None if incomplete. bar_ts is the bar start in epoch ms.
+    """
+    data = feed_info.get("fullFeed", {}).get("marketFF", {})
+
+    try:
+        ltpc = data["ltpc"]
+        ltp = float(ltpc["ltp"])
+    except Exception:
+        return None
+
+    ohlc = data.get("marketOHLC", {}).get("ohlc", [])
+    if not ohlc:
+        return None
+
+    # Prefer the 1-minute candle; the list also carries the day candle
+    bar = ohlc[-1]
+    for candle in ohlc:
+        if candle.get("interval") == "I1":
+            bar = candle
+            break
+
+    try:
+        open_ = float(bar.get("open"))
+        high = float(bar.get("high"))
+        low = float(bar.get("low"))
+        close = float(bar.get("close"))
+        # MessageToDict drops zero fields, e.g. volume at the start of a bar
+        volume = float(bar.get("vol", 0))
+        bar_ts = int(bar.get("ts"))
+    except Exception:
+        return None
+
+    quotes = data.get("marketLevel", {}).get("bidAskQuote", [])
+    if quotes:
+        top = quotes[0]
+        bid, bid_qty = float(top.get("bidP", 0)), int(top.get("bidQ", 0))
+        ask, ask_qty = float(top.get("askP", 0)), int(top.get("askQ", 0))
+    else:
+        bid = bid_qty = ask = ask_qty = None
+
+    return TickRecord(
+        inst_key, ltp, open_, high, low, close, volume, bar_ts,
+        bid, bid_qty, ask, ask_qty, int(ltpc.get("ltt", 0))
+    )
+
+
+def _instrument(key):
+    # buffer keys are (inst_key, bar_ts)
+    return key[0]
+
+
+class FeedPipeline:
+    """
+    Bounded, sharded hand-off between feed ingestion and strategy workers.
+    """
+
+    def __init__(self, handler, num_shards=4, queue_size=2000, max_age=None):
+        """
+        handler: callable(tick) run on a worker thread for each tick
+        num_shards: number of worker threads / buffers
+        queue_size: max (instrument, bar) snapshots pending per shard
+        max_age: shed ticks that waited longer than this (seconds), unless
+                 a newer bar of the instrument is pending
+        """
+        self.handler = handler
+        self.num_shards = num_shards
+        self.queues = [
+            ConflatingBuffer(max_age=max_age, max_keys=queue_size, series=_instrument)
+            for _ in range(num_shards)
+        ]
+        self.workers = []
+
+        # per-shard counters are only touched by their own worker;
+        # submissions are counted by the buffers (any number of feed threads)
+        self._processed = [0] * num_shards
+        self._errors = [0] * num_shards
+        self.dwell = LatencyStats()
+        self.end_to_end = LatencyStats()
+
+        # enqueue time of the tick each worker is handling (tick_age)
+        self._local = threading.local()
+
+    def shard_for(self, inst_key):
+        # crc32 is stable across runs (unlike hash())
+        return zlib.crc32(inst_key.encode()) % self.num_shards
+
+    def start(self):
+        for shard_id in range(self.num_shards):
+            t = threading.Thread(
+                target=self._worker_loop,
+                args=(shard_id,),
+                name=f"feed-worker-{shard_id}",
+                daemon=True
+            )
+            t.start()
+            self.workers.append(t)
+
+    @property
+    def enqueued(self):
+        return sum(q.received for q in self.queues)
+
+    def submit(self, tick, received_at=None):
+        """
+        Called from the feed callback. Never blocks: a pending tick for the
+        same instrument and bar is replaced, and if the shard is full the
+        tick is dropped and counted.
+
+        received_at: time.perf_counter() the frame arrived (default: now);
+                     dwell and end-to-end are measured from it
+        """
+        inst_key = tick.inst_key
+        q = self.queues[self.shard_for(inst_key)]
+        # keyed per bar: a tick of the next minute queues behind the
+        # closing minute's last snapshot instead of replacing it
+        return q.put((inst_key, tick.bar_ts), tick, received_at or time.perf_counter())
+
+    def _worker_loop(self, shard_id):
+        q = self.queues[shard_id]
+        while True:
+            enqueued_at, tick = q.get()
+            self.dwell.record(time.perf_counter() - enqueued_at)
+            self._local.enqueued_at = enqueued_at
+
+            try:
+                self.handler(tick)
+            except Exception as e:
+                self._errors[shard_id] += 1
+                print(f"[FeedPipeline] Error processing {tick.inst_key}: {e}")
+
+            self.end_to_end.record(time.perf_counter() - enqueued_at)
+            self._processed[shard_id] += 1
+
+    def tick_age(self):
+        """
+        Seconds since the tick being handled was received
+        (call from the handler, on the worker thread).
+        """
+        return time.perf_counter() - self._local.enqueued_at
+
+    def wait_idle(self, timeout=None, poll=0.005):
+        """
+        Block until every submitted tick has been processed or dropped.
+
+        Returns:
+            True if idle, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            dropped = sum(q.conflated + q.stale_dropped + q.overflow_dropped for q in self.queues)
+            if sum(self._processed) + dropped >= self.enqueued:
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(poll)
+
+    def queue_depths(self):
+        return [q.qsize() for q in self.queues]
+
+    def stats(self) -> dict:
+        """
+        Snapshot of queue depth and dwell time, to spot when
+        the strategy falls behind the market.
+        """
+        depths = self.queue_depths()
+        return {
+            "queue_depth": sum(depths),
+            "shard_depths": depths,
+            "enqueued": self.enqueued,
+            "processed": sum(self._processed),
+            "conflated": sum(q.conflated for q in self.queues),
+            "stale_dropped": sum(q.stale_dropped for q in self.queues),
+            "overflow_dropped": sum(q.overflow_dropped for q in self.queues),
+            "errors": sum(self._errors),
+            "dwell": self.dwell.snapshot(),
+            "end_to_end": self.end_to_end.snapshot(),
+        }
@@ -0,0 +1,346 @@
+# core/feed_recorder.py
+
+"""
+Append-only capture of the market data feed.
+
+Layout of one capture session directory:
+
+    instruments.txt      instrument key per line (line number = id)
+    seg-00000.dat        records: header (recv_ns, kind, length) + payload
+    seg-00000.idx        index: (recv_ns, offset, instrument_id) per
+                         instrument per record, sorted by recv_ns
+
+Payloads are either raw protobuf frames (KIND_RAW, from
+core/websocket_client.py) or the SDK's decoded message dict as JSON
+(KIND_MESSAGE, from core/market_streamer.py). Raw frames are indexed
+under the instruments the caller decoded from them; a frame recorded
+without them (e.g. undecodable) is indexed under ALL_INSTRUMENTS.
+
+The feed threads only enqueue; a background thread does all encoding
+and file I/O. Receive times are stamped as records are enqueued, so
+with several feed connections the log stays in recv_ns order.
+FeedReader memory-maps segments for fast scans.
+"""
+
+import datetime
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+KIND_RAW = 1
+KIND_MESSAGE = 2
+
+ALL_INSTRUMENTS = 0xFFFFFFFF
+
+RECORD_HEADER = struct.Struct("<qBI")     # recv_ns, kind, payload length
+INDEX_ENTRY = struct.Struct("<qQI")       # recv_ns, record offset, instrument id
+INDEX_DTYPE = np.dtype([("ts", "<i8"), ("offset", "<u8"), ("inst", "<u4")])
+
+
+def _segment_name(n, ext):
+    return f"seg-{n:05d}.{ext}"
+
+
+class FeedRecorder:
+    """
+    Non-blocking recorder: record_*() enqueue, a writer thread persists.
+    """
+
+    def __init__(self, directory="data/captures", session=None,
+                 segment_bytes=64 * 1024 * 1024, queue_size=100000,
+                 flush_interval=1.0):
+        """
+        directory: root for capture sessions
+        session: session folder name (default: today's date + start time)
+        segment_bytes: roll to a new segment after this many bytes
+        queue_size: max pending records before new ones are dropped
+        flush_interval: max seconds between file flushes
+        """
+        if session is None:
+            session = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+
+        self.path = os.path.join(directory, session)
+
+        self.segment_bytes = segment_bytes
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+
+        # stamping and enqueueing happen together, so the queue (and the
+        # files) are in recv_ns order whichever connection a frame came on
+        self._put_lock = threading.Lock()
+
+        self.recorded = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self.out_of_order = 0
+
+        # writer-thread state
+        self._instrument_ids = {}
+        self._segment = -1
+        self._dat = None
+        self._idx = None
+        self._offset = 0
+        self._inst_file = None
+        self._last_ns = None
+
+    # ---------------- feed side ----------------
+
+    def record_raw(self, frame: bytes, recv_ns=None, instruments=None):
+        """
+        instruments: keys of the feeds in the frame (from the decoder);
+                     None = index under ALL_INSTRUMENTS
+        """
+        self._put(KIND_RAW, frame, recv_ns, instruments)
+
+    def record_message(self, message: dict, recv_ns=None):
+        self._put(KIND_MESSAGE, message, recv_ns, None)
+
+    def _put(self, kind, payload, recv_ns, instruments):
+        with self._put_lock:
+            if recv_ns is None:
+                recv_ns = time.time_ns()
+            try:
+                self._queue.put_nowait((recv_ns, kind, payload, instruments))
+            except queue.Full:
+                self.dropped += 1
+
+    # ---------------- writer side ----------------
+
+    def start(self):
+        os.makedirs(self.path, exist_ok=True)
+        self._inst_file = open(os.path.join(self.path, "instruments.txt"), "a")
+        self._thread = threading.Thread(target=self._writer_loop, name="feed-recorder", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """
+        Drain pending records and close files.
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            self._close_segment()
+            self._inst_file.close()
+
+    def _writer_loop(self):
+        last_flush = time.monotonic()
+
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = False
+
+            if item is None:
+                break
+
+            if item:
+                self._write(*item)
+
+            if time.monotonic() - last_flush >= self.flush_interval:
+                self._flush()
+                last_flush = time.monotonic()
+
+        self._flush()
+
+    def _write(self, recv_ns, kind, payload, instruments):
+        if kind == KIND_MESSAGE:
+            instruments = list(payload.get("feeds", {}).keys())
+            payload = json.dumps(payload, separators=(",", ":")).encode()
+
+        # only a caller-supplied recv_ns can go backwards: index it at the
+        # last time written so the reader's binary search stays valid
+        # (the record header keeps the original)
+        index_ns = recv_ns
+        if self._last_ns is not None and recv_ns < self._last_ns:
+            self.out_of_order += 1
+            index_ns = self._last_ns
+        self._last_ns = index_ns
+
+        if self._dat is None or self._offset >= self.segment_bytes:
+            self._open_next_segment()
+
+        offset = self._offset
+        self._dat.write(RECORD_HEADER.pack(recv_ns, kind, len(payload)))
+        self._dat.write(payload)
+        self._offset += RECORD_HEADER.size + len(payload)
+
+        if instruments is None:
+            self._idx.write(INDEX_ENTRY.pack(index_ns, offset, ALL_INSTRUMENTS))
+        else:
+            for inst_key in instruments:
+                self._idx.write(INDEX_ENTRY.pack(index_ns, offset, self._instrument_id(inst_key)))
+
+        self.recorded += 1
+        self.bytes_written += RECORD_HEADER.size + len(payload)
+
+    def _instrument_id(self, inst_key):
+        inst_id = self._instrument_ids.get(inst_key)
+        if inst_id is None:
+            inst_id = len(self._instrument_ids)
+            self._instrument_ids[inst_key] = inst_id
+            self._inst_file.write(inst_key + "\n")
+        return inst_id
+
+    def _open_next_segment(self):
+        self._close_segment()
+        self._segment += 1
+        self._dat = open(os.path.join(self.path, _segment_name(self._segment, "dat")), "ab")
+        self._idx = open(os.path.join(self.path, _segment_name(self._segment, "idx")), "ab")
+        self._offset = self._dat.tell()
+
+    def _close_segment(self):
+        if self._dat is not None:
+            self._flush()
+            self._dat.close()
+            self._idx.close()
+            self._dat = self._idx = None
+
+    def _flush(self):
+        # data before index, so an index entry never points past the data
+        if self._dat is not None:
+            self._dat.flush()
+            self._idx.flush()
+        self._inst_file.flush()
+
+    def stats(self) -> dict:
+        return {
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "pending": self._queue.qsize(),
+            "bytes_written": self.bytes_written,
+            "out_of_order": self.out_of_order,
+            "segments": self._segment + 1,
+        }
+
+
+class FeedReader:
+    """
+    Memory-mapped reader for one capture session.
+
+    Use as a context manager (or call close()) to release the
+    segment maps of reads that were not run to the end.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._maps = set()
+
+        with open(os.path.join(path, "instruments.txt")) as f:
+            self.instruments = [line.rstrip("\n") for line in f]
+        self.instrument_ids = {k: i for i, k in enumerate(self.instruments)}
+
+        self.segments = []
+        n = 0
+        while os.path.exists(os.path.join(path, _segment_name(n, "dat"))):
+            self.segments.append(n)
+            n += 1
+
+    def _open_segment(self, n):
+        """
+        Returns:
+            (data mmap, index array) or None for an empty segment
+        """
+        dat_path = os.path.join(self.path, _segment_name(n, "dat"))
+        idx_path = os.path.join(self.path, _segment_name(n, "idx"))
+        if os.path.getsize(dat_path) == 0 or os.path.getsize(idx_path) == 0:
+            return None
+
+        with open(dat_path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.add(data)
+
+        # ignore a torn trailing entry from a crash mid-write; the index is
+        # small next to the data, so it is read in rather than mapped
+        count = os.path.getsize(idx_path) // INDEX_DTYPE.itemsize
+        index = np.fromfile(idx_path, dtype=INDEX_DTYPE, count=count)
+        return data, index
+
+    def _close_map(self, data):
+        self._maps.discard(data)
+        data.close()
+
+    def close(self):
+        """
+        Unmap every segment still open.
+        """
+        for data in list(self._maps):
+            self._close_map(data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def read(self, start_ns=None, end_ns=None, instrument=None):
+        """
+        Yield (recv_ns, kind, payload) in receive order.
+
+        start_ns / end_ns: optional receive-time window (epoch ns, end exclusive)
+        instrument: only records containing this key (raw frames recorded
+                    without their instruments always match); decoded
+                    messages are narrowed to that key's feed
+
+        payload is bytes for KIND_RAW and a dict for KIND_MESSAGE.
+        """
+        inst_id = None
+        if instrument is not None:
+            inst_id = self.instrument_ids.get(instrument)
+            if inst_id is None:
+                return
+
+        for n in self.segments:
+            opened = self._open_segment(n)
+            if opened is None:
+                continue
+            data, index = opened
+            try:
+                yield from self._read_segment(data, index, start_ns, end_ns, instrument, inst_id)
+            finally:
+                self._close_map(data)
+
+    def _read_segment(self, data, index, start_ns, end_ns, instrument, inst_id):
+        lo = 0 if start_ns is None else int(np.searchsorted(index["ts"], start_ns, side="left"))
+        hi = len(index) if end_ns is None else int(np.searchsorted(index["ts"], end_ns, side="left"))
+        entries = index[lo:hi]
+
+        if inst_id is not None:
+            entries = entries[(entries["inst"] == inst_id) | (entries["inst"] == ALL_INSTRUMENTS)]
+
+        last_offset = None
+        for offset in entries["offset"]:
+            offset = int(offset)
+            if offset == last_offset:
+                continue
+            last_offset = offset
+
+            recv_ns, kind, length = RECORD_HEADER.unpack_from(data, offset)
+            start = offset + RECORD_HEADER.size
+            if start + length > len(data):
+                break
+
+            payload = data[start:start + length]
+            if kind == KIND_MESSAGE:
+                payload = json.loads(payload)
+                if instrument is not None:
+                    feeds = payload.get("feeds", {})
+                    payload["feeds"] = {instrument: feeds[instrument]} if instrument in feeds else {}
+
+            yield recv_ns, kind, payload
+
+    def messages(self, **kwargs):
+        """
+        Decoded message dicts only, with their receive time.
+        """
+        for recv_ns, kind, payload in self.read(**kwargs):
+            if kind == KIND_MESSAGE:
+                yield recv_ns, payload
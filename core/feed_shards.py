@@ -0,0 +1,146 @@
+# core/feed_shards.py
+
+"""
+Split the instrument universe across several feed connections.
+
+Each shard is its own WebSocket with its own decode thread (the SDK's
+socket thread, or a task in core/async_runtime.py); all shards submit
+into the same FeedPipeline, so strategy and execution see one stream.
+A dropped connection only stalls its own slice of the universe, and the
+universe can grow past one connection's subscription limit.
+"""
+
+import math
+import time
+
+from upstox_client.feeder.proto import MarketDataFeedV3_pb2 as pb
+
+from core.feed_decoder import TickStreamerV3, decode_response
+from core.metrics import LatencyStats
+
+# Per-connection subscription limits by mode (Upstox V3 feed)
+MAX_KEYS_PER_CONNECTION = {
+    "ltpc": 5000,
+    "option_greeks": 3000,
+    "full": 2000,
+    "full_d30": 50,
+}
+
+
+def split_universe(keys, connections=1, mode="full", max_per_connection=None):
+    """
+    Split keys into per-connection lists.
+
+    connections: requested number of connections; raised if the
+                 mode's per-connection limit needs more
+    max_per_connection: override MAX_KEYS_PER_CONNECTION[mode]
+
+    Keys are dealt round-robin, so shards stay balanced however the
+    universe file happens to be ordered.
+    """
+    keys = list(keys)
+    limit = max_per_connection or MAX_KEYS_PER_CONNECTION.get(mode)
+
+    n = connections
+    if limit:
+        n = max(n, math.ceil(len(keys) / limit))
+    n = max(1, min(n, len(keys)))
+
+    return [keys[i::n] for i in range(n)]
+
+
+class FeedShard:
+    """
+    One connection's slice of the universe and its health counters.
+    Counters are only written by the shard's own decode thread.
+    """
+
+    def __init__(self, index, keys):
+        self.index = index
+        self.keys = keys
+
+        self.frames = 0
+        self.ticks = 0
+        self.bytes = 0
+        self.connects = 0
+        self.disconnects = 0
+        self.connected = False
+        self.last_frame_at = None
+
+        # exchange timestamp (currentTs) -> receipt
+        self.lag = LatencyStats()
+
+        self._mark = (time.monotonic(), 0, 0)
+
+    def record(self, ticks, current_ts_ms=0, nbytes=0):
+        now = time.time()
+        self.frames += 1
+        self.ticks += ticks
+        self.bytes += nbytes
+        self.last_frame_at = now
+        if current_ts_ms:
+            self.lag.record(max(now * 1000 - current_ts_ms, 0.0) / 1000)
+
+    def on_open(self, *args):
+        self.connects += 1
+        self.connected = True
+
+    def on_close(self, *args):
+        self.disconnects += 1
+        self.connected = False
+
+    def stats(self) -> dict:
+        """
+        Rates are since the previous stats() call.
+        """
+        now = time.monotonic()
+        then, frames, ticks = self._mark
+        self._mark = (now, self.frames, self.ticks)
+        span = now - then
+
+        return {
+            "shard": self.index,
+            "instruments": len(self.keys),
+            "connected": self.connected,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "frames": self.frames,
+            "ticks": self.ticks,
+            "frames_per_sec": round((self.frames - frames) / span, 1) if span else None,
+            "ticks_per_sec": round((self.ticks - ticks) / span, 1) if span else None,
+            "last_frame_age_sec": round(time.time() - self.last_frame_at, 2) if self.last_frame_at else None,
+            "lag": self.lag.snapshot(),
+        }
+
+
+class ShardStreamerV3(TickStreamerV3):
+    """
+    TickStreamerV3 for one shard: also records the shard's frame rate
+    and exchange-to-receipt lag.
+    """
+
+    def __init__(self, shard, api_client=None, mode="full"):
+        super().__init__(api_client, shard.keys, mode)
+        self.shard = shard
+        self.on("open", shard.on_open)
+        self.on("close", shard.on_close)
+
+    def handle_message(self, ws, message):
+        response = pb.FeedResponse.FromString(message)
+        ticks = decode_response(response)
+        self.shard.record(len(ticks), response.currentTs, len(message))
+        self.emit("ticks", ticks, message)
+
+
+def shard_stats(shards) -> dict:
+    """
+    Totals plus one entry per shard.
+    """
+    per_shard = [s.stats() for s in shards]
+    return {
+        "connections": len(shards),
+        "connected": sum(1 for s in shards if s.connected),
+        "frames": sum(s["frames"] for s in per_shard),
+        "ticks_per_sec": round(sum(s["ticks_per_sec"] or 0 for s in per_shard), 1),
+        "shards": per_shard,
+    }
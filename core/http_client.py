@@ -0,0 +1,311 @@
+# core/http_client.py
+
+"""
+Shared REST client for the Upstox HTTP APIs.
+
+One requests.Session with a pooled HTTPAdapter, so calls reuse
+keep-alive connections instead of paying a TCP + TLS handshake each
+time. On top of that:
+    - per-endpoint (connect, read) timeouts
+    - jittered exponential retry for idempotent calls only
+      (connection errors, timeouts, 429 / 5xx)
+    - token-bucket rate limiting per API category
+    - connection reuse and per-endpoint latency metrics
+
+Used by core/rest_api.py (profile, historical candles, order status)
+and by feed authorization in core/websocket_client.py.
+"""
+
+import random
+import threading
+import time
+
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import ACCESS_TOKEN, API_BASE_URL
+from core.metrics import LatencyStats
+
+# (connect, read) timeouts in seconds by endpoint prefix; longest match wins
+ENDPOINT_TIMEOUTS = {
+    "": (3.05, 10),
+    "feed/": (3.05, 5),
+    "historical-candle/": (3.05, 20),
+    "order/": (3.05, 5),
+}
+
+# Broker limits per category: list of (requests, period seconds)
+RATE_LIMITS = {
+    "standard": [(50, 1.0), (500, 60.0), (2000, 1800.0)],
+    "order": [(10, 1.0), (250, 60.0)],
+}
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+
+class RateLimitExceeded(requests.RequestException):
+    """
+    Raised when a call would have to wait longer than max_wait for a token.
+    """
+
+
+class TokenBucket:
+    """
+    `capacity` requests per `period` seconds, refilled continuously.
+    """
+
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def reserve(self, now):
+        """
+        Take one token. Returns seconds to wait before it is valid
+        (the balance may go negative; later callers queue behind).
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self):
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class RateLimiter:
+    """
+    All of a category's buckets must have a token for a call to go out.
+    """
+
+    def __init__(self, limits):
+        self.buckets = [TokenBucket(n, period) for n, period in limits]
+        self._lock = threading.Lock()
+
+    def acquire(self, max_wait=None):
+        """
+        Block until the call may go out.
+
+        Returns:
+            seconds waited
+
+        Raises:
+            RateLimitExceeded if the wait would exceed max_wait
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(bucket.reserve(now) for bucket in self.buckets)
+            if max_wait is not None and wait > max_wait:
+                for bucket in self.buckets:
+                    bucket.refund()
+                raise RateLimitExceeded(f"rate limited for {wait:.2f}s")
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.latency = LatencyStats()
+        self.calls = 0
+        self.retries = 0
+        self.errors = 0
+
+    def snapshot(self) -> dict:
+        snap = self.latency.snapshot()
+        snap.update(calls=self.calls, retries=self.retries, errors=self.errors)
+        return snap
+
+
+class RestClient:
+    """
+    Pooled, rate-limited, retrying HTTP client.
+    """
+
+    def __init__(
+        self,
+        base_url=API_BASE_URL,
+        access_token=ACCESS_TOKEN,
+        pool_size=10,
+        timeouts=ENDPOINT_TIMEOUTS,
+        rate_limits=RATE_LIMITS,
+        max_retries=3,
+        backoff=0.2,
+        max_backoff=5.0,
+        max_rate_wait=10.0
+    ):
+        """
+        base_url: prefix for relative endpoints
+        pool_size: keep-alive connections kept per host
+        timeouts: endpoint prefix -> (connect, read) seconds
+        rate_limits: category -> [(requests, period), ...]
+        max_retries: retries for idempotent calls (0 = none)
+        backoff / max_backoff: retry n sleeps uniform(0, min(max, backoff * 2**n))
+        max_rate_wait: longest a call may queue for a rate token (seconds)
+        """
+        self.base_url = base_url
+        self.timeouts = timeouts
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_rate_wait = max_rate_wait
+
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.session.headers.update({"Accept": "application/json"})
+        if access_token:
+            self.session.headers["Authorization"] = f"Bearer {access_token}"
+
+        self.limiters = {name: RateLimiter(limits) for name, limits in rate_limits.items()}
+
+        self.endpoints = {}
+        self.rate_waits = LatencyStats()
+        self._lock = threading.Lock()
+
+    # ---------------- request ----------------
+
+    def _url(self, endpoint):
+        if endpoint.startswith(("http://", "https://")):
+            return endpoint
+        return self.base_url + endpoint
+
+    def _timeout(self, endpoint):
+        path = endpoint.split("/v2/", 1)[-1].split("/v3/", 1)[-1]
+        best = ""
+        for prefix in self.timeouts:
+            if path.startswith(prefix) and len(prefix) > len(best):
+                best = prefix
+        return self.timeouts[best]
+
+    def _metrics(self, name):
+        metrics = self.endpoints.get(name)
+        if metrics is None:
+            with self._lock:
+                metrics = self.endpoints.setdefault(name, EndpointMetrics())
+        return metrics
+
+    def request(
+        self,
+        method,
+        endpoint,
+        params=None,
+        json=None,
+        timeout=None,
+        idempotent=None,
+        category="standard",
+        name=None
+    ):
+        """
+        One API call through the pool.
+
+        endpoint: path relative to base_url, or an absolute URL
+        timeout: override the endpoint's (connect, read) timeout
+        idempotent: allow retries (default: by HTTP method)
+        category: rate-limit bucket ("standard", "order")
+        name: metrics key (default: "METHOD path"; pass one for paths
+              that embed ids, e.g. historical candles)
+
+        Returns:
+            requests.Response (any status once retries are used up)
+
+        Raises:
+            requests.RequestException on connection failure / timeout
+            after the last attempt, or RateLimitExceeded
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        retries = self.max_retries if idempotent else 0
+        timeout = timeout or self._timeout(endpoint)
+        metrics = self._metrics(name or f"{method} {urlsplit(endpoint).path}")
+        limiter = self.limiters.get(category)
+        url = self._url(endpoint)
+
+        attempt = 0
+        while True:
+            if limiter is not None:
+                self.rate_waits.record(limiter.acquire(self.max_rate_wait))
+
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, params=params, json=json, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                metrics.calls += 1
+                if attempt >= retries:
+                    metrics.errors += 1
+                    raise
+                response = None
+            else:
+                metrics.calls += 1
+                metrics.latency.record(time.perf_counter() - start)
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    if response.status_code >= 400:
+                        metrics.errors += 1
+                    return response
+
+            metrics.retries += 1
+            time.sleep(self._retry_delay(attempt, response))
+            attempt += 1
+
+    def _retry_delay(self, attempt, response):
+        # honour the broker's Retry-After on 429 / 503
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.max_backoff)
+                except ValueError:
+                    pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def get(self, endpoint, **kwargs):
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint, **kwargs):
+        return self.request("POST", endpoint, **kwargs)
+
+    # ---------------- metrics ----------------
+
+    def pool_stats(self) -> dict:
+        """
+        Connections opened vs requests sent, over every host pool.
+        """
+        opened = sent = 0
+        for pool in list(self.adapter.poolmanager.pools._container.values()):
+            opened += pool.num_connections
+            sent += pool.num_requests
+        return {
+            "connections_opened": opened,
+            "requests_sent": sent,
+            "connection_reuse": round(1 - opened / sent, 3) if sent else None,
+        }
+
+    def stats(self) -> dict:
+        stats = self.pool_stats()
+        stats["rate_wait"] = self.rate_waits.snapshot()
+        stats["endpoints"] = {name: m.snapshot() for name, m in list(self.endpoints.items())}
+        return stats
+
+    def close(self):
+        self.session.close()
+
+
+# Process-wide client, created on first use
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = RestClient()
+    return _client
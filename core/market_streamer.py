@@ -1,211 +1,697 @@
 # core/market_streamer.py
 
+import copy
 import json
+import time
 import datetime
+import threading
 import upstox_client
 from config.settings import ACCESS_TOKEN
 from execution.trade_logger import TradeLogger
+from execution.trade_journal import TradeJournal
+from core.feed_pipeline import FeedPipeline, normalize_full_feed
+from core.feed_recorder import FeedRecorder
+from core.feed_shards import FeedShard, ShardStreamerV3, split_universe
+from core.exit_scheduler import ExitFirstScheduler
+from core.strategy_workers import ProcessPipeline
+from core.records import SignalRecord
 
 # Scanner + Strategy Modules
-from strategy.scanner import MarketScanner
-from strategy.market_regime import detect_market_regime
-from strategy.htf_bias import get_htf_bias
-from strategy.breakout_detector import breakout_signal_confirmed
+from strategy.scanner import FIELDS, MarketScanner
+from strategy.bar_builder import BarBuilder
 from strategy.vwap_filter import VWAPCalculator
-from strategy.decision_engine import final_trade_decision
+from strategy.streaming_indicators import InstrumentIndicators
+from strategy.volatility_engine import VolatilityEngine
+from strategy.rolling_extrema import InstrumentRanges
+from strategy.feature_cache import FeatureCache
+from strategy.gate_pipeline import GatePipeline
 
 # Execution modules
 from execution.order_executor import OrderExecutor
+from execution.order_dispatcher import OrderDispatcher
+from execution.protective_orders import ProtectiveOrderManager
+from execution.execution_config import PROTECTIVE_ORDERS
 from execution.trade_monitor import TradeMonitor
 from execution.risk_manager import RiskManager
+from execution.state_journal import StateJournal
 
 # ---------------- CONFIG ----------------
 
 FEED_MODE = "full"
 
+# "proto": decode frames straight into TickRecords (TickStreamerV3)
+# "dict": SDK MessageToDict + normalize_full_feed
+DECODE_MODE = "proto"
+
+# Feed WebSocket connections; the universe is split across them
+# (raised automatically if one connection's key limit is exceeded)
+FEED_CONNECTIONS = 2
+
+# "threads": strategy on FeedPipeline worker threads (one GIL)
+# "processes": universe partitioned across worker processes
+#              (core/strategy_workers.py); orders / exits stay here
+WORKER_MODE = "threads"
+
+# Strategy worker threads / processes (each instrument is pinned to one)
+WORKER_SHARDS = 4
+
+# Max instruments pending per worker before new ticks are dropped
+SHARD_QUEUE_SIZE = 2000
+
+# Ticks that waited longer than this are shed (seconds)
+MAX_TICK_AGE_SEC = 2.0
+
+# Concurrent order round-trips (the feed never waits on HTTP)
+ORDER_WORKERS = 4
+
+# Entry signals older than this when an order worker frees up are not sent
+MAX_SIGNAL_AGE_SEC = 2.0
+
+# Check exits for open positions on ingest, before the frame goes to the
+# strategy workers (ExitFirstScheduler); False = exits on the workers
+EXIT_FIRST = True
+
+# Capture every feed frame / message for later replay / analysis
+RECORD_FEED = True
+CAPTURE_DIR = "data/captures"
+
+# Entries / exits / rejected signals, daily partitions ("csv" / "parquet")
+JOURNAL_DIR = "logs/journal"
+JOURNAL_FORMAT = "csv"
+JOURNAL_FLUSH_SEC = 1.0
+
+# Crash-safe state (signals, halts, open trades, risk counters, GTT legs)
+# in a write-ahead log, plus periodic snapshots that also hold the
+# scanner / VWAP / indicator state; reloaded by warm_start()
+STATE_JOURNAL = True
+STATE_DIR = "logs/state"
+STATE_FSYNC_SEC = 0.2
+STATE_SNAPSHOT_SEC = 60.0
+
 # Load instrument list for NIFTY500
 with open("data/nifty500_keys.json", "r") as f:
     INSTRUMENT_LIST = json.load(f)
 
-scanner = MarketScanner(max_len=600)
-vwap_calculators = {inst: VWAPCalculator() for inst in INSTRUMENT_LIST}
+scanner = MarketScanner(max_len=600, universe=INSTRUMENT_LIST)
+bar_builder = BarBuilder()
+
+# Per-instrument streaming state, created on first bar
+vwap_calculators = {}
+indicator_sets = {}
+volatility_engines = {}
+range_trackers = {}
+feature_caches = {}
+
+# Regime / breakout / decision as cost-ordered gates
+strategy_pipeline = GatePipeline()
+
+# Write-ahead log of the trading state (see warm_start)
+state_journal = StateJournal(STATE_DIR, fsync_interval=STATE_FSYNC_SEC,
+                             snapshot_interval=STATE_SNAPSHOT_SEC, enabled=STATE_JOURNAL)
+
+
+def log_trade_state(trade_id, trade):
+    state_journal.append("update", trade_id=trade_id, state=trade.to_state())
+
+
+def log_protective_legs(trade_id, legs):
+    state_journal.append("legs", trade_id=trade_id, legs=legs)
+
+
+def settle_entry(trade_id, filled_qty):
+    """
+    ProtectiveOrderManager confirmed the entry's fill: size the trade to
+    what filled, or drop it if nothing did.
+    """
+    with execution_lock:
+        trade = trade_monitor.active_trades.get(trade_id)
+        if trade is None or trade.qty == filled_qty:
+            return
+
+        if filled_qty <= 0:
+            trade_monitor.remove_trade(trade_id)
+            state_journal.append("unfilled", trade_id=trade_id)
+            trade_journal.unfilled(trade_id, trade)
+            print(f"[Execution] {trade_id} ({trade.inst_key}) entry not filled, trade dropped")
+            return
+
+        trade.qty = filled_qty
+        state_journal.append("update", trade_id=trade_id, state=trade.to_state())
+        print(f"[Execution] {trade_id} ({trade.inst_key}) partly filled: {filled_qty}")
+
+
+def broker_exit(trade_id, reason, exit_price):
+    """
+    ProtectiveOrderManager saw a GTT leg fire before our feed showed the
+    exit (or while we were down): close the trade here at the leg's fill.
+
+    Returns:
+        False if the trade was already closed locally
+    """
+    with execution_lock:
+        trade = trade_monitor.active_trades.get(trade_id)
+        if trade is None or trade.is_closed:
+            return False
+
+        trade.is_closed = True
+        close_trade(trade_id, trade, reason, exit_price)
+        print(f"[Execution] {trade_id} ({trade.inst_key}) {reason} at the broker @ {exit_price}")
+        return True
+
 
 # Execution helpers
 order_executor = OrderExecutor()
-trade_monitor = TradeMonitor()
+
+# GTT stop / target legs at the broker, amended on breakeven and polled
+# for legs that fired before our feed saw the exit
+protective_orders = ProtectiveOrderManager(order_executor, enabled=PROTECTIVE_ORDERS,
+                                           on_legs=log_protective_legs, on_settled=settle_entry,
+                                           on_broker_exit=broker_exit)
+trade_monitor = TradeMonitor(on_stop_moved=protective_orders.amend_stop,
+                             on_state_changed=log_trade_state)
 risk_manager = RiskManager()
 
-# Trade CSV Logger (completed trades only)
+# Trade CSV Logger (completed trades only), written by the journal's flusher
 trade_logger = TradeLogger()
+trade_journal = TradeJournal(JOURNAL_DIR, fmt=JOURNAL_FORMAT, flush_interval=JOURNAL_FLUSH_SEC,
+                             trade_log=trade_logger)
 
 signals_today = {}
 
-# Allow new trades until risk manager stops
-ALLOW_NEW_TRADES = True
-
 
-# ---------------- STREAMER ----------------
+def trading_day():
+    """
+    Date signals_today is keyed by (replay points this at its clock).
+    """
+    return datetime.date.today().isoformat()
 
-def start_market_streamer():
-    global ALLOW_NEW_TRADES
 
-    config = upstox_client.Configuration()
-    config.access_token = ACCESS_TOKEN
-    api_client = upstox_client.ApiClient(config)
+# Allow new trades until risk manager stops
+ALLOW_NEW_TRADES = True
 
-    streamer = upstox_client.MarketDataStreamerV3(
-        api_client,
-        INSTRUMENT_LIST,
-        FEED_MODE
-    )
+# Workers share signals / risk / trade state
+execution_lock = threading.Lock()
+
+# Runtime hooks (see core/async_runtime.py):
+# signal_sink: callable(SignalRecord) taking over order placement
+# INLINE_EXITS: check exits on the worker after every tick
+signal_sink = None
+INLINE_EXITS = not EXIT_FIRST
+
+
+# ---------------- STRATEGY (worker threads) ----------------
+
+def get_features(inst_key):
+    """
+    FeatureCache for an instrument, wired to its streaming state.
+    """
+    features = feature_caches.get(inst_key)
+    if features is None:
+        vwap_calculators[inst_key] = VWAPCalculator()
+        indicator_sets[inst_key] = InstrumentIndicators()
+        volatility_engines[inst_key] = VolatilityEngine(period=14)
+        range_trackers[inst_key] = InstrumentRanges()
+
+        features = FeatureCache(
+            inst_key,
+            scanner=scanner,
+            indicators=indicator_sets[inst_key],
+            vol_engine=volatility_engines[inst_key],
+            ranges=range_trackers[inst_key],
+            vwap=vwap_calculators[inst_key]
+        )
+        feature_caches[inst_key] = features
+    return features
+
+
+def commit_bar(bar):
+    """
+    Push a closed 1-min BarRecord into the scanner and per-instrument state.
+    The instrument's feature cache rolls over with the scanner's bar count.
+    """
+    features = get_features(bar.inst_key)
+
+    scanner.update_bar(bar)
+    features.indicators.update(bar.close)
+    features.vol_engine.update(bar.high, bar.low, bar.close)
+    features.ranges.update(bar.close, bar.high, bar.low)
+    features.vwap.update(bar.close, bar.volume)
+
+
+def evaluate_entry(bar, ltp):
+    """
+    Run the strategy gates for one instrument after its bar closed.
+
+    ltp: latest traded price, used for the entry
+
+    Returns:
+        SignalRecord or None
+    """
+    side = strategy_pipeline.evaluate(get_features(bar.inst_key), ltp)
+    if side not in ("BUY", "SELL"):
+        return None
+    return SignalRecord(bar.inst_key, side, ltp, bar.ts, time.time_ns())
+
+
+def execute_entry(signal, today):
+    global ALLOW_NEW_TRADES
 
-    def on_message(message):
-        global ALLOW_NEW_TRADES
+    inst_key = signal.inst_key
 
+    with execution_lock:
         if not ALLOW_NEW_TRADES:
+            trade_journal.reject(signal, "trading_halted")
             return
 
-        feeds = message.get("feeds", {})
-        now = datetime.datetime.now()
-        today = now.date().isoformat()
-
         if today not in signals_today:
             signals_today[today] = set()
 
-        # Build a map of current prices for monitoring
-        current_prices = {}
+        if inst_key in signals_today[today]:
+            trade_journal.reject(signal, "already_signalled")
+            return
 
-        for inst_key, feed_info in feeds.items():
-            data = feed_info.get("fullFeed", {}).get("marketFF", {})
+        signals_today[today].add(inst_key)
+        state_journal.append("signal", day=today, inst_key=inst_key)
 
-            # --- Last traded price (LTP) ---
-            try:
-                ltp = float(data["ltpc"]["ltp"])
-            except Exception:
-                continue
+        # Risk check
+        if not risk_manager.can_trade_now():
+            ALLOW_NEW_TRADES = False
+            state_journal.append("halt")
+            trade_journal.reject(signal, "risk_limit")
+            return
 
-            current_prices[inst_key] = ltp
+    # Queue the entry order; the trade is registered when the broker acks
+    return order_dispatcher.submit(signal, on_ack=register_entry, on_reject=trade_journal.reject)
 
-            # --- 1-min OHLC + Volume ---
-            ohlc = data.get("marketOHLC", {}).get("ohlc", [])
-            if not ohlc:
-                continue
 
-            bar = ohlc[-1]
-            try:
-                high = float(bar.get("high"))
-                low = float(bar.get("low"))
-                close = float(bar.get("close"))
-                volume = float(bar.get("vol"))
-            except Exception:
-                continue
+def place_entry_order(signal):
+    """
+    Order worker side: one HTTP round-trip.
+    """
+    return order_executor.place_limit_order(
+        inst_key=signal.inst_key,
+        side=signal.side,
+        price=signal.price
+    )
 
-            # --- Update scanner ---
-            scanner.update(inst_key, ltp, high, low, close, volume)
 
-            prices_1m = scanner.get_prices(inst_key)
-            if len(prices_1m) < 30:
-                continue
+def register_entry(signal, order_result):
+    order_id = order_result.get("order_id") or order_result.get("orderId")
+    qty = order_result.get("quantity", 0)
 
-            highs = scanner.get_highs(inst_key)
-            lows = scanner.get_lows(inst_key)
-            closes = scanner.get_closes(inst_key)
-            volumes = scanner.get_volumes(inst_key)
+    if not order_id:
+        # nothing to key the trade on (or to confirm its fill with)
+        print(f"[Execution] {signal.inst_key} ack without an order id, not tracked: {order_result.get('response')}")
+        trade_journal.reject(signal, "no_order_id")
+        return
 
-            # --- Market Regime ---
-            market_regime = detect_market_regime(highs, lows, closes)
+    with execution_lock:
+        trade = trade_monitor.add_trade(
+            trade_id=order_id,
+            inst_key=signal.inst_key,
+            side=signal.side,
+            entry_price=signal.price,
+            qty=qty
+        )
+        state_journal.append("open", trade_id=order_id, state=trade.to_state())
 
-            # --- VWAP ---
-            vwap_val = vwap_calculators[inst_key].update(ltp, volume)
+        # queued under the lock, so it can never land behind this trade's
+        # exit; fill check and GTT round-trips run on the protective thread
+        protective_orders.on_entry(order_id, trade)
 
-            # --- HTF Bias ---
-            htf_bias = get_htf_bias(prices_1m, vwap_value=vwap_val)
+    trade_journal.entry(order_id, trade)
 
-            # --- Breakout detection ---
-            breakout_signal = breakout_signal_confirmed(
-                inst_key=inst_key,
-                prices=prices_1m,
-                volume_history=volumes,
-                high_prices=highs,
-                low_prices=lows,
-                close_prices=closes
-            )
 
-            if breakout_signal is None:
-                continue
+order_dispatcher = OrderDispatcher(
+    place_entry_order,
+    workers=ORDER_WORKERS,
+    max_signal_age=MAX_SIGNAL_AGE_SEC
+)
 
-            # --- Final decision ---
-            decision = final_trade_decision(
-                inst_key=inst_key,
-                prices=prices_1m,
-                market_regime=market_regime,
-                htf_bias=htf_bias,
-                breakout_signal=breakout_signal,
-                vwap_val=vwap_val,
-                ltp=ltp
-            )
-
-            if decision in ("BUY", "SELL"):
-                if inst_key in signals_today[today]:
-                    continue
-
-                signals_today[today].add(inst_key)
-
-                # Risk check
-                if not risk_manager.can_trade_now():
-                    ALLOW_NEW_TRADES = False
-                    continue
-
-                # Place entry order
-                order_result = order_executor.place_limit_order(
-                    inst_key=inst_key,
-                    side=decision,
-                    price=ltp
-                )
-
-                if order_result:
-                    order_id = order_result.get("order_id") or order_result.get("orderId")
-                    qty = order_result.get("quantity", 0)
-
-                    trade_monitor.add_trade(
-                        trade_id=order_id,
-                        inst_key=inst_key,
-                        side=decision,
-                        entry_price=ltp,
-                        qty=qty
-                    )
-
-        # ---------------- EXIT HANDLING ----------------
 
+def handle_exits(current_prices):
+    with execution_lock:
         exits = trade_monitor.check_trades(current_prices)
 
         for trade_id, reason, exit_price in exits:
-            trade = trade_monitor.trades.get(trade_id)
+            trade = trade_monitor.active_trades.get(trade_id)
             if not trade:
                 continue
 
-            # Log completed trade to CSV
-            trade_logger.log_trade(
-                instrument=trade.inst_key,
-                side=trade.side,
-                quantity=trade.qty,
-                entry_price=trade.entry_price,
-                exit_price=exit_price,
-                entry_time=trade.entry_time,
-                exit_time=now,
-                exit_reason=reason,
-                strategy="elite_intraday_v1"
-            )
-
-            # Record for risk manager
-            risk_manager.record_trade_outcome(reason)
+            # Cancel the broker leg(s) that did not fire / send the exit
+            protective_orders.on_exit(trade_id, trade, reason, exit_price)
+            close_trade(trade_id, trade, reason, exit_price)
 
-            trade_monitor.remove_trade(trade_id)
 
-            if not risk_manager.can_trade_now():
-                ALLOW_NEW_TRADES = False
+def close_trade(trade_id, trade, reason, exit_price):
+    """
+    Book a closed trade (call with execution_lock held).
+    """
+    global ALLOW_NEW_TRADES
+
+    # Journal the exit (written to disk by the flusher)
+    trade_journal.exit(trade_id, trade, exit_price, reason, strategy="elite_intraday_v1")
+
+    # Record for risk manager
+    risk_manager.record_trade_outcome(reason)
+
+    trade_monitor.remove_trade(trade_id)
+    state_journal.append("close", trade_id=trade_id, reason=reason)
+
+    if ALLOW_NEW_TRADES and not risk_manager.can_trade_now():
+        ALLOW_NEW_TRADES = False
+        state_journal.append("halt")
+
+
+def process_tick(tick):
+    """
+    Worker-side handler for one TickRecord.
+
+    Every tick goes through the cheap intrabar path (bar update + exits).
+    The full strategy stack only runs when a 1-min bar closes.
+    """
+    inst_key = tick.inst_key
+    ltp = tick.ltp
+
+    closed_bar = bar_builder.update(
+        inst_key, tick.bar_ts, tick.open, tick.high, tick.low, tick.close, tick.volume
+    )
+
+    if closed_bar is not None:
+        commit_bar(closed_bar)
+
+        if ALLOW_NEW_TRADES:
+            signal = evaluate_entry(closed_bar, ltp)
+            exit_scheduler.tick_to_entry.record(feed_pipeline.tick_age())
+            if signal is not None:
+                dispatch_signal(signal)
+
+    # ---------------- EXIT HANDLING ----------------
+    if INLINE_EXITS and trade_monitor.has_position(inst_key):
+        handle_exits({inst_key: ltp})
+        exit_scheduler.tick_to_exit.record(feed_pipeline.tick_age())
+
+
+def dispatch_signal(signal):
+    """
+    Hand an entry signal to the runtime's sink, or place it here.
+    """
+    if not ALLOW_NEW_TRADES:
+        return
+    if signal_sink is not None:
+        signal_sink(signal)
+    else:
+        execute_entry(signal, trading_day())
+
+
+def check_exits(prices):
+    """
+    Exit check for a frame's open positions (ExitFirstScheduler).
+    """
+    handle_exits(prices)
+
+
+def check_tick_exits(tick):
+    """
+    Exit check for one tick (processes mode: runs on the feed thread).
+    """
+    if INLINE_EXITS:
+        handle_exits({tick.inst_key: tick.ltp})
+
+
+if WORKER_MODE == "processes":
+    feed_pipeline = ProcessPipeline(
+        INSTRUMENT_LIST,
+        bar_builder=bar_builder,
+        on_signal=dispatch_signal,
+        on_tick=check_tick_exits,
+        num_workers=WORKER_SHARDS,
+        max_len=scanner.max_len
+    )
+else:
+    feed_pipeline = FeedPipeline(
+        handler=process_tick,
+        num_shards=WORKER_SHARDS,
+        queue_size=SHARD_QUEUE_SIZE,
+        max_age=MAX_TICK_AGE_SEC
+    )
+
+
+exit_scheduler = ExitFirstScheduler(trade_monitor, check_exits, feed_pipeline)
+if WORKER_MODE == "processes":
+    # entries are decided in the worker processes: bar sent -> decision
+    exit_scheduler.tick_to_entry = feed_pipeline.decision_latency
+
+
+feed_recorder = FeedRecorder(CAPTURE_DIR) if RECORD_FEED else None
+
+
+# ---------------- STATE (write-ahead log / warm restart) ----------------
+
+def capture_trading_state():
+    """
+    Signals, halt flag, risk counters, open trades and their GTT legs.
+    Called under execution_lock (see checkpoint_state).
+    """
+    return {
+        "signals_today": {day: sorted(keys) for day, keys in signals_today.items()},
+        "allow_new_trades": ALLOW_NEW_TRADES,
+        "risk": risk_manager.counters(),
+        "trades": {trade_id: trade.to_state() for trade_id, trade in trade_monitor.active_trades.items()},
+        "legs": {trade_id: dict(legs) for trade_id, legs in list(protective_orders.legs.items())},
+    }
+
+
+def _capture_instrument(inst_key, features, attempts=3):
+    # the instrument's worker may commit a bar while we copy: retry
+    for _ in range(attempts):
+        bars = scanner.bar_count(inst_key)
+        try:
+            state = {
+                "bars": bars,
+                "windows": {field: scanner.get_window(inst_key, field).copy() for field in FIELDS},
+                "vwap": copy.deepcopy(features.vwap),
+                "indicators": copy.deepcopy(features.indicators),
+                "vol_engine": copy.deepcopy(features.vol_engine),
+                "ranges": copy.deepcopy(features.ranges),
+            }
+        except RuntimeError:
+            continue
+        if scanner.bar_count(inst_key) == bars:
+            return state
+    return None
+
+
+def capture_strategy_state():
+    """
+    Scanner history and streaming indicator / VWAP state per instrument,
+    plus the forming bars. Taken while the workers run; an instrument
+    that keeps changing under the copy is left out (cold on restart).
+
+    Returns:
+        dict, or None in processes mode (the state lives in the workers)
+    """
+    if WORKER_MODE == "processes":
+        return None
+
+    return {
+        "max_len": scanner.max_len,
+        "forming": {inst_key: list(bar) for inst_key, bar in list(bar_builder.current.items())},
+        "instruments": {
+            inst_key: _capture_instrument(inst_key, features)
+            for inst_key, features in list(feature_caches.items())
+        },
+    }
+
+
+def checkpoint_state():
+    """
+    Snapshot everything and start a new log segment (StateJournal thread).
+    """
+    with execution_lock:
+        seq, trading = state_journal.rotate(capture_trading_state)
+    state_journal.write_snapshot(seq, trading, capture_strategy_state())
+
+
+def restore_trading_state(state):
+    global ALLOW_NEW_TRADES
+
+    signals_today.clear()
+    signals_today.update({day: set(keys) for day, keys in state["signals_today"].items()})
+    ALLOW_NEW_TRADES = state["allow_new_trades"]
+    risk_manager.restore(state["risk"])
+
+    for trade_id, trade_state in state["trades"].items():
+        trade_monitor.restore_trade(trade_id, trade_state)
+    protective_orders.legs.update(state["legs"])
+
+
+def restore_strategy_state(state):
+    for inst_key, saved in state["instruments"].items():
+        if saved is None:
+            continue
+
+        features = get_features(inst_key)
+        scanner.load_history(inst_key, saved["windows"], saved["bars"])
+
+        features.vwap = vwap_calculators[inst_key] = saved["vwap"]
+        features.indicators = indicator_sets[inst_key] = saved["indicators"]
+        features.vol_engine = volatility_engines[inst_key] = saved["vol_engine"]
+        features.ranges = range_trackers[inst_key] = saved["ranges"]
+
+    bar_builder.current.update(state["forming"])
+
+
+def apply_state_record(record):
+    global ALLOW_NEW_TRADES
+
+    kind = record["kind"]
+    if kind == "signal":
+        signals_today.setdefault(record["day"], set()).add(record["inst_key"])
+    elif kind == "halt":
+        ALLOW_NEW_TRADES = False
+    elif kind in ("open", "update"):
+        trade_monitor.restore_trade(record["trade_id"], record["state"])
+    elif kind == "close":
+        trade_monitor.remove_trade(record["trade_id"])
+        protective_orders.legs.pop(record["trade_id"], None)
+        risk_manager.record_trade_outcome(record["reason"])
+    elif kind == "unfilled":
+        trade_monitor.remove_trade(record["trade_id"])
+    elif kind == "legs":
+        protective_orders.legs[record["trade_id"]] = record["legs"]
+
+
+def warm_start():
+    """
+    Reload today's state (latest snapshot + log records after it), then
+    start journaling. Call before the feed starts.
+
+    Returns:
+        dict summary of what was restored
+    """
+    start = time.perf_counter()
+    snapshot, records = state_journal.recover()
+
+    with execution_lock:
+        if snapshot is not None:
+            restore_trading_state(snapshot["trading"])
+            if snapshot["strategy"] is not None and WORKER_MODE != "processes":
+                restore_strategy_state(snapshot["strategy"])
+
+        for record in records:
+            apply_state_record(record)
+
+        # legs of trades that closed before the crash are not ours to manage;
+        # the others may have fired while we were down
+        for trade_id in list(protective_orders.legs):
+            trade = trade_monitor.active_trades.get(trade_id)
+            if trade is None:
+                del protective_orders.legs[trade_id]
+            else:
+                protective_orders.reconcile(trade_id, trade)
+
+    state_journal.start(checkpoint_state)
+
+    summary = {
+        "snapshot_seq": snapshot["seq"] if snapshot is not None else None,
+        "records_replayed": len(records),
+        "open_trades": len(trade_monitor.active_trades),
+        "instruments_warm": len(feature_caches),
+        "trading_allowed": ALLOW_NEW_TRADES,
+        "restore_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
+    if snapshot is not None or records:
+        print(f"[StateJournal] warm restart: {summary}")
+    return summary
+
+
+# ---------------- INGESTION (SDK callback thread) ----------------
+
+def on_message(message):
+    """
+    Normalize each instrument's feed and hand it to its worker shard.
+    Nothing here blocks on strategy or order placement.
+    """
+    received_at = time.perf_counter()
+    if feed_recorder is not None:
+        feed_recorder.record_message(message)
+
+    feeds = message.get("feeds", {})
+
+    ticks = []
+    for inst_key, feed_info in feeds.items():
+        tick = normalize_full_feed(inst_key, feed_info)
+        if tick is not None:
+            ticks.append(tick)
+    submit_ticks(ticks, received_at)
+
+
+def on_ticks(ticks, raw=None):
+    """
+    Protobuf path: TickRecords decoded by TickStreamerV3.
+    """
+    received_at = time.perf_counter()
+    if feed_recorder is not None and raw is not None:
+        feed_recorder.record_raw(raw, instruments=[t.inst_key for t in ticks])
+
+    submit_ticks(ticks, received_at)
+
+
+def submit_ticks(ticks, received_at=None):
+    """
+    One frame's ticks: exits for open positions first, then the strategy.
+    """
+    if EXIT_FIRST:
+        exit_scheduler.schedule(ticks, received_at)
+    else:
+        for tick in ticks:
+            feed_pipeline.submit(tick, received_at)
+
+
+# ---------------- STREAMER ----------------
+
+# One FeedShard per connection (per-shard rate / lag in stats)
+feed_shards = []
+streamers = []
+
+
+def make_streamer(api_client, shard):
+    if DECODE_MODE == "proto":
+        streamer = ShardStreamerV3(shard, api_client, FEED_MODE)
+        streamer.on("ticks", on_ticks)
+        return streamer
+
+    streamer = upstox_client.MarketDataStreamerV3(api_client, shard.keys, FEED_MODE)
+    streamer.on("open", shard.on_open)
+    streamer.on("close", shard.on_close)
+
+    def on_shard_message(message):
+        shard.record(len(message.get("feeds", {})), int(message.get("currentTs", 0)))
+        on_message(message)
+
+    streamer.on("message", on_shard_message)
+    return streamer
+
+
+def start_market_streamer():
+    config = upstox_client.Configuration()
+    config.access_token = ACCESS_TOKEN
+    api_client = upstox_client.ApiClient(config)
+
+    for i, keys in enumerate(split_universe(INSTRUMENT_LIST, FEED_CONNECTIONS, FEED_MODE)):
+        shard = FeedShard(i, keys)
+        feed_shards.append(shard)
+        streamers.append(make_streamer(api_client, shard))
+
+    warm_start()
+    feed_pipeline.start()
+    if feed_recorder is not None:
+        feed_recorder.start()
+        print(f"[FeedRecorder] capturing to {feed_recorder.path}")
 
-    streamer.on("message", on_message)
-    streamer.connect()
+    # each streamer runs its socket (and decode) on its own thread
+    for streamer in streamers:
+        streamer.connect()
 
-    print("🚀 Trading system started — Live execution enabled.")
+    print(f"🚀 Trading system started — {len(streamers)} feed connections, live execution enabled.")
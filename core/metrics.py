@@ -0,0 +1,86 @@
+# core/metrics.py
+
+import bisect
+import threading
+from collections import deque
+
+
+class LatencyStats:
+    """
+    Thread-safe latency recorder.
+    Keeps running count / mean / max plus a window of recent
+    samples for percentiles. All values are in seconds.
+    """
+
+    def __init__(self, window=4096):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def record(self, seconds):
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.last = seconds
+            if seconds > self.max:
+                self.max = seconds
+            self._samples.append(seconds)
+
+    def percentile(self, pct):
+        """
+        Percentile (0-100) over the recent sample window.
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+
+        if not samples:
+            return None
+
+        idx = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[idx]
+
+    def snapshot(self) -> dict:
+        """
+        Summary in milliseconds, handy for printing.
+        """
+        mean = self.total / self.count if self.count else 0.0
+        p50 = self.percentile(50) or 0.0
+        p99 = self.percentile(99) or 0.0
+        return {
+            "count": self.count,
+            "mean_ms": round(mean * 1000, 3),
+            "p50_ms": round(p50 * 1000, 3),
+            "p99_ms": round(p99 * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class LatencyHistogram(LatencyStats):
+    """
+    LatencyStats plus fixed buckets counted over the whole run
+    (the percentile window only covers recent samples).
+    """
+
+    # upper bounds in milliseconds; the last bucket is open-ended
+    BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+    def __init__(self, window=4096, bounds_ms=BOUNDS_MS):
+        super().__init__(window)
+        self.bounds = [b / 1000 for b in bounds_ms]
+        self.labels = [f"<={b}ms" for b in bounds_ms] + [f">{bounds_ms[-1]}ms"]
+        self.buckets = [0] * (len(bounds_ms) + 1)
+
+    def record(self, seconds):
+        super().record(seconds)
+        idx = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.buckets[idx] += 1
+
+    def snapshot(self) -> dict:
+        snap = super().snapshot()
+        with self._lock:
+            snap["buckets"] = {label: n for label, n in zip(self.labels, self.buckets) if n}
+        return snap
@@ -0,0 +1,379 @@
+# core/mock_feed_server.py
+
+"""
+Local stand-in for the Upstox V3 market data feed, for load tests
+without network access.
+
+One port serves both steps of the real handshake:
+    GET /v3/feed/market-data-feed/authorize  -> JSON with the ws:// URL
+    ws://host:port/feed                      -> expects a JSON "sub"
+                                                request, then streams
+                                                protobuf FeedResponse frames
+    GET /stats                               -> JSON counters
+
+The stream starts with a market_info frame, then live_feed frames with
+"full" mode feeds (LTPC, depth, 1d + I1 OHLC, ATP, VTT, TBQ/TSQ).
+currentTs carries the send time in epoch ms so clients can spot late
+frames.
+
+Usage:
+    python -m core.mock_feed_server --port 8765 --feeds-per-sec 4800 --burst open
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+from http import HTTPStatus
+
+from upstox_client.feeder.proto import MarketDataFeedV3_pb2 as pb
+from websockets.asyncio.server import serve
+
+AUTHORIZE_PATH = "/v3/feed/market-data-feed/authorize"
+FEED_PATH = "/feed"
+STATS_PATH = "/stats"
+
+# Rough live NIFTY500 "full" mode volume: about one update per
+# instrument per second. Load tests scale this by 2-10x.
+BASELINE_FEEDS_PER_SEC = 480
+
+
+class FeedShape:
+    """
+    Rate multiplier over time.
+
+    steady   constant rate
+    burst    burst_factor x for burst_len seconds every burst_period seconds
+    open     opening surge: burst_factor x decaying to 1x over ~burst_period
+    """
+
+    def __init__(self, kind="steady", burst_factor=5.0, burst_period=10.0, burst_len=1.0):
+        if kind not in ("steady", "burst", "open"):
+            raise ValueError(f"Unknown burst shape: {kind}")
+        self.kind = kind
+        self.burst_factor = burst_factor
+        self.burst_period = burst_period
+        self.burst_len = burst_len
+
+    def multiplier(self, elapsed):
+        if self.kind == "burst":
+            return self.burst_factor if elapsed % self.burst_period < self.burst_len else 1.0
+        if self.kind == "open":
+            return 1.0 + (self.burst_factor - 1.0) * math.exp(-elapsed / self.burst_period)
+        return 1.0
+
+
+class SyntheticMarket:
+    """
+    Random-walk prices, volumes and depth for a set of instruments.
+    """
+
+    def __init__(self, instrument_keys, depth_levels=5, bar_seconds=60, seed=None):
+        """
+        depth_levels: bid/ask levels per feed (5 = full, 30 = full_d30)
+        bar_seconds: wall seconds per emitted 1-min bar (lower it to make
+                     bars close quickly in short tests)
+        """
+        self.rng = random.Random(seed)
+        self.keys = list(instrument_keys)
+        self.depth_levels = depth_levels
+        self.bar_seconds = bar_seconds
+        self.start = time.time()
+        self.start_ms = int(self.start // 60 * 60 * 1000)
+        self.request_mode = pb.RequestMode.Value("full_d30" if depth_levels > 5 else "full_d5")
+
+        self.state = {}
+        for key in self.keys:
+            price = round(self.rng.uniform(50, 5000), 2)
+            self.state[key] = {
+                "cp": price,
+                "ltp": price,
+                "day": [price, price, price],        # open, high, low
+                "bar": None,                          # [bar_ts, open, high, low, vol]
+                "vtt": 0,
+            }
+
+    def _bar_ts(self, now):
+        bars = int((now - self.start) // self.bar_seconds)
+        return self.start_ms + bars * 60000
+
+    def fill_feed(self, key, feed, now):
+        rnd = self.rng.random
+        s = self.state[key]
+        ltp = round(max(0.05, s["ltp"] * (1 + self.rng.gauss(0, 0.0008))), 2)
+        ltq = 1 + int(rnd() * 500)
+        s["ltp"] = ltp
+        s["vtt"] += ltq
+
+        day = s["day"]
+        day[1] = max(day[1], ltp)
+        day[2] = min(day[2], ltp)
+
+        bar_ts = self._bar_ts(now)
+        bar = s["bar"]
+        if bar is None or bar[0] != bar_ts:
+            bar = s["bar"] = [bar_ts, ltp, ltp, ltp, 0]
+        bar[2] = max(bar[2], ltp)
+        bar[3] = min(bar[3], ltp)
+        bar[4] += ltq
+
+        ltt = int(now * 1000)
+        mff = feed.fullFeed.marketFF
+        mff.ltpc.ltp = ltp
+        mff.ltpc.ltt = ltt
+        mff.ltpc.ltq = ltq
+        mff.ltpc.cp = s["cp"]
+
+        tick = max(0.05, round(ltp * 0.0002, 2))
+        quotes = mff.marketLevel.bidAskQuote
+        for level in range(1, self.depth_levels + 1):
+            q = quotes.add()
+            q.bidP = ltp - tick * level
+            q.bidQ = 1 + int(rnd() * 5000)
+            q.askP = ltp + tick * level
+            q.askQ = 1 + int(rnd() * 5000)
+
+        d = mff.marketOHLC.ohlc.add()
+        d.interval = "1d"
+        d.open, d.high, d.low, d.close = day[0], day[1], day[2], ltp
+        d.vol = s["vtt"]
+        d.ts = self.start_ms
+
+        m = mff.marketOHLC.ohlc.add()
+        m.interval = "I1"
+        m.open, m.high, m.low, m.close = bar[1], bar[2], bar[3], ltp
+        m.vol = bar[4]
+        m.ts = bar[0]
+
+        mff.atp = round((day[1] + day[2] + ltp) / 3, 2)
+        mff.vtt = s["vtt"]
+        mff.tbq = float(10000 + int(rnd() * 490000))
+        mff.tsq = float(10000 + int(rnd() * 490000))
+        feed.requestMode = self.request_mode
+
+    def frame(self, keys):
+        now = time.time()
+        resp = pb.FeedResponse()
+        resp.type = pb.Type.Value("live_feed")
+        resp.currentTs = int(now * 1000)
+        for key in keys:
+            self.fill_feed(key, resp.feeds[key], now)
+        return resp.SerializeToString()
+
+
+def market_info_frame():
+    resp = pb.FeedResponse()
+    resp.type = pb.Type.Value("market_info")
+    resp.currentTs = int(time.time() * 1000)
+    resp.marketInfo.segmentStatus["NSE_EQ"] = pb.MarketStatus.Value("NORMAL_OPEN")
+    resp.marketInfo.segmentStatus["NSE_INDEX"] = pb.MarketStatus.Value("NORMAL_OPEN")
+    return resp.SerializeToString()
+
+
+class MockFeedServer:
+    """
+    Mock authorize endpoint + market data WebSocket.
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=8765,
+        instrument_count=None,
+        feeds_per_sec=BASELINE_FEEDS_PER_SEC,
+        feeds_per_frame=20,
+        shape=None,
+        depth_levels=5,
+        bar_seconds=60,
+        seed=None
+    ):
+        """
+        instrument_count: stream only the first N subscribed keys (None = all)
+        feeds_per_sec: instrument updates per second, before the shape multiplier
+        feeds_per_frame: instrument updates packed into one FeedResponse
+        shape: FeedShape (default steady)
+        depth_levels / bar_seconds / seed: see SyntheticMarket
+        """
+        self.host = host
+        self.port = port
+        self.instrument_count = instrument_count
+        self.feeds_per_sec = feeds_per_sec
+        self.feeds_per_frame = feeds_per_frame
+        self.shape = shape or FeedShape()
+        self.depth_levels = depth_levels
+        self.bar_seconds = bar_seconds
+        self.seed = seed
+
+        self.connections = 0
+        self.frames_sent = 0
+        self.feeds_sent = 0
+        self.bytes_sent = 0
+        self.send_lag_max_ms = 0.0      # how far the sender fell behind schedule
+        self.build_ns = 0
+
+        self._loop = None
+        self._stop = None
+        self._thread = None
+
+    @property
+    def authorize_url(self):
+        return f"http://{self.host}:{self.port}{AUTHORIZE_PATH}"
+
+    @property
+    def feed_url(self):
+        return f"ws://{self.host}:{self.port}{FEED_PATH}"
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "frames_sent": self.frames_sent,
+            "feeds_sent": self.feeds_sent,
+            "bytes_sent": self.bytes_sent,
+            "send_lag_max_ms": round(self.send_lag_max_ms, 3),
+            "build_us_per_frame": round(self.build_ns / self.frames_sent / 1000, 2) if self.frames_sent else None,
+        }
+
+    # ---------------- HTTP ----------------
+
+    def _process_request(self, connection, request):
+        path = request.path.split("?")[0]
+        if path == AUTHORIZE_PATH:
+            body = {"status": "success", "data": {"authorized_redirect_uri": self.feed_url}}
+            return connection.respond(HTTPStatus.OK, json.dumps(body))
+        if path == STATS_PATH:
+            return connection.respond(HTTPStatus.OK, json.dumps(self.stats()))
+        if path != FEED_PATH:
+            return connection.respond(HTTPStatus.NOT_FOUND, "Not found\n")
+        return None
+
+    # ---------------- WebSocket ----------------
+
+    async def _handler(self, connection):
+        self.connections += 1
+        subscribed = []
+        streamer = None
+
+        try:
+            async for raw in connection:
+                try:
+                    request = json.loads(raw)
+                except ValueError:
+                    continue
+
+                method = request.get("method")
+                keys = request.get("data", {}).get("instrumentKeys", [])
+
+                if method == "sub":
+                    subscribed.extend(k for k in keys if k not in subscribed)
+                elif method == "unsub":
+                    subscribed = [k for k in subscribed if k not in keys]
+                else:
+                    continue
+
+                if streamer is not None:
+                    streamer.cancel()
+                if subscribed:
+                    streamer = asyncio.create_task(self._stream(connection, list(subscribed)))
+        finally:
+            if streamer is not None:
+                streamer.cancel()
+
+    async def _stream(self, connection, keys):
+        if self.instrument_count is not None:
+            keys = keys[:self.instrument_count]
+        market = SyntheticMarket(keys, self.depth_levels, self.bar_seconds, self.seed)
+
+        await connection.send(market_info_frame())
+        self.frames_sent += 1
+
+        start = time.perf_counter()
+        due = start
+        cursor = 0
+        n = len(keys)
+        per_frame = min(self.feeds_per_frame, n)
+
+        while True:
+            now = time.perf_counter()
+            if due > now:
+                await asyncio.sleep(due - now)
+            else:
+                self.send_lag_max_ms = max(self.send_lag_max_ms, (now - due) * 1000)
+
+            batch = [keys[(cursor + i) % n] for i in range(per_frame)]
+            cursor = (cursor + per_frame) % n
+
+            t0 = time.perf_counter_ns()
+            frame = market.frame(batch)
+            self.build_ns += time.perf_counter_ns() - t0
+
+            await connection.send(frame)
+            self.frames_sent += 1
+            self.feeds_sent += per_frame
+            self.bytes_sent += len(frame)
+
+            rate = self.feeds_per_sec * self.shape.multiplier(time.perf_counter() - start)
+            due += per_frame / rate
+
+    # ---------------- lifecycle ----------------
+
+    async def serve_forever(self):
+        self._stop = asyncio.Event()
+        async with serve(self._handler, self.host, self.port, process_request=self._process_request,
+                         max_size=None, compression=None):
+            print(f"[MockFeedServer] listening on {self.host}:{self.port}")
+            await self._stop.wait()
+
+    def start(self):
+        """
+        Run the server on a background thread (its own event loop).
+        """
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.call_soon(ready.set)
+            self._loop.run_until_complete(self.serve_forever())
+
+        self._thread = threading.Thread(target=run, name="mock-feed-server", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self):
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Upstox V3 market data feed")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--instruments", type=int, default=None, help="stream only the first N subscribed keys")
+    parser.add_argument("--feeds-per-sec", type=float, default=BASELINE_FEEDS_PER_SEC)
+    parser.add_argument("--feeds-per-frame", type=int, default=20)
+    parser.add_argument("--burst", default="steady", choices=["steady", "burst", "open"])
+    parser.add_argument("--burst-factor", type=float, default=5.0)
+    parser.add_argument("--burst-period", type=float, default=10.0)
+    parser.add_argument("--depth", type=int, default=5, help="bid/ask levels per feed")
+    parser.add_argument("--bar-seconds", type=float, default=60)
+    args = parser.parse_args()
+
+    server = MockFeedServer(
+        host=args.host,
+        port=args.port,
+        instrument_count=args.instruments,
+        feeds_per_sec=args.feeds_per_sec,
+        feeds_per_frame=args.feeds_per_frame,
+        shape=FeedShape(args.burst, args.burst_factor, args.burst_period),
+        depth_levels=args.depth,
+        bar_seconds=args.bar_seconds
+    )
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# core/mock_rest_server.py
+
+"""
+Local HTTP stand-in for the Upstox REST endpoints used by the bot.
+
+Keep-alive (HTTP/1.1) like the real API, with optional latency, 5xx
+faults and a per-second limit that answers 429, so core/http_client.py
+can be exercised offline: connection reuse, retries and rate limiting.
+
+    GET /v2/user/profile
+    GET /v2/historical-candle/<key>/<interval>/<to>[/<from>]
+    GET /v2/order/details?order_id=...
+    GET /v3/feed/market-data-feed/authorize
+
+Usage:
+    python -m core.mock_rest_server --port 8766            # serve
+    python -m core.mock_rest_server --check --fail-every 7 # client check
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+
+class MockRestServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server with request / connection counters.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=8766, latency=0.0, fail_every=0, max_per_sec=None):
+        """
+        latency: added to every response (seconds)
+        fail_every: answer 503 to every Nth request (0 = never)
+        max_per_sec: answer 429 beyond this many requests per second
+        """
+        super().__init__((host, port), MockRestHandler)
+        self.latency = latency
+        self.fail_every = fail_every
+        self.max_per_sec = max_per_sec
+
+        self.connections = 0
+        self.requests = 0
+        self.faults = 0
+        self.throttled = 0
+        self._second = 0
+        self._second_count = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def admit(self):
+        """
+        Returns the status to force for this request, or None.
+        """
+        with self._lock:
+            self.requests += 1
+
+            now = int(time.monotonic())
+            if now != self._second:
+                self._second, self._second_count = now, 0
+            self._second_count += 1
+
+            if self.max_per_sec and self._second_count > self.max_per_sec:
+                self.throttled += 1
+                return HTTPStatus.TOO_MANY_REQUESTS
+            if self.fail_every and self.requests % self.fail_every == 0:
+                self.faults += 1
+                return HTTPStatus.SERVICE_UNAVAILABLE
+        return None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-rest", daemon=True)
+        self._thread.start()
+        print(f"[MockRestServer] listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "requests": self.requests,
+            "faults": self.faults,
+            "throttled": self.throttled,
+        }
+
+
+class MockRestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # headers and body are separate writes; without this Nagle +
+    # delayed ACK add ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if status == HTTPStatus.TOO_MANY_REQUESTS:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        forced = self.server.admit()
+        if forced is not None:
+            return self._send(forced, {"status": "error", "errors": [{"message": forced.phrase}]})
+
+        url = urlsplit(self.path)
+        parts = [unquote(p) for p in url.path.strip("/").split("/")]
+        query = parse_qs(url.query)
+
+        if url.path == "/v2/user/profile":
+            return self._send(HTTPStatus.OK, {"status": "success", "data": {"user_id": "MOCK01", "user_name": "Mock"}})
+
+        if url.path == "/v3/feed/market-data-feed/authorize":
+            host, port = self.server.server_address[:2]
+            uri = f"ws://{host}:{port}/feed"
+            return self._send(HTTPStatus.OK, {"status": "success", "data": {"authorized_redirect_uri": uri}})
+
+        if url.path == "/v2/order/details":
+            order_id = (query.get("order_id") or [None])[0]
+            if not order_id:
+                return self._send(HTTPStatus.BAD_REQUEST, {"status": "error", "errors": [{"message": "order_id"}]})
+            return self._send(HTTPStatus.OK, {"status": "success", "data": {"order_id": order_id, "status": "complete"}})
+
+        if len(parts) >= 5 and parts[:2] == ["v2", "historical-candle"]:
+            return self._send(HTTPStatus.OK, {"status": "success", "data": {"candles": self._candles(parts[2])}})
+
+        self._send(HTTPStatus.NOT_FOUND, {"status": "error", "errors": [{"message": "Not found"}]})
+
+    @staticmethod
+    def _candles(inst_key, n=30):
+        rng = random.Random(inst_key)
+        price = rng.uniform(100, 3000)
+        candles = []
+        for i in range(n):
+            o = price
+            price *= 1 + rng.gauss(0, 0.002)
+            candles.append([f"2025-01-01T09:{15 + i:02d}:00+05:30", o, max(o, price), min(o, price), price, rng.randint(100, 10000), 0])
+        return candles
+
+
+# -----------------------------
+# Client check
+# -----------------------------
+
+def run_client_check(server, calls=200, threads=4, rate_per_sec=None):
+    """
+    Drive core/http_client.py against the stand-in from a few threads.
+
+    Returns:
+        report dict (client metrics + server counters)
+    """
+    from core.http_client import RestClient, RATE_LIMITS
+
+    limits = dict(RATE_LIMITS)
+    if rate_per_sec:
+        limits["standard"] = [(rate_per_sec, 1.0)]
+
+    client = RestClient(base_url=server.base_url + "/v2/", access_token="mock", rate_limits=limits, backoff=0.05)
+    authorize_url = server.base_url + "/v3/feed/market-data-feed/authorize"
+
+    def worker(i):
+        for n in range(calls // threads):
+            kind = n % 4
+            if kind == 0:
+                client.get("user/profile")
+            elif kind == 1:
+                client.get("historical-candle/NSE_EQ%7CINE002A01018/1minute/2025-01-02/2025-01-01",
+                           name="GET historical-candle")
+            elif kind == 2:
+                client.get("order/details", params={"order_id": f"MOCK{i}{n}"}, category="order")
+            else:
+                client.get(authorize_url)
+
+    start = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    wall = time.perf_counter() - start
+
+    report = client.stats()
+    report["wall_sec"] = round(wall, 3)
+    report["server"] = server.stats()
+    client.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Upstox REST stand-in")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fail-every", type=int, default=0)
+    parser.add_argument("--max-per-sec", type=int, default=None)
+    parser.add_argument("--check", action="store_true", help="run the client check and exit")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--rate", type=int, default=None, help="client rate limit (req/s) for --check")
+    args = parser.parse_args()
+
+    server = MockRestServer(port=args.port, latency=args.latency, fail_every=args.fail_every,
+                            max_per_sec=args.max_per_sec).start()
+
+    if not args.check:
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.stop()
+        return
+
+    report = run_client_check(server, calls=args.calls, rate_per_sec=args.rate)
+    server.stop()
+
+    print("\n[RestCheck] report")
+    for key, value in report.items():
+        print(f"  {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# core/records.py
+
+"""
+Fixed-layout records passed between pipeline stages.
+
+Single records are __slots__ classes (no per-instance __dict__); batches
+(captures, snapshots, analysis) use the matching NumPy structured dtypes.
+"""
+
+import numpy as np
+
+# Instrument keys ("NSE_EQ|INE002A01018") fit comfortably in 32 bytes
+INST_KEY_DTYPE = "S32"
+
+
+class TickRecord:
+    """
+    One instrument's update: LTP, forming 1-min bar, top of book.
+    """
+
+    __slots__ = (
+        "inst_key", "ltp", "open", "high", "low", "close", "volume",
+        "bar_ts", "bid", "bid_qty", "ask", "ask_qty", "ltt"
+    )
+
+    def __init__(self, inst_key, ltp, open_, high, low, close, volume, bar_ts,
+                 bid=None, bid_qty=None, ask=None, ask_qty=None, ltt=None):
+        self.inst_key = inst_key
+        self.ltp = ltp
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.bar_ts = bar_ts        # bar start, epoch ms
+        self.bid = bid
+        self.bid_qty = bid_qty
+        self.ask = ask
+        self.ask_qty = ask_qty
+        self.ltt = ltt              # last trade time, epoch ms
+
+    def __repr__(self):
+        return (f"TickRecord({self.inst_key}, ltp={self.ltp}, "
+                f"ohlcv=({self.open}, {self.high}, {self.low}, {self.close}, {self.volume}), "
+                f"bar_ts={self.bar_ts}, bid={self.bid}, ask={self.ask})")
+
+    def __eq__(self, other):
+        if not isinstance(other, TickRecord):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+
+class BarRecord:
+    """
+    One closed 1-min bar.
+    """
+
+    __slots__ = ("inst_key", "ts", "open", "high", "low", "close", "volume")
+
+    def __init__(self, inst_key, ts, open_, high, low, close, volume):
+        self.inst_key = inst_key
+        self.ts = ts                # bar start, epoch ms
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    def astuple(self):
+        return (self.ts, self.open, self.high, self.low, self.close, self.volume)
+
+    def __repr__(self):
+        return (f"BarRecord({self.inst_key}, ts={self.ts}, "
+                f"ohlcv=({self.open}, {self.high}, {self.low}, {self.close}, {self.volume}))")
+
+    def __eq__(self, other):
+        if not isinstance(other, BarRecord):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+
+class SignalRecord:
+    """
+    Strategy decision for one instrument on one bar.
+    """
+
+    __slots__ = ("inst_key", "side", "price", "bar_ts", "created_ns")
+
+    def __init__(self, inst_key, side, price, bar_ts, created_ns):
+        self.inst_key = inst_key
+        self.side = side            # "BUY" or "SELL"
+        self.price = price          # LTP at decision time
+        self.bar_ts = bar_ts        # bar that triggered it, epoch ms
+        self.created_ns = created_ns
+
+    def __repr__(self):
+        return f"SignalRecord({self.inst_key}, {self.side} @ {self.price}, bar_ts={self.bar_ts})"
+
+
+# -----------------------------
+# Structured dtypes for batches
+# -----------------------------
+
+TICK_DTYPE = np.dtype([
+    ("inst_key", INST_KEY_DTYPE),
+    ("ltp", "f8"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+    ("bar_ts", "i8"),
+    ("bid", "f8"),
+    ("bid_qty", "i8"),
+    ("ask", "f8"),
+    ("ask_qty", "i8"),
+    ("ltt", "i8"),
+])
+
+BAR_DTYPE = np.dtype([
+    ("inst_key", INST_KEY_DTYPE),
+    ("ts", "i8"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+
+SIGNAL_DTYPE = np.dtype([
+    ("inst_key", INST_KEY_DTYPE),
+    ("side", "S4"),
+    ("price", "f8"),
+    ("bar_ts", "i8"),
+    ("created_ns", "i8"),
+])
+
+# missing optional fields (e.g. no depth) in integer columns
+_INT_MISSING = 0
+_FLOAT_MISSING = np.nan
+
+
+def to_array(records, dtype):
+    """
+    Pack slotted records into a structured array of `dtype`.
+    Fields are matched by name; None becomes NaN / 0.
+    """
+    out = np.empty(len(records), dtype=dtype)
+    for name in dtype.names:
+        kind = dtype[name].kind
+        if kind == "S":
+            out[name] = [getattr(r, name).encode() for r in records]
+            continue
+        missing = _FLOAT_MISSING if kind == "f" else _INT_MISSING
+        values = [getattr(r, name) for r in records]
+        out[name] = [missing if v is None else v for v in values]
+    return out
+
+
+def from_array(array, cls):
+    """
+    Unpack a structured array back into slotted records.
+    """
+    records = []
+    for row in array:
+        r = cls.__new__(cls)
+        for name in cls.__slots__:
+            value = row[name]
+            if isinstance(value, bytes):
+                value = value.decode()
+            else:
+                value = value.item()
+            setattr(r, name, value)
+        records.append(r)
+    return records
@@ -0,0 +1,243 @@
+# core/replay.py
+
+"""
+Replay a captured session (see core/feed_recorder.py) through the live
+ingestion path: market_streamer.on_ticks (raw frames) or on_message
+(decoded dicts) -> FeedPipeline -> strategy -> execution. Orders go to
+FakeOrderApi and closed trades to a replay-only CSV, so nothing touches
+the broker or the live trade log.
+
+Usage:
+    python -m core.replay data/captures/<session>             # as fast as possible
+    python -m core.replay data/captures/<session> --speed 1   # wall-clock pace
+    python -m core.replay data/captures/<session> --speed 10 --lockstep
+"""
+
+import argparse
+import datetime
+import itertools
+import os
+import shutil
+import time
+
+from core.feed_decoder import decode_frame
+from core.feed_pipeline import normalize_full_feed
+from core.feed_recorder import FeedReader, KIND_RAW
+from execution.fake_order_api import FakeOrderApi
+from execution.order_executor import OrderExecutor
+from execution.state_journal import StateJournal
+from execution.trade_journal import TradeJournal
+from execution.trade_logger import TradeLogger
+
+
+class ReplayClock:
+    """
+    Paces recorded receive timestamps onto the wall clock.
+
+    speed: 1.0 = real time, N = N times faster, None / 0 = no waiting
+    """
+
+    def __init__(self, speed=None):
+        self.speed = speed or None
+        self._origin_ns = None
+        self._start = None
+        self.now_ns = None
+
+        # messages we could not deliver on schedule (replay can't keep up)
+        self.late = 0
+        self.max_late_ms = 0.0
+
+    def wait_until(self, recv_ns):
+        self.now_ns = recv_ns
+        if self.speed is None:
+            return
+
+        if self._origin_ns is None:
+            self._origin_ns = recv_ns
+            self._start = time.perf_counter()
+            return
+
+        due = self._start + (recv_ns - self._origin_ns) / 1e9 / self.speed
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        elif delay < -0.001:
+            self.late += 1
+            self.max_late_ms = max(self.max_late_ms, -delay * 1000)
+
+    def day(self):
+        """
+        Recorded date of the message being replayed (ISO format).
+        """
+        if self.now_ns is None:
+            return datetime.date.today().isoformat()
+        return datetime.date.fromtimestamp(self.now_ns / 1e9).isoformat()
+
+
+def fire_resting_gtts(order_api, ticks):
+    """
+    The exchange sees each price before we do: let FakeOrderApi fire
+    the protective legs the ticks cross.
+    """
+    fired = 0
+    for tick in ticks:
+        fired += len(order_api.check_triggers(tick.inst_key, tick.ltp))
+    return fired
+
+
+def message_ticks(message):
+    ticks = (normalize_full_feed(k, f) for k, f in message.get("feeds", {}).items())
+    return [t for t in ticks if t is not None]
+
+
+def replay_session(path, speed=None, lockstep=False, start_ns=None, end_ns=None, trade_log=None,
+                   warm_start=False):
+    """
+    Feed one captured session through market_streamer.
+
+    speed: see ReplayClock
+    lockstep: wait for the workers after every message, so no tick is
+              conflated or shed and runs are repeatable
+    start_ns / end_ns: optional receive-time window
+    trade_log: CSV for closed trades (default logs/replay/<session>_trades.csv);
+               the event journal and the state log go next to it
+               (<session>_journal/, <session>_state/)
+    warm_start: resume from the state log of an earlier, interrupted run
+                of this session (e.g. with start_ns where it stopped)
+
+    Returns:
+        report dict
+    """
+    # imported here: the module builds the whole live stack on import
+    import core.market_streamer as ms
+
+    session = os.path.basename(os.path.normpath(path))
+    order_api = FakeOrderApi()
+
+    # the live journals must not keep a flusher / exit hook behind the swap
+    ms.trade_journal.close()
+    ms.state_journal.close(checkpoint=False)
+
+    ms.feed_recorder = None
+    ms.order_executor = OrderExecutor(order_api=order_api)
+    ms.protective_orders.executor = ms.order_executor
+    ms.trade_logger = TradeLogger(trade_log or os.path.join("logs", "replay", f"{session}_trades.csv"))
+    ms.trade_journal = TradeJournal(
+        os.path.join(os.path.dirname(ms.trade_logger.file_path), f"{session}_journal"),
+        fmt=ms.JOURNAL_FORMAT,
+        trade_log=ms.trade_logger
+    )
+
+    # trade on the date the session was recorded (its first record), not
+    # today: the state partition, signals_today and a warm start key on it
+    reader = FeedReader(path)
+    records = reader.read(start_ns=start_ns, end_ns=end_ns)
+    first = next(records, None)
+    clock = ReplayClock(speed)
+    if first is not None:
+        clock.now_ns = first[0]
+        records = itertools.chain([first], records)
+    ms.trading_day = clock.day
+
+    state_dir = os.path.join(os.path.dirname(ms.trade_logger.file_path), f"{session}_state")
+    if not warm_start:
+        shutil.rmtree(state_dir, ignore_errors=True)
+    ms.state_journal = StateJournal(state_dir, fsync_interval=ms.STATE_FSYNC_SEC,
+                                    snapshot_interval=ms.STATE_SNAPSHOT_SEC, enabled=ms.STATE_JOURNAL,
+                                    day=clock.day())
+    ms.warm_start()
+    ms.feed_pipeline.start()
+
+    messages = 0
+    gtts_fired = 0
+
+    start = time.perf_counter()
+    for recv_ns, kind, payload in records:
+        clock.wait_until(recv_ns)
+        if kind == KIND_RAW:
+            ticks = decode_frame(payload)
+            gtts_fired += fire_resting_gtts(order_api, ticks)
+            ms.on_ticks(ticks)
+        else:
+            gtts_fired += fire_resting_gtts(order_api, message_ticks(payload))
+            ms.on_message(payload)
+        messages += 1
+        if lockstep:
+            ms.feed_pipeline.wait_idle(poll=0.0001)
+            ms.order_dispatcher.wait_idle(poll=0.0001)
+            ms.protective_orders.wait_idle(poll=0.0001)
+    reader.close()
+
+    ms.feed_pipeline.wait_idle()
+    ms.order_dispatcher.wait_idle()
+    ms.protective_orders.wait_idle()
+    wall = time.perf_counter() - start
+    ms.trade_journal.close()
+    ms.state_journal.close()
+
+    pipeline = ms.feed_pipeline.stats()
+    if hasattr(ms.feed_pipeline, "stop"):
+        # processes mode: shut the strategy workers down
+        ms.feed_pipeline.stop()
+
+    return {
+        "session": session,
+        "messages": messages,
+        "wall_sec": round(wall, 3),
+        "msgs_per_sec": round(messages / wall, 1) if wall > 0 else None,
+        "ticks": pipeline["enqueued"],
+        "ticks_processed": pipeline["processed"],
+        # entries only; exits are under "protective" / "gtts_fired"
+        "orders": ms.order_dispatcher.acked,
+        "open_trades": len(ms.trade_monitor.active_trades),
+        "late_messages": clock.late,
+        "max_late_ms": round(clock.max_late_ms, 3),
+        "end_to_end": pipeline["end_to_end"],
+        "pipeline": pipeline,
+        "gates": ms.strategy_pipeline.stats(),
+        "orders_dispatch": ms.order_dispatcher.stats(),
+        "exits": ms.trade_monitor.stats(),
+        "exit_first": ms.exit_scheduler.stats(),
+        "protective": ms.protective_orders.stats(),
+        "journal": ms.trade_journal.stats(),
+        "state": ms.state_journal.stats(),
+        "gtts_fired": gtts_fired,
+        "resting_gtts": len(order_api.active_gtts()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a captured market data session")
+    parser.add_argument("path", help="capture session directory")
+    parser.add_argument("--speed", type=float, default=0, help="1 = real time, N = N x, 0 = max")
+    parser.add_argument("--lockstep", action="store_true", help="process every tick before the next message")
+    parser.add_argument("--trade-log", default=None)
+    parser.add_argument("--start-ns", type=int, default=None, help="skip messages received before this")
+    parser.add_argument("--end-ns", type=int, default=None, help="stop at messages received after this")
+    parser.add_argument("--warm-start", action="store_true", help="resume from the previous run's state log")
+    args = parser.parse_args()
+
+    report = replay_session(
+        args.path,
+        speed=args.speed,
+        lockstep=args.lockstep,
+        start_ns=args.start_ns,
+        end_ns=args.end_ns,
+        trade_log=args.trade_log,
+        warm_start=args.warm_start
+    )
+
+    print(f"[Replay] {report['session']}: {report['messages']} messages in {report['wall_sec']}s "
+          f"({report['msgs_per_sec']} msg/s), {report['orders']} orders")
+    print(f"[Replay] end-to-end {report['end_to_end']}")
+    print(f"[Replay] pipeline {report['pipeline']}")
+    print(f"[Replay] orders {report['orders_dispatch']}")
+    print(f"[Replay] exit-first {report['exit_first']}")
+    print(f"[Replay] protective {report['protective']} (GTTs fired {report['gtts_fired']}, resting {report['resting_gtts']})")
+    print(f"[Replay] journal {report['journal']}")
+    print(f"[Replay] state {report['state']}")
+    print(f"[Replay] late messages {report['late_messages']} (max {report['max_late_ms']} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,19 @@
+from urllib.parse import quote
+
 import requests
-from config.settings import ACCESS_TOKEN, API_BASE_URL
+from core.http_client import get_client
 
-def make_api_request(endpoint: str, method: str = "GET", params=None, data=None):
+def make_api_request(endpoint: str, method: str = "GET", params=None, data=None, category="standard", name=None):
     """
-    Make a basic REST API request to Upstox API.
-    Uses the ACCESS_TOKEN from config/settings.py
+    Make a REST API request to Upstox API.
+    Goes through the shared pooled client (core/http_client.py), which
+    adds the ACCESS_TOKEN from config/settings.py, timeouts, retries
+    for idempotent calls and rate limiting.
     """
-    url = API_BASE_URL + endpoint
-    headers = {
-        "Authorization": f"Bearer {ACCESS_TOKEN}",
-        "Accept": "application/json"
-    }
-
     try:
-        response = requests.request(method, url, headers=headers, params=params, json=data)
+        response = get_client().request(method, endpoint, params=params, json=data, category=category, name=name)
         response_data = response.json()
-    except Exception as e:
+    except (requests.RequestException, ValueError) as e:
         print(f"Error while making API call: {e}")
         return None
 
@@ -36,3 +34,36 @@ def get_user_profile():
     Test API call: Get Profile of authenticated user
     """
     return make_api_request("user/profile")
+
+
+def get_historical_candles(inst_key, interval, to_date, from_date=None):
+    """
+    Historical OHLC candles.
+
+    interval: "1minute", "30minute", "day", "week" or "month"
+    to_date / from_date: "YYYY-MM-DD"
+
+    Returns:
+        list of [timestamp, open, high, low, close, volume, oi] or None
+    """
+    endpoint = f"historical-candle/{quote(inst_key, safe='')}/{interval}/{to_date}"
+    if from_date:
+        endpoint += f"/{from_date}"
+
+    data = make_api_request(endpoint, name="GET historical-candle")
+    if data is None:
+        return None
+    return (data.get("data") or {}).get("candles", [])
+
+
+def get_order_status(order_id):
+    """
+    Latest state of one order ("complete", "rejected", "open", ...).
+
+    Returns:
+        order details dict or None
+    """
+    data = make_api_request("order/details", params={"order_id": order_id}, category="order")
+    if data is None:
+        return None
+    return data.get("data")
@@ -0,0 +1,555 @@
+# core/strategy_workers.py
+
+"""
+Strategy workers in separate processes.
+
+The universe is partitioned across worker processes (instrument pinned
+by crc32, as in FeedPipeline). Each worker owns its instruments' scanner,
+indicators, VWAP and gate pipeline; the scanner matrix rows, bar counts,
+VWAP sums and the latest published features live in one shared memory
+block (SharedBarStore), so the parent can read any instrument's state
+without asking the worker.
+
+The parent (execution process) keeps ingestion, bar building, exits,
+OrderExecutor, TradeMonitor and RiskManager. It sends only closed bars
+to the workers and gets only BUY / SELL decisions back.
+
+ProcessPipeline has FeedPipeline's interface (start / submit / wait_idle
+/ stats), so market_streamer can use either.
+
+Usage (scaling benchmark on a synthetic session, or a capture):
+    python -m core.strategy_workers --workers 1 2 4
+    python -m core.strategy_workers --capture data/captures/<session> --workers 1 2 4
+"""
+
+import multiprocessing as mp
+import threading
+import time
+import zlib
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from core.metrics import LatencyHistogram
+from core.records import BarRecord, SignalRecord
+from strategy.feature_cache import FeatureCache
+from strategy.gate_pipeline import GatePipeline
+from strategy.rolling_extrema import InstrumentRanges
+from strategy.scanner import FIELDS, MarketScanner
+from strategy.streaming_indicators import InstrumentIndicators
+from strategy.volatility_engine import VolatilityEngine
+from strategy.vwap_filter import VWAPCalculator
+
+# Published per instrument after every bar (NaN until available)
+FEATURES = ("close", "ema9", "ema21", "rsi14", "atr14", "adx14", "vwap")
+
+
+# -----------------------------
+# Shared memory
+# -----------------------------
+
+class SharedBarStore:
+    """
+    Scanner matrices and per-instrument state in one shared memory block.
+
+    Rows follow `keys`; a worker writes only its own contiguous row range.
+    A ring's latest value sits at (bar_count - 1) % max_len + max_len.
+    """
+
+    def __init__(self, keys, max_len, name=None):
+        """
+        keys: instrument keys in row order
+        max_len: scanner history length
+        name: attach to an existing block (None = create one)
+        """
+        self.keys = list(keys)
+        self.max_len = max_len
+        self.rows = {k: i for i, k in enumerate(self.keys)}
+
+        n = len(self.keys)
+        layout = [(field, (n, 2 * max_len), np.float64) for field in FIELDS]
+        layout += [
+            ("bar_counts", (n,), np.int64),
+            ("vwap_sums", (n, 2), np.float64),
+            ("features", (n, len(FEATURES)), np.float64),
+        ]
+        size = sum(int(np.prod(shape)) * np.dtype(dtype).itemsize for _, shape, dtype in layout)
+
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+
+        self.arrays = {}
+        offset = 0
+        for field, shape, dtype in layout:
+            array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+            offset += array.nbytes
+            self.arrays[field] = array
+
+        if self.owner:
+            for field, array in self.arrays.items():
+                array.fill(np.nan if field == "features" else 0)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def rows_view(self, start, end):
+        """
+        field -> rows [start, end) of the scanner matrices (views).
+        """
+        return {field: self.arrays[field][start:end] for field in FIELDS}
+
+    def features(self, inst_key) -> dict:
+        """
+        Latest published features of an instrument (None if unknown).
+        """
+        row = self.rows.get(inst_key)
+        if row is None:
+            return None
+        values = self.arrays["features"][row]
+        out = {name: (None if np.isnan(v) else float(v)) for name, v in zip(FEATURES, values)}
+        out["bars"] = int(self.arrays["bar_counts"][row])
+        return out
+
+    def close(self):
+        # views must go before the mapping can be closed
+        self.arrays = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# -----------------------------
+# Worker side
+# -----------------------------
+
+class StrategyPartition:
+    """
+    Strategy state for one slice of the universe (market_streamer's
+    get_features / commit_bar / evaluate_entry over a private scanner).
+    """
+
+    def __init__(self, keys, max_len=600, store=None, row_start=0):
+        matrix = store.rows_view(row_start, row_start + len(keys)) if store is not None else None
+        self.scanner = MarketScanner(max_len=max_len, universe=keys, matrix=matrix)
+        self.store = store
+        self.rows = {k: row_start + i for i, k in enumerate(keys)}
+
+        self.feature_caches = {}
+        self.pipeline = GatePipeline()
+
+    def get_features(self, inst_key):
+        features = self.feature_caches.get(inst_key)
+        if features is None:
+            features = FeatureCache(
+                inst_key,
+                scanner=self.scanner,
+                indicators=InstrumentIndicators(),
+                vol_engine=VolatilityEngine(period=14),
+                ranges=InstrumentRanges(),
+                vwap=VWAPCalculator()
+            )
+            self.feature_caches[inst_key] = features
+        return features
+
+    def on_bar(self, bar, ltp):
+        """
+        Commit a closed BarRecord and run the gates.
+
+        Returns:
+            SignalRecord or None
+        """
+        features = self.get_features(bar.inst_key)
+
+        self.scanner.update_bar(bar)
+        features.indicators.update(bar.close)
+        features.vol_engine.update(bar.high, bar.low, bar.close)
+        features.ranges.update(bar.close, bar.high, bar.low)
+        features.vwap.update(bar.close, bar.volume)
+
+        self.publish(bar.inst_key, features)
+
+        side = self.pipeline.evaluate(features, ltp)
+        if side not in ("BUY", "SELL"):
+            return None
+        return SignalRecord(bar.inst_key, side, ltp, bar.ts, time.time_ns())
+
+    def publish(self, inst_key, features):
+        row = self.rows.get(inst_key)
+        if self.store is None or row is None:
+            return
+
+        arrays = self.store.arrays
+        arrays["bar_counts"][row] = self.scanner.bar_count(inst_key)
+        arrays["vwap_sums"][row] = (features.vwap.price_volume_sum, features.vwap.volume_sum)
+
+        values = (
+            self.scanner.get_window(inst_key, "close", 1)[-1],
+            features.get("ema", 9),
+            features.get("ema", 21),
+            features.get("rsi", 14),
+            features.get("atr", 14),
+            features.get("adx", 14),
+            features.get("vwap"),
+        )
+        arrays["features"][row] = [np.nan if v is None else v for v in values]
+
+
+def worker_main(worker_id, store_name, universe, max_len, row_start, keys, inbox, outbox):
+    """
+    Worker process: closed bars in, decisions out.
+
+    inbox items: (sent_ns, [(bar_tuple, ltp), ...]) or None to stop
+    outbox items: (worker_id, sent_ns, n_bars, n_errors, [signal_tuple, ...])
+    """
+    store = SharedBarStore(universe, max_len, name=store_name)
+    partition = StrategyPartition(keys, max_len, store, row_start)
+
+    while True:
+        message = inbox.get()
+        if message is None:
+            break
+
+        sent_ns, items = message
+        signals = []
+        errors = 0
+
+        for bar_tuple, ltp in items:
+            try:
+                signal = partition.on_bar(BarRecord(*bar_tuple), ltp)
+            except Exception as e:
+                errors += 1
+                print(f"[StrategyWorker {worker_id}] Error processing {bar_tuple[0]}: {e}")
+                continue
+            if signal is not None:
+                signals.append((signal.inst_key, signal.side, signal.price, signal.bar_ts, signal.created_ns))
+
+        outbox.put((worker_id, sent_ns, len(items), errors, signals))
+
+    # the scanner's rings are views into the block
+    del partition
+    store.close()
+
+
+# -----------------------------
+# Parent side
+# -----------------------------
+
+class ProcessPipeline:
+    """
+    Ingestion-side bar building, strategy in worker processes.
+    """
+
+    def __init__(self, universe, bar_builder, on_signal, on_tick=None, num_workers=4, max_len=600):
+        """
+        universe: instrument keys to partition
+        bar_builder: BarBuilder fed with every tick (parent side)
+        on_signal: callable(SignalRecord), run on the collector thread
+        on_tick: optional callable(tick) after each tick (e.g. exits)
+        num_workers: worker processes
+        max_len: scanner history length
+        """
+        self.bar_builder = bar_builder
+        self.on_signal = on_signal
+        self.on_tick = on_tick
+        self.num_workers = num_workers
+        self.max_len = max_len
+
+        partitions = [[] for _ in range(num_workers)]
+        for key in universe:
+            partitions[self.shard_for(key)].append(key)
+        self.partitions = partitions
+
+        # shared rows grouped by worker, so each worker owns one block
+        self.keys = [k for part in partitions for k in part]
+
+        self.store = None
+        self.processes = []
+        self._inboxes = []
+        self._outbox = None
+        self._collector = None
+        self._lock = threading.Lock()
+
+        self._ticks = 0
+        self.bars_sent = 0
+        self.bars_processed = 0
+        self.signals = 0
+        self.errors = 0
+        self.replies = 0
+        self.decision_latency = LatencyHistogram()
+
+    def shard_for(self, inst_key):
+        # same placement rule as FeedPipeline
+        return zlib.crc32(inst_key.encode()) % self.num_workers
+
+    @property
+    def enqueued(self):
+        return self._ticks
+
+    def start(self):
+        ctx = mp.get_context("spawn")
+        self.store = SharedBarStore(self.keys, self.max_len)
+        self._outbox = ctx.Queue()
+
+        row_start = 0
+        for worker_id, keys in enumerate(self.partitions):
+            inbox = ctx.Queue()
+            p = ctx.Process(
+                target=worker_main,
+                args=(worker_id, self.store.name, self.keys, self.max_len, row_start, keys, inbox, self._outbox),
+                name=f"strategy-worker-{worker_id}",
+                daemon=True
+            )
+            p.start()
+            self._inboxes.append(inbox)
+            self.processes.append(p)
+            row_start += len(keys)
+
+        self._collector = threading.Thread(target=self._collect_loop, name="strategy-collector", daemon=True)
+        self._collector.start()
+        print(f"[ProcessPipeline] {self.num_workers} strategy workers, {len(self.keys)} instruments in shared memory")
+
+    def submit(self, tick, received_at=None):
+        """
+        Called from the feed callback: build the bar here, ship it to its
+        worker only when it closes.
+
+        received_at: accepted for FeedPipeline parity; bars are timed
+                     from when they are sent (decision_latency)
+        """
+        with self._lock:
+            self._ticks += 1
+
+        closed = self.bar_builder.update(
+            tick.inst_key, tick.bar_ts, tick.open, tick.high, tick.low, tick.close, tick.volume
+        )
+        if closed is not None:
+            self._send(self.shard_for(tick.inst_key), [(self._bar_tuple(closed), tick.ltp)])
+
+        if self.on_tick is not None:
+            self.on_tick(tick)
+        return True
+
+    def submit_bars(self, bars, batch_size=256):
+        """
+        Bulk path (replays / benchmarks): bars is a list of (BarRecord, ltp).
+        """
+        pending = [[] for _ in range(self.num_workers)]
+        for bar, ltp in bars:
+            worker = self.shard_for(bar.inst_key)
+            pending[worker].append((self._bar_tuple(bar), ltp))
+            if len(pending[worker]) >= batch_size:
+                self._send(worker, pending[worker])
+                pending[worker] = []
+
+        for worker, items in enumerate(pending):
+            if items:
+                self._send(worker, items)
+
+    @staticmethod
+    def _bar_tuple(bar):
+        return (bar.inst_key, bar.ts, bar.open, bar.high, bar.low, bar.close, bar.volume)
+
+    def _send(self, worker, items):
+        with self._lock:
+            self.bars_sent += len(items)
+        self._inboxes[worker].put((time.monotonic_ns(), items))
+
+    def warm_up(self, timeout=60.0, poll=0.005):
+        """
+        Round-trip an empty batch through every worker, so process start-up
+        and imports are not counted as work. Commits no bars.
+
+        Returns:
+            True if every worker answered, False on timeout
+        """
+        target = self.replies + self.num_workers
+        for inbox in self._inboxes:
+            inbox.put((time.monotonic_ns(), []))
+
+        deadline = time.monotonic() + timeout
+        while self.replies < target:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(poll)
+        return True
+
+    def _collect_loop(self):
+        while True:
+            message = self._outbox.get()
+            if message is None:
+                return
+
+            _, sent_ns, n_bars, errors, signals = message
+            self.replies += 1
+            if n_bars:
+                self.decision_latency.record((time.monotonic_ns() - sent_ns) / 1e9)
+
+            for fields in signals:
+                self.signals += 1
+                try:
+                    self.on_signal(SignalRecord(*fields))
+                except Exception as e:
+                    self.errors += 1
+                    print(f"[ProcessPipeline] Error handling signal {fields[0]}: {e}")
+
+            self.errors += errors
+            self.bars_processed += n_bars
+
+    def wait_idle(self, timeout=None, poll=0.005):
+        """
+        Block until every sent bar has come back from its worker.
+
+        Returns:
+            True if idle, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.bars_processed < self.bars_sent:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(poll)
+        return True
+
+    def stop(self, timeout=5.0):
+        for inbox in self._inboxes:
+            inbox.put(None)
+        for p in self.processes:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+
+        if self._outbox is not None:
+            self._outbox.put(None)
+            self._collector.join(timeout)
+
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+        self.processes = []
+        self._inboxes = []
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.num_workers,
+            "alive": sum(1 for p in self.processes if p.is_alive()),
+            "enqueued": self._ticks,
+            # ticks are fully handled on submit; bars in the workers
+            "processed": self._ticks,
+            "bars_sent": self.bars_sent,
+            "bars_processed": self.bars_processed,
+            "bars_pending": self.bars_sent - self.bars_processed,
+            "signals": self.signals,
+            "errors": self.errors,
+            "decision_latency": self.decision_latency.snapshot(),
+            # bar sent -> decision back, the process-mode end-to-end
+            "end_to_end": self.decision_latency.snapshot(),
+        }
+
+
+# -----------------------------
+# Scaling benchmark
+# -----------------------------
+
+def synthetic_bars(keys, bars_per_key=375, seed=1):
+    """
+    Random-walk 1-min session: list of (BarRecord, ltp), time-ordered.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(keys)
+    prices = rng.uniform(50, 5000, n)
+    out = []
+    for i in range(bars_per_key):
+        step = 1 + rng.normal(0, 0.002, n)
+        prices = prices * step
+        spread = np.abs(rng.normal(0, 0.001, n)) * prices
+        volumes = rng.integers(1, 10000, n)
+        ts = 1700000000000 + i * 60000
+        for j, key in enumerate(keys):
+            close = float(prices[j])
+            bar = BarRecord(key, ts, close, close + float(spread[j]), close - float(spread[j]), close, float(volumes[j]))
+            out.append((bar, close))
+    return out
+
+
+def capture_bars(path):
+    """
+    Closed bars from a recorded session, as the live bar builder sees them.
+    """
+    from core.feed_decoder import decode_frame
+    from core.feed_pipeline import normalize_full_feed
+    from core.feed_recorder import FeedReader, KIND_RAW
+    from strategy.bar_builder import BarBuilder
+
+    builder = BarBuilder()
+    out = []
+    with FeedReader(path) as reader:
+        for _, kind, payload in reader.read():
+            if kind == KIND_RAW:
+                ticks = decode_frame(payload)
+            else:
+                ticks = [normalize_full_feed(k, v) for k, v in payload.get("feeds", {}).items()]
+            for tick in ticks:
+                if tick is None:
+                    continue
+                closed = builder.update(tick.inst_key, tick.bar_ts, tick.open, tick.high, tick.low, tick.close, tick.volume)
+                if closed is not None:
+                    out.append((closed, tick.ltp))
+    return out
+
+
+def benchmark(bars, worker_counts=(1, 2, 4), max_len=600):
+    """
+    Bars / second through StrategyPartition in-process and through
+    ProcessPipeline with each worker count.
+    """
+    keys = list(dict.fromkeys(bar.inst_key for bar, _ in bars))
+    results = {"bars": len(bars), "instruments": len(keys), "cores": mp.cpu_count()}
+
+    partition = StrategyPartition(keys, max_len)
+    start = time.perf_counter()
+    for bar, ltp in bars:
+        partition.on_bar(bar, ltp)
+    results["in_process_bars_per_sec"] = round(len(bars) / (time.perf_counter() - start))
+
+    for n in worker_counts:
+        pipeline = ProcessPipeline(keys, bar_builder=None, on_signal=lambda s: None, num_workers=n, max_len=max_len)
+        pipeline.start()
+        # workers import and attach before the clock starts
+        pipeline.warm_up()
+
+        sent_before = pipeline.bars_sent
+        start = time.perf_counter()
+        pipeline.submit_bars(bars)
+        pipeline.wait_idle()
+        elapsed = time.perf_counter() - start
+        pipeline.stop()
+
+        results[f"workers_{n}_bars_per_sec"] = round((pipeline.bars_sent - sent_before) / elapsed)
+
+    return results
+
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Strategy worker scaling benchmark")
+    parser.add_argument("--capture", default=None, help="recorded session (default: synthetic)")
+    parser.add_argument("--instruments", type=int, default=480)
+    parser.add_argument("--bars", type=int, default=375, help="bars per instrument (synthetic)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    if args.capture:
+        bars = capture_bars(args.capture)
+    else:
+        with open("data/nifty500_keys.json", "r") as f:
+            keys = json.load(f)[:args.instruments]
+        bars = synthetic_bars(keys, args.bars)
+
+    print(f"[StrategyWorkers] {benchmark(bars, args.workers)}")
+
+
+if __name__ == "__main__":
+    main()
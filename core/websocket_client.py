@@ -1,26 +1,47 @@
 # core/websocket_client.py
 import json
+import time
 import websocket
 import threading
-import requests
-from config.settings import ACCESS_TOKEN
-import MarketDataFeedV3_pb2 as pb
+from core.http_client import get_client
+from upstox_client.feeder.proto import MarketDataFeedV3_pb2 as pb
+from core.feed_recorder import FeedRecorder
+from core.metrics import LatencyStats
 
 """
 WebSocket V3 client to connect to Upstox Market Data Feed,
 decode messages using protobuf, and print structured fields.
+
+The compiled FeedResponse comes from the SDK; the top-level
+MarketDataFeedV3_pb2.py is generated from an empty .proto.
 """
 
-def get_v3_authorized_url():
+AUTHORIZE_URL = "https://api.upstox.com/v3/feed/market-data-feed/authorize"
+
+# Example subscription, replaced by start_market_feed(instrument_keys=...)
+SUBSCRIBE_KEYS = [
+    "NSE_EQ|RELIANCE",
+    "NSE_INDEX|NIFTY 50",
+    "NSE_FO|<replace-with-futures-or-options>"
+]
+SUBSCRIBE_MODE = "full"
+
+# Set by start_market_feed(record=True); captures raw frames before decode
+feed_recorder = None
+
+# callable(FeedResponse), set by start_market_feed(handler=...)
+feed_handler = None
+
+# Time spent in ParseFromString per frame
+decode_stats = LatencyStats()
+frames_received = 0
+decode_errors = 0
+
+def get_v3_authorized_url(authorize_url=AUTHORIZE_URL):
     """
     Calls Upstox v3 feed authorization endpoint to get the real WebSocket URL.
     """
-    url = "https://api.upstox.com/v3/feed/market-data-feed/authorize"
-    headers = {
-        "Authorization": f"Bearer {ACCESS_TOKEN}",
-        "Accept": "application/json"
-    }
-    resp = requests.get(url, headers=headers)
+    resp = get_client().get(authorize_url)
     data = resp.json()
 
     if "data" not in data or "authorized_redirect_uri" not in data["data"]:
@@ -36,53 +57,72 @@ def on_open(ws):
     """
     print("WebSocket connection established.")
 
-    # Example subscription payload
     sub_req = {
         "guid": "sub1",
         "method": "sub",
         "data": {
-            "mode": "full",
-            "instrumentKeys": [
-                # Example instrument keys
-                "NSE_EQ|RELIANCE",
-                "NSE_INDEX|NIFTY 50",
-                "NSE_FO|<replace-with-futures-or-options>"
-            ]
+            "mode": SUBSCRIBE_MODE,
+            "instrumentKeys": SUBSCRIBE_KEYS
         }
     }
 
     # Send subscribe request
     ws.send(json.dumps(sub_req))
-    print("Sent subscription:", sub_req)
+    print(f"Sent subscription: {len(SUBSCRIBE_KEYS)} instruments, mode={SUBSCRIBE_MODE}")
+
+
+def print_feed(feed_response):
+    """
+    Default handler: print the main fields of every instrument.
+    """
+    for key, feed in feed_response.feeds.items():
+        print(f"Instrument: {key}")
+
+        data = feed.fullFeed.marketFF
+
+        # Last traded price
+        if feed.HasField("ltpc"):
+            print(" LTP:", feed.ltpc.ltp)
+        elif data.HasField("ltpc"):
+            print(" LTP:", data.ltpc.ltp)
+
+        # Print some depth / full mode info
+        for lvl in data.marketLevel.bidAskQuote:
+            print(f"  BidP: {lvl.bidP}, BidQ: {lvl.bidQ}, AskP: {lvl.askP}, AskQ: {lvl.askQ}")
+
+        # Example: Option Greeks (if present)
+        if data.HasField("optionGreeks"):
+            print("  Delta:", data.optionGreeks.delta)
+            print("  Gamma:", data.optionGreeks.gamma)
 
 
 def on_message(ws, message):
     """
     Called when a binary message arrives — decode it using Protobuf.
     """
+    global frames_received, decode_errors
+
+    frames_received += 1
+
     try:
+        start = time.perf_counter()
         feed_response = pb.FeedResponse()
         feed_response.ParseFromString(message)
+        decode_stats.record(time.perf_counter() - start)
+    except Exception as e:
+        decode_errors += 1
+        print("Error decoding message:", e)
+        if feed_recorder is not None:
+            feed_recorder.record_raw(message)
+        return
 
-        # Example: Iterate through feeds
-        for key, feed in feed_response.feeds.items():
-            print(f"Instrument: {key}")
-
-            # Last traded price
-            if feed.HasField("ltpc"):
-                print(" LTP:", feed.ltpc.ltp)
-
-            # Print some depth / full mode info
-            for lvl in feed.marketLevel.bidAskQuote:
-                print(f"  BidP: {lvl.bidP}, BidQ: {lvl.bidQ}, AskP: {lvl.askP}, AskQ: {lvl.askQ}")
-
-            # Example: Option Greeks (if present)
-            if feed.HasField("optionGreeks"):
-                print("  Delta:", feed.optionGreeks.delta)
-                print("  Gamma:", feed.optionGreeks.gamma)
+    if feed_recorder is not None:
+        feed_recorder.record_raw(message, instruments=list(feed_response.feeds))
 
+    try:
+        (feed_handler or print_feed)(feed_response)
     except Exception as e:
-        print("Error decoding message:", e)
+        print("Error handling message:", e)
 
 
 def on_error(ws, error):
@@ -93,17 +133,45 @@ def on_close(ws, close_status_code, close_msg):
     print("WebSocket closed:", close_status_code, close_msg)
 
 
-def start_market_feed():
+def start_market_feed(
+    instrument_keys=None,
+    mode="full",
+    authorize_url=AUTHORIZE_URL,
+    handler=None,
+    record=False,
+    capture_dir="data/captures"
+):
     """
     Main entry to run the V3 WebSocket feed.
+
+    instrument_keys / mode: subscription sent on open
+    authorize_url: feed authorization endpoint (point at
+                   core.mock_feed_server for offline load tests)
+    handler: callable(FeedResponse) per frame (default: print_feed)
+    record: capture raw protobuf frames with core.feed_recorder
+
+    Returns:
+        the WebSocketApp (call .close() to stop), or None
     """
-    ws_url = get_v3_authorized_url()
+    global feed_recorder, feed_handler, SUBSCRIBE_KEYS, SUBSCRIBE_MODE
+
+    if instrument_keys is not None:
+        SUBSCRIBE_KEYS = list(instrument_keys)
+    SUBSCRIBE_MODE = mode
+    feed_handler = handler
+
+    ws_url = get_v3_authorized_url(authorize_url)
     if not ws_url:
         print("Cannot start market feed.")
-        return
+        return None
 
     print("Connecting to:", ws_url)
 
+    if record:
+        feed_recorder = FeedRecorder(capture_dir)
+        feed_recorder.start()
+        print(f"[FeedRecorder] capturing to {feed_recorder.path}")
+
     ws = websocket.WebSocketApp(
         ws_url,
         on_open=on_open,
@@ -116,3 +184,5 @@ def start_market_feed():
     thread = threading.Thread(target=ws.run_forever)
     thread.daemon = True
     thread.start()
+
+    return ws
@@ -35,6 +35,24 @@ MAX_PARTIAL_EXITS = 5
 # -------- ORDER SETTINGS --------
 ORDER_TYPE = "LIMIT"      # Always "LIMIT" (not market)
 
+# -------- BROKER-SIDE PROTECTION --------
+# Once an entry is registered, rest GTT stop-loss / target legs at the
+# broker so exits trigger at the exchange, not when our feed catches up.
+# The stop leg follows the breakeven move.
+PROTECTIVE_ORDERS = True
+
+# Legs are only rested for the quantity the entry actually filled.
+# An entry still not complete after ENTRY_FILL_TIMEOUT_SEC is cancelled
+# and whatever filled is protected; status is polled every FILL_POLL_SEC.
+ENTRY_FILL_TIMEOUT_SEC = 30.0
+FILL_POLL_SEC = 0.5
+
+# The stop and target legs are independent GTTs: each resting leg is
+# polled every LEG_POLL_SEC, so a leg the exchange fires on a price our
+# feed never showed (or while we were down) cancels its sibling and
+# closes the trade here too.
+LEG_POLL_SEC = 1.0
+
 # -------- SAFETY LIMITS --------
 MAX_TRADES_PER_DAY = 15
 """
@@ -0,0 +1,241 @@
+# execution/fake_order_api.py
+
+"""
+In-process stand-in for upstox_client.OrderApiV3.
+
+Used by replays and load tests so no order ever leaves the machine.
+Responses are the real SDK models, so callers exercise the same
+parsing as in live trading.
+
+GTT legs rest here until check_triggers() sees a price cross them,
+standing in for the exchange firing a protective order.
+"""
+
+import itertools
+import random
+import threading
+import time
+
+import upstox_client
+from upstox_client.rest import ApiException
+
+
+class FakeOrderApi:
+    """
+    Accepts every order (unless told to reject) and remembers it.
+    """
+
+    def __init__(self, latency=0.0, reject_every=0, jitter=0.0, seed=None, fill_ratio=1.0):
+        """
+        latency: simulated round-trip per call (seconds)
+        reject_every: raise ApiException on every Nth order (0 = never)
+        jitter: extra uniform random delay in [0, jitter] per call (seconds)
+        seed: seed for the jitter
+        fill_ratio: share of each LIMIT order that fills at once; below 1
+                    the order stays "open" with the rest pending
+        """
+        self.latency = latency
+        self.reject_every = reject_every
+        self.jitter = jitter
+        self.fill_ratio = fill_ratio
+        self._rng = random.Random(seed)
+
+        self.orders = {}
+        self.gtt_orders = {}
+        self._resting = {}      # inst_key -> active GTTs, for check_triggers
+        self.calls = 0
+        self._ids = itertools.count(1)
+        self._gtt_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _next_id(self):
+        return f"FAKE{next(self._ids):010d}"
+
+    def _delay(self):
+        delay = self.latency
+        if self.jitter:
+            delay += self._rng.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+    def place_order(self, body, **kwargs):
+        self._delay()
+
+        with self._lock:
+            self.calls += 1
+            if self.reject_every and self.calls % self.reject_every == 0:
+                raise ApiException(status=400, reason="Rejected by FakeOrderApi")
+
+            order_id = self._next_id()
+            filled = int(body.quantity * self.fill_ratio)
+            self.orders[order_id] = {
+                "order_id": order_id,
+                "instrument_token": body.instrument_token,
+                "transaction_type": body.transaction_type,
+                "quantity": body.quantity,
+                "price": body.price,
+                "order_type": body.order_type,
+                "status": "complete" if filled == body.quantity else "open",
+                "filled_quantity": filled,
+                "pending_quantity": body.quantity - filled,
+                "average_price": body.price if filled else 0.0,
+                "placed_at": time.time(),
+            }
+
+        return upstox_client.PlaceOrderV3Response(
+            status="success",
+            data=upstox_client.MultiOrderV3Data(order_ids=[order_id]),
+            metadata=upstox_client.OrderMetadata(latency=int(self.latency * 1000))
+        )
+
+    def get_order_status(self, order_id):
+        """
+        Same shape as core/rest_api.get_order_status (or None if unknown).
+        """
+        with self._lock:
+            order = self.orders.get(order_id)
+            return dict(order) if order is not None else None
+
+    def cancel_order(self, order_id, **kwargs):
+        self._delay()
+
+        with self._lock:
+            self.calls += 1
+            order = self.orders.get(order_id)
+            if order is None or order["status"] != "open":
+                raise ApiException(status=400, reason=f"Order {order_id} is not open")
+            order["status"] = "cancelled"
+            order["pending_quantity"] = 0
+        return upstox_client.CancelOrderV3Response(
+            status="success",
+            data=upstox_client.CancelOrderData(order_id=order_id)
+        )
+
+    # ---------------- GTT ----------------
+
+    def _gtt_response(self, gtt_order_id):
+        return upstox_client.GttTriggerOrderResponse(
+            status="success",
+            data=upstox_client.GttOrderData(gtt_order_ids=[gtt_order_id]),
+            metadata=upstox_client.OrderMetadata(latency=int(self.latency * 1000))
+        )
+
+    def _active_gtt(self, gtt_order_id):
+        gtt = self.gtt_orders.get(gtt_order_id)
+        if gtt is None or gtt["status"] != "active":
+            raise ApiException(status=400, reason=f"GTT {gtt_order_id} is not active")
+        return gtt
+
+    def place_gtt_order(self, body, **kwargs):
+        self._delay()
+
+        rule = body.rules[0]
+        with self._lock:
+            self.calls += 1
+            gtt_order_id = f"FAKEGTT{next(self._gtt_ids):07d}"
+            gtt = {
+                "gtt_order_id": gtt_order_id,
+                "instrument_token": body.instrument_token,
+                "transaction_type": body.transaction_type,
+                "quantity": body.quantity,
+                "trigger_type": rule.trigger_type,
+                "trigger_price": rule.trigger_price,
+                "status": "active",
+                "placed_at": time.time(),
+            }
+            self.gtt_orders[gtt_order_id] = gtt
+            self._resting.setdefault(body.instrument_token, []).append(gtt)
+        return self._gtt_response(gtt_order_id)
+
+    def modify_gtt_order(self, body, **kwargs):
+        self._delay()
+
+        rule = body.rules[0]
+        with self._lock:
+            self.calls += 1
+            gtt = self._active_gtt(body.gtt_order_id)
+            gtt.update(quantity=body.quantity, trigger_type=rule.trigger_type, trigger_price=rule.trigger_price)
+        return self._gtt_response(body.gtt_order_id)
+
+    def cancel_gtt_order(self, body, **kwargs):
+        self._delay()
+
+        with self._lock:
+            self.calls += 1
+            gtt = self._active_gtt(body.gtt_order_id)
+            gtt["status"] = "cancelled"
+            self._resting[gtt["instrument_token"]].remove(gtt)
+        return self._gtt_response(body.gtt_order_id)
+
+    def get_gtt_order_details(self, gtt_order_id=None, **kwargs):
+        self._delay()
+
+        with self._lock:
+            self.calls += 1
+            gtt = self.gtt_orders.get(gtt_order_id)
+            if gtt is None:
+                raise ApiException(status=404, reason=f"GTT {gtt_order_id} not found")
+            rule = upstox_client.Rule(
+                strategy="ENTRY",
+                status=gtt["status"].upper(),
+                trigger_type=gtt["trigger_type"],
+                trigger_price=gtt["trigger_price"],
+                transaction_type=gtt["transaction_type"],
+                order_id=gtt.get("order_id")
+            )
+            details = upstox_client.GttOrderDetails(
+                type="SINGLE",
+                quantity=gtt["quantity"],
+                product="I",
+                rules=[rule],
+                instrument_token=gtt["instrument_token"],
+                gtt_order_id=gtt_order_id
+            )
+        return upstox_client.GetGttOrderResponse(status="success", data=[details])
+
+    def check_triggers(self, inst_key, ltp):
+        """
+        Fire active GTTs on inst_key whose trigger ltp has crossed;
+        each becomes a completed order at ltp.
+
+        Returns:
+            list of fired gtt_order_ids
+        """
+        fired = []
+        resting = self._resting.get(inst_key)
+        if not resting:
+            return fired
+
+        with self._lock:
+            for gtt in list(resting):
+                if gtt["trigger_type"] == "ABOVE" and ltp < gtt["trigger_price"]:
+                    continue
+                if gtt["trigger_type"] == "BELOW" and ltp > gtt["trigger_price"]:
+                    continue
+
+                order_id = self._next_id()
+                self.orders[order_id] = {
+                    "order_id": order_id,
+                    "instrument_token": inst_key,
+                    "transaction_type": gtt["transaction_type"],
+                    "quantity": gtt["quantity"],
+                    "price": ltp,
+                    "order_type": "MARKET",
+                    "status": "complete",
+                    "filled_quantity": gtt["quantity"],
+                    "pending_quantity": 0,
+                    "average_price": ltp,
+                    "placed_at": time.time(),
+                    "gtt_order_id": gtt["gtt_order_id"],
+                }
+                gtt["status"] = "triggered"
+                gtt["order_id"] = order_id
+                resting.remove(gtt)
+                fired.append(gtt["gtt_order_id"])
+        return fired
+
+    def active_gtts(self, inst_key=None):
+        with self._lock:
+            if inst_key is not None:
+                return list(self._resting.get(inst_key, ()))
+            return [g for gtts in self._resting.values() for g in gtts]
@@ -0,0 +1,202 @@
+# execution/order_dispatcher.py
+
+"""
+Non-blocking order dispatch.
+
+Signals go onto an outbound queue and a small pool of threads does the
+HTTP round-trips, so the feed / strategy side never waits on the broker.
+submit() returns a Future for the order result; on_ack / on_reject run
+on the dispatch thread once the broker has answered (e.g. to register
+the trade with TradeMonitor).
+
+Latency is split in two:
+    signal_to_send   SignalRecord.created_ns -> request leaves (queueing)
+    send_to_ack      request -> broker response (network + broker)
+
+Usage (demo against FakeOrderApi):
+    python -m execution.order_dispatcher
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from core.metrics import LatencyHistogram
+
+
+class OrderDispatcher:
+    """
+    Outbound order queue drained by a worker pool.
+    """
+
+    def __init__(self, place, workers=4, queue_size=256, max_signal_age=2.0):
+        """
+        place: callable(SignalRecord) -> order result dict or None
+               (e.g. wraps OrderExecutor.place_limit_order)
+        workers: concurrent order round-trips
+        queue_size: max signals waiting; beyond that submit() rejects
+        max_signal_age: signals older than this when a worker picks them
+                        up are not sent (seconds, None = never)
+        """
+        self.place = place
+        self.num_workers = workers
+        self.max_signal_age = max_signal_age
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._workers = []
+        self._start_lock = threading.Lock()
+        self._count_lock = threading.Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.acked = 0
+        self.rejected = 0
+        self.queue_full = 0
+        self.stale_dropped = 0
+        self.callback_errors = 0
+
+        self.signal_to_send = LatencyHistogram()
+        self.send_to_ack = LatencyHistogram()
+
+    def start(self):
+        with self._start_lock:
+            if self._workers:
+                return
+            for i in range(self.num_workers):
+                t = threading.Thread(target=self._worker_loop, name=f"order-{i}", daemon=True)
+                t.start()
+                self._workers.append(t)
+
+    def submit(self, signal, on_ack=None, on_reject=None):
+        """
+        Queue a signal for placement. Never blocks.
+
+        on_ack: callable(signal, order_result) after the broker accepted
+        on_reject: callable(signal, reason) if it was not placed; reason
+                   is "queue_full", "stale" or "order_failed"
+
+        Returns:
+            Future resolving to the order result dict, or None
+        """
+        if not self._workers:
+            self.start()
+
+        future = Future()
+        future.add_done_callback(lambda f: self._complete(f, signal, on_ack, on_reject))
+
+        with self._count_lock:
+            self.submitted += 1
+        try:
+            self._queue.put_nowait((signal, future))
+        except queue.Full:
+            with self._count_lock:
+                self.queue_full += 1
+            print(f"[OrderDispatcher] queue full, dropped {signal.inst_key}")
+            future.reason = "queue_full"
+            future.set_result(None)
+        return future
+
+    def _worker_loop(self):
+        while True:
+            signal, future = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            sent_ns = time.time_ns()
+            wait = (sent_ns - signal.created_ns) / 1e9
+            self.signal_to_send.record(wait)
+
+            if self.max_signal_age is not None and wait > self.max_signal_age:
+                with self._count_lock:
+                    self.stale_dropped += 1
+                print(f"[OrderDispatcher] signal for {signal.inst_key} is {wait:.2f}s old, not sent")
+                future.reason = "stale"
+                future.set_result(None)
+                continue
+
+            start = time.perf_counter()
+            try:
+                result = self.place(signal)
+            except Exception as e:
+                print(f"[OrderDispatcher] Error placing {signal.inst_key}: {e}")
+                result = None
+            self.send_to_ack.record(time.perf_counter() - start)
+
+            future.set_result(result)
+
+    def _complete(self, future, signal, on_ack, on_reject):
+        result = None if future.cancelled() else future.result()
+
+        try:
+            if result:
+                if on_ack is not None:
+                    on_ack(signal, result)
+            elif on_reject is not None:
+                on_reject(signal, getattr(future, "reason", "order_failed"))
+        except Exception as e:
+            with self._count_lock:
+                self.callback_errors += 1
+            print(f"[OrderDispatcher] Error in order callback for {signal.inst_key}: {e}")
+
+        with self._count_lock:
+            if result:
+                self.acked += 1
+            else:
+                self.rejected += 1
+            self.completed += 1
+
+    def wait_idle(self, timeout=None, poll=0.001):
+        """
+        Block until every submitted order has an outcome.
+
+        Returns:
+            True if idle, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.completed < self.submitted:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(poll)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.num_workers,
+            "queued": self._queue.qsize(),
+            "submitted": self.submitted,
+            "in_flight": self.submitted - self.completed,
+            "acked": self.acked,
+            "rejected": self.rejected,
+            "queue_full": self.queue_full,
+            "stale_dropped": self.stale_dropped,
+            "callback_errors": self.callback_errors,
+            "signal_to_send": self.signal_to_send.snapshot(),
+            "send_to_ack": self.send_to_ack.snapshot(),
+        }
+
+
+if __name__ == "__main__":
+    from core.records import SignalRecord
+    from execution.fake_order_api import FakeOrderApi
+    from execution.order_executor import OrderExecutor
+
+    executor = OrderExecutor(order_api=FakeOrderApi(latency=0.05, jitter=0.03, reject_every=10))
+    acked = []
+
+    dispatcher = OrderDispatcher(
+        lambda s: executor.place_limit_order(inst_key=s.inst_key, side=s.side, price=s.price),
+        workers=4
+    )
+
+    start = time.perf_counter()
+    for i in range(40):
+        dispatcher.submit(
+            SignalRecord(f"NSE_EQ|DEMO{i:04d}", "BUY", 100.0 + i, 0, time.time_ns()),
+            on_ack=lambda s, r: acked.append(r["order_id"])
+        )
+    submit_ms = (time.perf_counter() - start) * 1000
+
+    dispatcher.wait_idle()
+    print(f"[OrderDispatcher] 40 submits took {submit_ms:.2f} ms, {len(acked)} acked")
+    print(f"[OrderDispatcher] {dispatcher.stats()}")
@@ -4,24 +4,43 @@ import math
 import upstox_client
 from upstox_client.rest import ApiException
 from config.settings import ACCESS_TOKEN
+from core.rest_api import get_order_status
 from execution.execution_config import (
     CAPITAL_PER_TRADE,
     LIMIT_BUFFER_PCT
 )
 
+EXIT_SIDE = {"BUY": "SELL", "SELL": "BUY"}
+
+
 class OrderExecutor:
     """
-    Places limit orders using Upstox API.
+    Places limit orders and GTT protective legs using Upstox API.
     """
 
-    def __init__(self):
-        # Setup API client
-        config = upstox_client.Configuration()
-        config.access_token = ACCESS_TOKEN
-        self.api_client = upstox_client.ApiClient(config)
+    def __init__(self, order_api=None, order_status=None):
+        """
+        order_api: anything with OrderApiV3.place_order / *_gtt_order
+                   (e.g. FakeOrderApi for replays); defaults to the
+                   live Upstox API
+        order_status: callable(order_id) -> order details dict or None;
+                      defaults to order_api.get_order_status if it has
+                      one (FakeOrderApi), else the REST order/details call
+        """
+        if order_status is None:
+            order_status = getattr(order_api, "get_order_status", None) or get_order_status
+        self.order_status = order_status
+
+        if order_api is None:
+            # Setup API client
+            config = upstox_client.Configuration()
+            config.access_token = ACCESS_TOKEN
+            self.api_client = upstox_client.ApiClient(config)
 
-        # Order API (V3 recommended)
-        self.order_api = upstox_client.OrderApiV3(self.api_client)
+            # Order API (V3 recommended)
+            order_api = upstox_client.OrderApiV3(self.api_client)
+
+        self.order_api = order_api
 
     def calculate_quantity(self, price: float) -> int:
         """
@@ -38,14 +57,21 @@ class OrderExecutor:
         self,
         inst_key: str,
         side: str,
-        price: float
+        price: float,
+        qty: int | None = None
     ) -> dict | None:
         """
         Places a LIMIT order on Upstox using current LTP + buffer.
+
+        qty: shares to trade (default: sized from CAPITAL_PER_TRADE)
+
+        Returns:
+            {"order_id", "quantity", "price", "side", "response"} or None
         """
 
         # Determine quantity based on capital
-        qty = self.calculate_quantity(price)
+        if qty is None:
+            qty = self.calculate_quantity(price)
         if qty < 1:
             print(f"[OrderExecutor] Not enough capital for 1 share at ₹{price:.2f}. Skipped.")
             return None
@@ -77,12 +103,175 @@ class OrderExecutor:
 
         # Try placing the order
         try:
-            response = self.order_api.place_order(body)
+            response = self.order_api.place_order(body).to_dict()
             print(f"[OrderExecutor] Placed {side} LIMIT {qty} @ {round(limit_price,2)} for {inst_key}")
-            return response.to_dict()
         except ApiException as e:
             print(f"[OrderExecutor] API error placing order for {inst_key}: {e}")
             return None
         except Exception as e:
             print(f"[OrderExecutor] Unexpected error: {e}")
             return None
+
+        # V3 responds with {"status", "data": {"order_ids": [...]}, "metadata"}
+        order_ids = (response.get("data") or {}).get("order_ids") or [None]
+        return {
+            "order_id": order_ids[0],
+            "quantity": qty,
+            "price": round(limit_price, 2),
+            "side": side,
+            "response": response
+        }
+
+    def get_order_fill(self, order_id) -> dict | None:
+        """
+        Returns:
+            {"status", "filled_quantity", "pending_quantity", "average_price"
+            (None until something filled)} or None if the lookup failed
+        """
+        details = self.order_status(order_id)
+        if not details:
+            return None
+        return {
+            "status": (details.get("status") or "").lower(),
+            "filled_quantity": int(details.get("filled_quantity") or 0),
+            "pending_quantity": int(details.get("pending_quantity") or 0),
+            "average_price": float(details.get("average_price") or 0) or None,
+        }
+
+    def cancel_order(self, order_id) -> bool:
+        """
+        Cancel what is left of an open order.
+        """
+        try:
+            self.order_api.cancel_order(order_id)
+        except ApiException as e:
+            print(f"[OrderExecutor] API error cancelling order {order_id}: {e}")
+            return False
+        except Exception as e:
+            print(f"[OrderExecutor] Unexpected error cancelling order: {e}")
+            return False
+        return True
+
+    # ---------------- GTT protective legs ----------------
+
+    def place_protective_orders(
+        self,
+        inst_key: str,
+        side: str,
+        qty: int,
+        stop_loss: float,
+        target: float
+    ) -> dict:
+        """
+        Rest a stop-loss and a target leg at the broker for an open
+        position. Each is a SINGLE GTT on the exit side and the broker does
+        not link them: whichever fires first closes the position, and the
+        caller must cancel the other (ProtectiveOrderManager polls the legs).
+
+        side: side of the position ("BUY" = long)
+
+        Returns:
+            {"stop": gtt_order_id or None, "target": gtt_order_id or None}
+        """
+        stop_trigger, target_trigger = ("BELOW", "ABOVE") if side == "BUY" else ("ABOVE", "BELOW")
+        return {
+            "stop": self.place_gtt_leg(inst_key, EXIT_SIDE[side], qty, stop_trigger, stop_loss),
+            "target": self.place_gtt_leg(inst_key, EXIT_SIDE[side], qty, target_trigger, target),
+        }
+
+    def amend_protective_stop(self, gtt_order_id, side, qty, stop_loss) -> bool:
+        """
+        Move the stop leg of a position (side = position side).
+        """
+        return self.modify_gtt_trigger(gtt_order_id, qty, "BELOW" if side == "BUY" else "ABOVE", stop_loss)
+
+    def place_gtt_leg(self, inst_key, side, qty, trigger_type, trigger_price):
+        """
+        Returns:
+            gtt_order_id or None
+        """
+        body = upstox_client.GttPlaceOrderRequest(
+            type="SINGLE",
+            quantity=qty,
+            product="I",
+            rules=[self._gtt_rule(trigger_type, trigger_price)],
+            instrument_token=inst_key,
+            transaction_type=side
+        )
+
+        try:
+            response = self.order_api.place_gtt_order(body).to_dict()
+        except ApiException as e:
+            print(f"[OrderExecutor] API error placing GTT for {inst_key}: {e}")
+            return None
+        except Exception as e:
+            print(f"[OrderExecutor] Unexpected error placing GTT: {e}")
+            return None
+
+        gtt_ids = (response.get("data") or {}).get("gtt_order_ids") or [None]
+        print(f"[OrderExecutor] GTT {side} {qty} {trigger_type} {round(trigger_price, 2)} for {inst_key}")
+        return gtt_ids[0]
+
+    def modify_gtt_trigger(self, gtt_order_id, qty, trigger_type, trigger_price) -> bool:
+        """
+        Move a resting leg's trigger (e.g. stop to breakeven).
+        """
+        body = upstox_client.GttModifyOrderRequest(
+            type="SINGLE",
+            quantity=qty,
+            rules=[self._gtt_rule(trigger_type, trigger_price)],
+            gtt_order_id=gtt_order_id
+        )
+
+        try:
+            self.order_api.modify_gtt_order(body)
+        except ApiException as e:
+            print(f"[OrderExecutor] API error modifying GTT {gtt_order_id}: {e}")
+            return False
+        except Exception as e:
+            print(f"[OrderExecutor] Unexpected error modifying GTT: {e}")
+            return False
+        return True
+
+    def cancel_gtt_order(self, gtt_order_id) -> bool:
+        try:
+            self.order_api.cancel_gtt_order(upstox_client.GttCancelOrderRequest(gtt_order_id=gtt_order_id))
+        except ApiException as e:
+            print(f"[OrderExecutor] API error cancelling GTT {gtt_order_id}: {e}")
+            return False
+        except Exception as e:
+            print(f"[OrderExecutor] Unexpected error cancelling GTT: {e}")
+            return False
+        return True
+
+    def get_gtt_leg(self, gtt_order_id) -> dict | None:
+        """
+        State of a SINGLE GTT leg.
+
+        Returns:
+            {"status": rule status, "order_id": order placed when it
+            fired, None while it has not} or None if the lookup failed
+        """
+        try:
+            response = self.order_api.get_gtt_order_details(gtt_order_id=gtt_order_id).to_dict()
+        except ApiException as e:
+            print(f"[OrderExecutor] API error reading GTT {gtt_order_id}: {e}")
+            return None
+        except Exception as e:
+            print(f"[OrderExecutor] Unexpected error reading GTT: {e}")
+            return None
+
+        details = response.get("data") or []
+        rules = (details[0].get("rules") if details else None) or []
+        if not rules:
+            return None
+        return {"status": (rules[0].get("status") or "").upper(), "order_id": rules[0].get("order_id")}
+
+    @staticmethod
+    def _gtt_rule(trigger_type, trigger_price):
+        # SINGLE GTTs carry one ENTRY rule: the order placed when it fires
+        return upstox_client.GttRule(
+            strategy="ENTRY",
+            trigger_type=trigger_type,
+            trigger_price=round(trigger_price, 2)
+        )
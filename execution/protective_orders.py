@@ -0,0 +1,539 @@
+# execution/protective_orders.py
+
+"""
+Broker-resident protection for open trades.
+
+When an entry is acked, its fill is confirmed (order status) and a
+stop-loss and a target leg are rested at the broker as GTT orders for
+the filled quantity (OrderExecutor.place_protective_orders), so the exit
+triggers at the exchange even when our feed or pipeline is behind.
+
+    entry acked   poll the order until complete / rejected / cancelled
+                  (cancel the rest after ENTRY_FILL_TIMEOUT_SEC), then
+                  place stop + target legs for what filled
+    breakeven     amend the stop leg to the new stop (TradeMonitor hook)
+    leg fired     (polled) cancel the sibling leg and close the trade
+                  locally at the leg's fill (on_broker_exit)
+    local exit    STOP_LOSS / TARGET: check that leg really executed,
+                  cancel the other; anything not covered by an executed
+                  leg (PARTIAL_EXIT, unfired leg, no leg) gets a LIMIT exit
+
+The two legs are separate SINGLE GTTs the broker does not link, so
+every trade with legs resting is polled every leg_poll seconds: a leg
+can fire on a price our feed never showed, or while we were down
+(reconcile() checks restored legs right after a warm start). A sibling
+that could not be cancelled is checked too; if both executed, the
+extra quantity is bought / sold back instead of left as a reverse
+position.
+
+All broker calls run on one background thread in submission order, so a
+trade's place / amend / cancel never overtake each other and the feed
+thread never waits on HTTP.
+
+Usage (demo against FakeOrderApi):
+    python -m execution.protective_orders
+"""
+
+import queue
+import threading
+import time
+
+from core.metrics import LatencyHistogram
+from execution.execution_config import ENTRY_FILL_TIMEOUT_SEC, FILL_POLL_SEC, LEG_POLL_SEC
+from execution.order_executor import EXIT_SIDE
+
+# Local exit reason -> the broker leg that should have fired for it
+FIRED_LEG = {"STOP_LOSS": "stop", "TARGET": "target"}
+LEG_REASON = {leg: reason for reason, leg in FIRED_LEG.items()}
+
+# Order states after which the filled quantity no longer changes
+FILLED = "complete"
+DEAD = ("rejected", "cancelled")
+SETTLED = (FILLED,) + DEAD
+
+# GTT rule states of a leg that is gone without having fired
+LEG_GONE = ("CANCELLED", "EXPIRED", "FAILED")
+
+
+class ProtectiveOrderManager:
+    """
+    Keeps each open trade's GTT legs in step with TradeMonitor.
+    """
+
+    def __init__(self, executor, enabled=True, on_legs=None, on_settled=None, on_broker_exit=None,
+                 fill_timeout=ENTRY_FILL_TIMEOUT_SEC, fill_poll=FILL_POLL_SEC, leg_poll=LEG_POLL_SEC):
+        """
+        executor: OrderExecutor (order status, GTT place / modify / cancel,
+                  exit orders)
+        enabled: False = every hook is a no-op (local-only exits)
+        on_legs: optional callable(trade_id, legs) once a trade's legs rest
+                 (e.g. to persist the GTT ids)
+        on_settled: optional callable(trade_id, filled_qty) once an entry's
+                    fill is known (0 = nothing filled, drop the trade)
+        on_broker_exit: optional callable(trade_id, reason, exit_price) when
+                        a leg fired at the broker; closes the trade locally
+                        and returns False if it was already closed here
+        fill_timeout: seconds an entry may stay open before it is cancelled
+        fill_poll: seconds between order status checks of open entries
+        leg_poll: seconds between checks of the resting legs (None = never)
+        """
+        self.executor = executor
+        self.enabled = enabled
+        self.on_legs = on_legs
+        self.on_settled = on_settled
+        self.on_broker_exit = on_broker_exit
+        self.fill_timeout = fill_timeout
+        self.fill_poll = fill_poll
+        self.leg_poll = leg_poll
+
+        # Worker-thread state:
+        # legs      trade_id -> {"stop": gtt_order_id, "target": gtt_order_id}
+        # _pending  trade_id -> entry waiting for its fill
+        # _filled   trade_id -> filled quantity of a settled entry
+        # _positions trade_id -> instrument, side and leg levels of a
+        #            trade with legs resting
+        self.legs = {}
+        self._pending = {}
+        self._filled = {}
+        self._positions = {}
+        self._next_leg_poll = 0.0
+
+        # trades whose local exit is queued (set from any thread): a fill
+        # settling after that must not rest legs
+        self._closing = set()
+
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._count_lock = threading.Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.placed = 0
+        self.amended = 0
+        self.cancelled = 0
+        self.exit_orders = 0
+        self.unfilled = 0
+        self.partial_fills = 0
+        self.fill_timeouts = 0
+        self.unfired_legs = 0
+        self.broker_exits = 0
+        self.errors = 0
+
+        self.fill_latency = LatencyHistogram()
+        self.place_latency = LatencyHistogram()
+        self.amend_latency = LatencyHistogram()
+
+    def start(self):
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._worker_loop, name="protective-orders", daemon=True)
+                self._worker.start()
+
+    # ---------------- hooks (any thread, never block) ----------------
+
+    def on_entry(self, trade_id, trade):
+        """
+        Entry order acked (trade_id = its order id): confirm the fill,
+        then rest stop and target for the filled quantity.
+        Call under the lock that orders it against on_exit.
+        """
+        self._submit(self._entry, trade_id, trade.inst_key, trade.side, trade.qty, trade.stop_loss, trade.target)
+
+    def reconcile(self, trade_id, trade):
+        """
+        Take over legs restored by a warm start (self.legs) and check them
+        now: they may have fired while we were down.
+        """
+        self._submit(self._adopt, trade_id, trade.inst_key, trade.side, trade.qty, trade.stop_loss, trade.target)
+
+    def amend_stop(self, trade_id, trade):
+        """
+        TradeMonitor moved the stop (breakeven): follow it at the broker.
+        """
+        self._submit(self._amend, trade_id, trade.side, trade.qty, trade.stop_loss)
+
+    def on_exit(self, trade_id, trade, reason, exit_price):
+        """
+        TradeMonitor closed the trade locally.
+        """
+        if not self.enabled:
+            return
+        self._closing.add(trade_id)
+        self._submit(self._close, trade_id, trade.inst_key, trade.side, trade.qty, reason, exit_price)
+
+    def _submit(self, job, *args):
+        if not self.enabled:
+            return
+        if self._worker is None:
+            self.start()
+        with self._count_lock:
+            self.submitted += 1
+        self._queue.put((job, args, time.perf_counter()))
+
+    # ---------------- broker calls (worker thread) ----------------
+
+    def _worker_loop(self):
+        while True:
+            timeout = None
+            if self._pending:
+                timeout = self.fill_poll
+            if self.legs and self.leg_poll:
+                wait = max(self._next_leg_poll - time.monotonic(), 0.0)
+                timeout = wait if timeout is None else min(timeout, wait)
+
+            try:
+                job, args, submitted_at = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                job = None
+
+            if job is not None:
+                try:
+                    job(*args, submitted_at=submitted_at)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"[ProtectiveOrders] Error in {job.__name__} for {args[0]}: {e}")
+                with self._count_lock:
+                    self.completed += 1
+
+            if self._pending:
+                self._poll_fills()
+            if self.legs and self.leg_poll and time.monotonic() >= self._next_leg_poll:
+                self._poll_legs()
+
+    def _entry(self, trade_id, inst_key, side, qty, stop_loss, target, submitted_at):
+        self._pending[trade_id] = {
+            "inst_key": inst_key,
+            "side": side,
+            "qty": qty,
+            "stop_loss": stop_loss,
+            "target": target,
+            "submitted_at": submitted_at,
+            "deadline": time.monotonic() + self.fill_timeout,
+            "next_poll": 0.0,
+        }
+        self._check_fill(trade_id)
+
+    def _poll_fills(self):
+        now = time.monotonic()
+        for trade_id, entry in list(self._pending.items()):
+            if now >= entry["next_poll"]:
+                try:
+                    self._check_fill(trade_id)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"[ProtectiveOrders] Error checking fill of {trade_id}: {e}")
+
+    def _check_fill(self, trade_id):
+        entry = self._pending[trade_id]
+        fill = self.executor.get_order_fill(trade_id)
+
+        if fill is None or fill["status"] not in (FILLED,) + DEAD:
+            if time.monotonic() < entry["deadline"]:
+                entry["next_poll"] = time.monotonic() + self.fill_poll
+                return
+            # open too long: cancel the rest, protect what filled
+            self.fill_timeouts += 1
+            self.executor.cancel_order(trade_id)
+            fill = self.executor.get_order_fill(trade_id) or fill
+
+        del self._pending[trade_id]
+        self.fill_latency.record(time.perf_counter() - entry["submitted_at"])
+
+        if fill is None:
+            # no status at all: keep the requested size, flag for review
+            self.errors += 1
+            print(f"[ProtectiveOrders] {trade_id} fill unknown, assuming {entry['qty']}")
+            filled = entry["qty"]
+        else:
+            filled = min(fill["filled_quantity"], entry["qty"])
+        self._settle(trade_id, entry, filled)
+
+    def _settle(self, trade_id, entry, filled):
+        self._filled[trade_id] = filled
+        if filled <= 0:
+            self.unfilled += 1
+        elif filled < entry["qty"]:
+            self.partial_fills += 1
+
+        if self.on_settled is not None:
+            self.on_settled(trade_id, filled)
+
+        # nothing to protect, or the trade already closed locally (its
+        # _close is queued behind us and flattens the filled quantity)
+        if filled <= 0 or trade_id in self._closing:
+            return
+
+        start = time.perf_counter()
+        legs = self.executor.place_protective_orders(
+            entry["inst_key"], entry["side"], filled, entry["stop_loss"], entry["target"]
+        )
+        self.place_latency.record(time.perf_counter() - start)
+
+        legs = {name: gtt_id for name, gtt_id in legs.items() if gtt_id}
+        if len(legs) < 2:
+            self.errors += 1
+            print(f"[ProtectiveOrders] {trade_id} ({entry['inst_key']}) is only locally protected: {sorted(legs)} resting")
+        self.legs[trade_id] = legs
+        self._positions[trade_id] = {
+            "inst_key": entry["inst_key"],
+            "side": entry["side"],
+            "stop": entry["stop_loss"],
+            "target": entry["target"],
+        }
+        self.placed += len(legs)
+        if self.on_legs is not None:
+            self.on_legs(trade_id, legs)
+
+    def _amend(self, trade_id, side, qty, stop_loss, submitted_at):
+        entry = self._pending.get(trade_id)
+        if entry is not None:
+            # legs not placed yet: they will go in at the new stop
+            entry["stop_loss"] = stop_loss
+            return
+
+        gtt_id = self.legs.get(trade_id, {}).get("stop")
+        if gtt_id is None:
+            return
+        if trade_id in self._positions:
+            self._positions[trade_id]["stop"] = stop_loss
+        if self.executor.amend_protective_stop(gtt_id, side, self._filled.get(trade_id, qty), stop_loss):
+            self.amended += 1
+            self.amend_latency.record(time.perf_counter() - submitted_at)
+        else:
+            self.errors += 1
+
+    def _close(self, trade_id, inst_key, side, qty, reason, exit_price, submitted_at):
+        self._closing.discard(trade_id)
+
+        if trade_id in self._pending:
+            # closed before the entry settled: stop the entry first
+            entry = self._pending[trade_id]
+            entry["deadline"] = 0.0
+            self._closing.add(trade_id)
+            self._check_fill(trade_id)
+            self._closing.discard(trade_id)
+
+        qty = self._filled.pop(trade_id, qty)
+        legs = self.legs.pop(trade_id, {})
+        self._positions.pop(trade_id, None)
+        fired = FIRED_LEG.get(reason)
+
+        # whatever no executed broker leg took care of
+        remaining = qty - self._cancel_siblings(legs, fired, qty)
+        if fired in legs:
+            remaining -= self._leg_executed(legs[fired], qty, unknown=qty)
+        self._flatten(trade_id, inst_key, side, remaining, exit_price)
+
+    def _cancel_siblings(self, legs, fired, qty):
+        """
+        Cancel every leg but the fired one.
+
+        Returns:
+            quantity those legs executed anyway (cancel came too late)
+        """
+        executed = 0
+        for name, gtt_id in legs.items():
+            if name == fired:
+                continue
+            if self.executor.cancel_gtt_order(gtt_id):
+                self.cancelled += 1
+            else:
+                executed += self._leg_executed(gtt_id, qty, unknown=0)
+        return executed
+
+    def _leg_executed(self, gtt_id, qty, unknown):
+        """
+        Quantity the leg's order filled (or is working at the exchange).
+        A leg that has not fired is cancelled (if it still rests) and
+        counts 0; `unknown` is returned when its state cannot be read.
+        """
+        leg = self.executor.get_gtt_leg(gtt_id)
+        if leg is not None and leg["order_id"] is None:
+            if leg["status"] in LEG_GONE:
+                return 0
+            if self.executor.cancel_gtt_order(gtt_id):
+                self.unfired_legs += 1
+                return 0
+            # fired between the two calls
+            leg = self.executor.get_gtt_leg(gtt_id)
+
+        if leg is None or leg["order_id"] is None:
+            self.errors += 1
+            print(f"[ProtectiveOrders] GTT {gtt_id} state unknown, counting {unknown} executed")
+            return unknown
+
+        fill = self.executor.get_order_fill(leg["order_id"])
+        if fill is not None and fill["status"] in SETTLED:
+            return fill["filled_quantity"]
+        # still working at the exchange (or status unavailable)
+        return qty
+
+    def _flatten(self, trade_id, inst_key, side, remaining, price):
+        """
+        LIMIT order for what the legs left open; a negative remainder
+        means both legs executed and the excess is bought / sold back.
+        """
+        if remaining == 0:
+            return
+        if remaining > 0:
+            result = self.executor.place_limit_order(inst_key, EXIT_SIDE[side], price, qty=remaining)
+        else:
+            self.errors += 1
+            print(f"[ProtectiveOrders] {trade_id} ({inst_key}) both legs executed, reversing {-remaining}")
+            result = self.executor.place_limit_order(inst_key, side, price, qty=-remaining)
+
+        if result:
+            self.exit_orders += 1
+        else:
+            self.errors += 1
+
+    # ---------------- leg reconciliation (worker thread) ----------------
+
+    def _adopt(self, trade_id, inst_key, side, qty, stop_loss, target, submitted_at):
+        if trade_id not in self.legs or trade_id in self._closing:
+            return
+        self._filled[trade_id] = qty
+        self._positions[trade_id] = {"inst_key": inst_key, "side": side, "stop": stop_loss, "target": target}
+        self._check_legs(trade_id)
+
+    def _poll_legs(self):
+        self._next_leg_poll = time.monotonic() + self.leg_poll
+        for trade_id in list(self.legs):
+            # a queued local exit settles the legs itself
+            if trade_id in self._closing or trade_id not in self._positions:
+                continue
+            try:
+                self._check_legs(trade_id)
+            except Exception as e:
+                self.errors += 1
+                print(f"[ProtectiveOrders] Error checking legs of {trade_id}: {e}")
+
+    def _check_legs(self, trade_id):
+        """
+        Has either leg fired at the broker? Then cancel the other, close
+        the trade locally at the leg's fill and flatten any remainder.
+        """
+        legs = self.legs[trade_id]
+        position = self._positions[trade_id]
+
+        for name, gtt_id in list(legs.items()):
+            leg = self.executor.get_gtt_leg(gtt_id)
+            if leg is None or leg["order_id"] is None:
+                continue
+
+            qty = self._filled.get(trade_id, 0)
+            price = position[name]
+            fill = self.executor.get_order_fill(leg["order_id"])
+            if fill is not None and fill["status"] in SETTLED:
+                executed = fill["filled_quantity"]
+                if executed <= 0:
+                    # the leg's order died at the exchange: the other leg
+                    # and the local monitor still protect the trade
+                    del legs[name]
+                    self.errors += 1
+                    print(f"[ProtectiveOrders] {trade_id} {name} leg order {leg['order_id']} {fill['status']}")
+                    continue
+            else:
+                # working at the exchange: it will close the position
+                executed = qty
+            if fill is not None and fill["average_price"]:
+                price = fill["average_price"]
+
+            reason = LEG_REASON[name]
+            if self.on_broker_exit is not None and not self.on_broker_exit(trade_id, reason, price):
+                # closed locally meanwhile; its queued _close settles the legs
+                return
+
+            self.broker_exits += 1
+            del self.legs[trade_id]
+            del self._positions[trade_id]
+            self._filled.pop(trade_id, None)
+            print(f"[ProtectiveOrders] {trade_id} ({position['inst_key']}) {name} leg fired at the broker @ {price}")
+
+            remaining = qty - executed - self._cancel_siblings(legs, name, qty)
+            self._flatten(trade_id, position["inst_key"], position["side"], remaining, price)
+            return
+
+    # ---------------- monitoring ----------------
+
+    def wait_idle(self, timeout=None, poll=0.001):
+        """
+        Block until every queued broker call has been made and every
+        entry's fill is settled.
+
+        Returns:
+            True if idle, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.completed < self.submitted or self._pending:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(poll)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending": self.submitted - self.completed,
+            "awaiting_fill": len(self._pending),
+            "protected_trades": len(self.legs),
+            "legs_placed": self.placed,
+            "stops_amended": self.amended,
+            "legs_cancelled": self.cancelled,
+            "unfired_legs": self.unfired_legs,
+            "broker_exits": self.broker_exits,
+            "exit_orders": self.exit_orders,
+            "unfilled_entries": self.unfilled,
+            "partial_fills": self.partial_fills,
+            "fill_timeouts": self.fill_timeouts,
+            "errors": self.errors,
+            "fill_latency": self.fill_latency.snapshot(),
+            "place_latency": self.place_latency.snapshot(),
+            "amend_latency": self.amend_latency.snapshot(),
+        }
+
+
+if __name__ == "__main__":
+    from execution.fake_order_api import FakeOrderApi
+    from execution.order_executor import OrderExecutor
+    from execution.trade_monitor import TradeMonitor
+
+    api = FakeOrderApi(latency=0.02)
+    executor = OrderExecutor(order_api=api)
+    monitor = TradeMonitor()
+
+    def broker_exit(trade_id, reason, price):
+        trade = monitor.active_trades.get(trade_id)
+        if trade is None:
+            return False
+        monitor.remove_trade(trade_id)
+        print(f"[ProtectiveOrders] {trade_id} {reason} @ {price} at the broker, closed locally")
+        return True
+
+    manager = ProtectiveOrderManager(executor, on_broker_exit=broker_exit, leg_poll=0.05)
+    monitor.on_stop_moved = manager.amend_stop
+
+    def step(inst_key, ltp, exchange=True, feed=True):
+        # the exchange fires first, then our feed (maybe) sees the same price
+        fired = api.check_triggers(inst_key, ltp) if exchange else []
+        for trade_id, reason, price in monitor.check_trades({inst_key: ltp}) if feed else []:
+            trade = monitor.active_trades[trade_id]
+            manager.on_exit(trade_id, trade, reason, price)
+            monitor.remove_trade(trade_id)
+            print(f"[ProtectiveOrders] {trade_id} {reason} @ {price}, broker fired {fired}")
+        manager.wait_idle()
+
+    for inst_key, side in (("NSE_EQ|DEMO1", "BUY"), ("NSE_EQ|DEMO2", "SELL"), ("NSE_EQ|DEMO3", "BUY")):
+        order = executor.place_limit_order(inst_key, side, 100.0, qty=10)
+        manager.on_entry(order["order_id"], monitor.add_trade(order["order_id"], inst_key, side, 100.0, 10))
+    manager.wait_idle()
+
+    step("NSE_EQ|DEMO1", 100.6)     # breakeven: stop leg amended to 100
+    step("NSE_EQ|DEMO1", 99.9)      # stop leg fires at the broker, target cancelled
+    step("NSE_EQ|DEMO2", 98.7, feed=False)  # target fires on a print our feed missed
+    time.sleep(0.2)                 # the leg poll cancels the stop, closes the trade
+    step("NSE_EQ|DEMO3", 99.5, exchange=False)  # local stop, leg never fired: LIMIT exit
+
+    print(f"[ProtectiveOrders] open trades: {len(monitor.active_trades)}, resting GTTs: {len(api.active_gtts())}")
+    print(f"[ProtectiveOrders] {manager.stats()}")
@@ -38,6 +38,21 @@ class RiskManager:
         elif exit_reason == "PARTIAL_EXIT":
             self.partial_exits += 1
 
+    def counters(self) -> dict:
+        return {
+            "stop_losses": self.stop_losses,
+            "target_hits": self.target_hits,
+            "partial_exits": self.partial_exits,
+            "total_trades": self.total_trades,
+        }
+
+    def restore(self, counters: dict):
+        """
+        Set the daily counters from counters() (warm restart).
+        """
+        for name, value in counters.items():
+            setattr(self, name, value)
+
     def can_trade_now(self) -> bool:
         """
         Returns True if trading should still continue today
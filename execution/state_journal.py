@@ -0,0 +1,364 @@
+# execution/state_journal.py
+
+"""
+Crash-safe trading state: write-ahead log + periodic snapshots.
+
+Everything a restart must not forget is appended to the log as it
+changes, one JSON line per record:
+
+    signal   instrument signalled today (signals_today)
+    halt     new entries stopped (ALLOW_NEW_TRADES = False)
+    open     trade registered, with its full TrackedTrade state
+    update   stop / breakeven state of a trade changed
+    close    trade closed, with the reason (RiskManager counters)
+    unfilled entry never filled, trade dropped
+    legs     GTT stop / target legs resting for a trade
+
+Each append is a single write() on an O_APPEND file, so it survives a
+crash of the process; a background thread fsyncs every fsync_interval
+seconds (0 = fsync every record) against losing the OS cache as well.
+
+Every snapshot_interval seconds a checkpoint writes one compact snapshot
+(trading state plus scanner / VWAP / indicator state) and starts a new
+log segment; segments the snapshot covers are deleted. A warm restart
+loads the snapshot and replays only the records after it.
+
+    <directory>/date=YYYY-MM-DD/snapshot.pkl
+    <directory>/date=YYYY-MM-DD/wal-<first_seq>.log
+
+An unreadable snapshot is moved with its segments to unrecovered-<ns>/
+in the same partition and the day starts over, with seq continuing
+past the last record logged.
+"""
+
+import datetime
+import json
+import os
+import pickle
+import threading
+import time
+
+SNAPSHOT_FILE = "snapshot.pkl"
+
+
+class StateJournal:
+    """
+    Append-only state log with snapshots, one partition per trading day.
+    """
+
+    def __init__(self, directory="logs/state", fsync_interval=0.2, snapshot_interval=60.0,
+                 enabled=True, day=None):
+        """
+        directory: root of the daily partitions
+        fsync_interval: seconds between fsyncs of the log (0 = every record)
+        snapshot_interval: seconds between checkpoints (needs start())
+        enabled: False = append / checkpoint are no-ops, nothing is recovered
+        day: partition date (default today)
+        """
+        self.enabled = enabled
+        self.fsync_interval = fsync_interval
+        self.snapshot_interval = snapshot_interval
+        self.day = day or datetime.date.today().isoformat()
+        self.path = os.path.join(directory, f"date={self.day}")
+
+        self.seq = 0
+        self._fd = None
+        self._dirty = False
+        self._recovered = False
+        self._lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+
+        self._thread = None
+        self._stop = threading.Event()
+        self._checkpoint = None
+
+        self.appended = 0
+        self.bytes_written = 0
+        self.fsyncs = 0
+        self.snapshots = 0
+        self.snapshot_bytes = 0
+        self.snapshot_ms = 0.0
+        self.errors = 0
+
+    # ---------------- log ----------------
+
+    def append(self, kind, **fields):
+        """
+        Record one state change. Callers hold their own state lock, so
+        records are in the same order as the changes they describe.
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if self._fd is None:
+                self._open_segment()
+
+            self.seq += 1
+            line = json.dumps({"seq": self.seq, "kind": kind, **fields}, separators=(",", ":")) + "\n"
+            data = line.encode()
+            try:
+                os.write(self._fd, data)
+                if self.fsync_interval <= 0:
+                    os.fsync(self._fd)
+                    self.fsyncs += 1
+                else:
+                    self._dirty = True
+            except OSError as e:
+                self.errors += 1
+                print(f"[StateJournal] Error appending {kind}: {e}")
+                return
+
+            self.appended += 1
+            self.bytes_written += len(data)
+
+        if self._thread is None and self.fsync_interval > 0:
+            self.start()
+
+    def _open_segment(self):
+        # called with _lock held
+        if not self._recovered:
+            self._recover()
+        os.makedirs(self.path, exist_ok=True)
+        name = os.path.join(self.path, f"wal-{self.seq + 1:012d}.log")
+        self._fd = os.open(name, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        _fsync_dir(self.path)
+
+    def _sync(self):
+        with self._lock:
+            if self._fd is None or not self._dirty:
+                return
+            fd, self._dirty = self._fd, False
+            try:
+                os.fsync(fd)
+                self.fsyncs += 1
+            except OSError as e:
+                self.errors += 1
+                print(f"[StateJournal] fsync failed: {e}")
+
+    # ---------------- recovery ----------------
+
+    def recover(self):
+        """
+        Load the latest snapshot and the records logged after it.
+
+        Returns:
+            (snapshot dict or None, list of record dicts in seq order)
+        """
+        if not self.enabled:
+            return None, []
+        with self._lock:
+            return self._recover()
+
+    def _recover(self):
+        self._recovered = True
+        snapshot = None
+        covered = 0
+
+        snapshot_path = os.path.join(self.path, SNAPSHOT_FILE)
+        if os.path.exists(snapshot_path):
+            try:
+                with open(snapshot_path, "rb") as f:
+                    snapshot = pickle.load(f)
+                covered = snapshot["seq"]
+            except Exception as e:
+                # unreadable snapshot: the segments it covered are gone,
+                # so start over rather than restore half a day
+                self.errors += 1
+                print(f"[StateJournal] Ignoring unreadable snapshot {snapshot_path}: {e}")
+                self._set_aside()
+                return None, []
+
+        records = []
+        for name in self._segments():
+            for record in self._read_segment(os.path.join(self.path, name)):
+                if record["seq"] > covered:
+                    records.append(record)
+
+        self.seq = max([covered] + [r["seq"] for r in records])
+        return snapshot, records
+
+    def _set_aside(self):
+        # Move the bad snapshot and its orphaned segments out of the log,
+        # and carry seq on past them so numbers are never reused.
+        segments = self._segments()
+        last = 0
+        if segments:
+            last = int(segments[-1][4:-4]) - 1
+            records = self._read_segment(os.path.join(self.path, segments[-1]))
+            if records:
+                last = max(last, records[-1]["seq"])
+
+        aside = os.path.join(self.path, f"unrecovered-{time.time_ns()}")
+        os.makedirs(aside)
+        for name in segments + [SNAPSHOT_FILE]:
+            os.replace(os.path.join(self.path, name), os.path.join(aside, name))
+        _fsync_dir(self.path)
+
+        self.seq = last
+        print(f"[StateJournal] Moved {len(segments)} segment(s) to {aside}, continuing at seq {last + 1}")
+
+    def _segments(self):
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(n for n in os.listdir(self.path) if n.startswith("wal-") and n.endswith(".log"))
+
+    def _read_segment(self, path):
+        records = []
+        good = 0
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete record")
+                    records.append(json.loads(line))
+                except ValueError:
+                    # torn write at the crash point: drop it and the rest
+                    print(f"[StateJournal] Truncating {path} at byte {good} (torn record)")
+                    with open(path, "r+b") as w:
+                        w.truncate(good)
+                    break
+                good += len(line)
+        return records
+
+    # ---------------- snapshots ----------------
+
+    def rotate(self, capture):
+        """
+        Start a checkpoint: call capture() with appends held off and
+        switch to a new log segment. Call with the trading state lock
+        held, so the captured state matches the log position.
+
+        Returns:
+            (seq covered by the captured state, capture())
+        """
+        with self._lock:
+            seq = self.seq
+            captured = capture()
+            if self._fd is not None:
+                if self._dirty:
+                    os.fsync(self._fd)
+                    self.fsyncs += 1
+                    self._dirty = False
+                os.close(self._fd)
+                self._fd = None
+        return seq, captured
+
+    def write_snapshot(self, seq, trading, strategy=None):
+        """
+        Persist a snapshot atomically (temp file, fsync, rename), then
+        delete the log segments it covers.
+        """
+        start = time.perf_counter()
+        os.makedirs(self.path, exist_ok=True)
+        snapshot = {
+            "seq": seq,
+            "day": self.day,
+            "taken_ns": time.time_ns(),
+            "trading": trading,
+            "strategy": strategy,
+        }
+
+        tmp = os.path.join(self.path, SNAPSHOT_FILE + ".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        os.replace(tmp, os.path.join(self.path, SNAPSHOT_FILE))
+        _fsync_dir(self.path)
+
+        # a segment is named after its first seq; the snapshot covers
+        # every segment that started at or before seq
+        for name in self._segments():
+            if int(name[4:-4]) <= seq:
+                os.remove(os.path.join(self.path, name))
+
+        self.snapshots += 1
+        self.snapshot_bytes = size
+        self.snapshot_ms = round((time.perf_counter() - start) * 1000, 3)
+
+    def checkpoint(self):
+        """
+        Run the checkpoint callable given to start() now.
+        """
+        if not self.enabled or self._checkpoint is None:
+            return
+        with self._checkpoint_lock:
+            try:
+                self._checkpoint()
+            except Exception as e:
+                self.errors += 1
+                print(f"[StateJournal] Checkpoint failed: {e}")
+
+    # ---------------- background thread ----------------
+
+    def start(self, checkpoint=None):
+        """
+        Start the fsync / checkpoint thread.
+
+        checkpoint: optional callable taking a snapshot (rotate() +
+                    write_snapshot()), run every snapshot_interval seconds
+        """
+        if checkpoint is not None:
+            self._checkpoint = checkpoint
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="state-journal", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        interval = self.fsync_interval if self.fsync_interval > 0 else self.snapshot_interval
+        last_snapshot = time.monotonic()
+
+        while not self._stop.wait(interval):
+            self._sync()
+            if self._checkpoint is not None and time.monotonic() - last_snapshot >= self.snapshot_interval:
+                self.checkpoint()
+                last_snapshot = time.monotonic()
+
+    def close(self, checkpoint=True):
+        """
+        Stop the thread, take a last snapshot (if a checkpoint callable
+        was given) and fsync the log.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if checkpoint:
+            self.checkpoint()
+        self._sync()
+
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "seq": self.seq,
+            "appended": self.appended,
+            "bytes": self.bytes_written,
+            "fsyncs": self.fsyncs,
+            "snapshots": self.snapshots,
+            "snapshot_bytes": self.snapshot_bytes,
+            "snapshot_ms": self.snapshot_ms,
+            "errors": self.errors,
+        }
+
+
+def _fsync_dir(path):
+    # make a create / rename durable (not supported on every platform)
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,344 @@
+# execution/trade_journal.py
+
+"""
+Asynchronous, batched journal of trading events.
+
+    ENTRY    trade registered after the broker acked the entry order
+    EXIT     trade closed (stop / target / partial exit)
+    REJECT   entry signal that did not become a trade, with the reason
+    UNFILLED acked entry that never filled (trade dropped)
+
+The hot path (feed thread, order workers) only pushes one tuple into an
+in-memory ring. A background flusher drains it every flush_interval
+seconds, or as soon as flush_size records are waiting, and writes them
+in one go. Timestamps are epoch nanoseconds (time.time_ns()).
+
+Output is partitioned by day:
+
+    <directory>/date=YYYY-MM-DD/journal.csv          fmt="csv"
+    <directory>/date=YYYY-MM-DD/part-<ts_ns>.parquet fmt="parquet"
+                                                     (needs pyarrow)
+
+Closed trades also go to TradeLogger's master CSV, batched per flush.
+"""
+
+import atexit
+import csv
+import datetime
+import os
+import threading
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+COLUMNS = (
+    "ts_ns", "event", "trade_id", "instrument", "side", "quantity",
+    "price", "entry_price", "entry_ts_ns", "pnl_pct", "pnl_amount",
+    "reason", "strategy"
+)
+
+if pa is not None:
+    ARROW_SCHEMA = pa.schema([
+        ("ts_ns", pa.int64()),
+        ("event", pa.string()),
+        ("trade_id", pa.string()),
+        ("instrument", pa.string()),
+        ("side", pa.string()),
+        ("quantity", pa.int64()),
+        ("price", pa.float64()),
+        ("entry_price", pa.float64()),
+        ("entry_ts_ns", pa.int64()),
+        ("pnl_pct", pa.float64()),
+        ("pnl_amount", pa.float64()),
+        ("reason", pa.string()),
+        ("strategy", pa.string()),
+    ])
+
+
+class RecordRing:
+    """
+    Fixed-capacity ring between producers and the flusher.
+    push() never blocks: when the ring is full the record is refused.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._head = 0
+        self._size = 0
+        self.pushed = 0
+        self._lock = threading.Lock()
+
+    def push(self, record):
+        """
+        Returns:
+            records waiting after the push, or -1 if the ring was full
+        """
+        with self._lock:
+            if self._size == self.capacity:
+                return -1
+            self._slots[(self._head + self._size) % self.capacity] = record
+            self._size += 1
+            self.pushed += 1
+            return self._size
+
+    def drain(self):
+        """
+        Take every waiting record, oldest first.
+        """
+        with self._lock:
+            head, size, cap = self._head, self._size, self.capacity
+            if head + size <= cap:
+                batch = self._slots[head:head + size]
+            else:
+                batch = self._slots[head:] + self._slots[:head + size - cap]
+            for i in range(size):
+                self._slots[(head + i) % cap] = None
+            self._head = (head + size) % cap
+            self._size = 0
+        return batch
+
+    def __len__(self):
+        return self._size
+
+
+class TradeJournal:
+    """
+    Non-blocking journal: entry() / exit() / reject() enqueue,
+    a flusher thread persists.
+    """
+
+    def __init__(self, directory="logs/journal", fmt="csv", flush_interval=1.0,
+                 flush_size=256, ring_size=65536, trade_log=None):
+        """
+        directory: root of the daily partitions
+        fmt: "csv" or "parquet"
+        flush_interval: max seconds a record waits in the ring
+        flush_size: flush early once this many records are waiting
+        ring_size: max records waiting; beyond that new ones are dropped
+        trade_log: optional TradeLogger, gets closed trades per flush
+        """
+        if fmt not in ("csv", "parquet"):
+            raise ValueError(f"Unknown journal format: {fmt}")
+        if fmt == "parquet" and pa is None:
+            raise ImportError("fmt='parquet' needs pyarrow (pip install pyarrow)")
+
+        self.directory = directory
+        self.fmt = fmt
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.trade_log = trade_log
+
+        self._ring = RecordRing(ring_size)
+        self._wake = threading.Event()
+        self._stop = False
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        self.journaled = 0
+        self.dropped = 0
+        self.lost = 0
+        self.flushes = 0
+        self.write_errors = 0
+        self.events = {"ENTRY": 0, "EXIT": 0, "REJECT": 0, "UNFILLED": 0}
+
+        # flusher-thread state
+        self._csv_date = None
+        self._csv_file = None
+        self._csv_writer = None
+
+    # ---------------- hot path ----------------
+
+    def entry(self, trade_id, trade, strategy="elite_intraday_v1"):
+        self._push(("ENTRY", time.time_ns(), trade_id, trade.inst_key, trade.side, trade.qty,
+                    trade.entry_price, trade.entry_price, trade.open_ns, "", strategy))
+
+    def exit(self, trade_id, trade, exit_price, reason, strategy="elite_intraday_v1"):
+        self._push(("EXIT", time.time_ns(), trade_id, trade.inst_key, trade.side, trade.qty,
+                    exit_price, trade.entry_price, trade.open_ns, reason, strategy))
+
+    def unfilled(self, trade_id, trade, strategy="elite_intraday_v1"):
+        self._push(("UNFILLED", time.time_ns(), trade_id, trade.inst_key, trade.side, trade.qty,
+                    trade.entry_price, trade.entry_price, trade.open_ns, "", strategy))
+
+    def reject(self, signal, reason, strategy="elite_intraday_v1"):
+        """
+        signal: SignalRecord that was not turned into a trade
+        """
+        self._push(("REJECT", time.time_ns(), "", signal.inst_key, signal.side, 0,
+                    signal.price, None, None, reason, strategy))
+
+    def _push(self, record):
+        if self._thread is None:
+            self.start()
+
+        waiting = self._ring.push(record)
+        if waiting < 0:
+            self.dropped += 1
+        elif waiting >= self.flush_size:
+            self._wake.set()
+
+    # ---------------- flusher ----------------
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._flush_loop, name="trade-journal", daemon=True)
+            self._thread.start()
+            # flush what is pending on a normal interpreter exit
+            atexit.register(self.close)
+
+    def close(self):
+        """
+        Flush everything pending and stop the flusher.
+        """
+        if self._thread is None:
+            return
+        self._stop = True
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        self._stop = False
+        self._close_csv()
+        atexit.unregister(self.close)
+
+    def flush(self, timeout=None):
+        """
+        Ask for a flush now and wait until everything pushed so far
+        has been written (or failed to write).
+
+        Returns:
+            True if flushed, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        target = self._ring.pushed
+        self._wake.set()
+        while self.journaled + self.lost < target:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def _flush_loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            stopping = self._stop
+            self._wake.clear()
+
+            batch = self._ring.drain()
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    self.write_errors += 1
+                    self.lost += len(batch)
+                    print(f"[TradeJournal] Error writing {len(batch)} records: {e}")
+
+            if stopping:
+                return
+
+    def _write(self, batch):
+        rows = [self._row(record) for record in batch]
+
+        # one partition per day (rows are in time order)
+        start = 0
+        while start < len(rows):
+            day = _day(rows[start][0])
+            end = start
+            while end < len(rows) and _day(rows[end][0]) == day:
+                end += 1
+            if self.fmt == "csv":
+                self._write_csv(day, rows[start:end])
+            else:
+                self._write_parquet(day, rows[start:end])
+            start = end
+
+        if self.trade_log is not None:
+            closed = [self._trade_log_row(row) for row in rows if row[1] == "EXIT"]
+            if closed:
+                self.trade_log.write_rows(closed)
+
+        for row in rows:
+            self.events[row[1]] += 1
+        self.journaled += len(rows)
+        self.flushes += 1
+
+    @staticmethod
+    def _row(record):
+        event, ts_ns, trade_id, inst_key, side, qty, price, entry_price, entry_ns, reason, strategy = record
+
+        pnl_pct = pnl_amount = None
+        if event == "EXIT":
+            move = price - entry_price if side == "BUY" else entry_price - price
+            pnl_pct = round(move / entry_price * 100, 4)
+            pnl_amount = round(move * qty, 2)
+
+        return (ts_ns, event, trade_id, inst_key, side, qty, price, entry_price,
+                entry_ns, pnl_pct, pnl_amount, reason, strategy)
+
+    def _partition(self, day):
+        path = os.path.join(self.directory, f"date={day}")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _write_csv(self, day, rows):
+        if day != self._csv_date:
+            self._close_csv()
+            path = os.path.join(self._partition(day), "journal.csv")
+            new_file = not os.path.exists(path)
+            self._csv_file = open(path, "a", newline="")
+            self._csv_writer = csv.writer(self._csv_file)
+            if new_file:
+                self._csv_writer.writerow(COLUMNS)
+            self._csv_date = day
+
+        self._csv_writer.writerows(rows)
+        self._csv_file.flush()
+
+    def _close_csv(self):
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = self._csv_writer = None
+            self._csv_date = None
+
+    def _write_parquet(self, day, rows):
+        # Parquet files are immutable: one part file per flush and day
+        columns = {name: [row[i] for row in rows] for i, name in enumerate(COLUMNS)}
+        table = pa.Table.from_pydict(columns, schema=ARROW_SCHEMA)
+        pq.write_table(table, os.path.join(self._partition(day), f"part-{rows[0][0]}.parquet"))
+
+    def _trade_log_row(self, row):
+        ts_ns, _, _, inst_key, side, qty, price, entry_price, entry_ns, _, _, reason, strategy = row
+        return self.trade_log.trade_row(
+            instrument=inst_key,
+            side=side,
+            quantity=qty,
+            entry_price=entry_price,
+            exit_price=price,
+            entry_time=datetime.datetime.fromtimestamp(entry_ns / 1e9),
+            exit_time=datetime.datetime.fromtimestamp(ts_ns / 1e9),
+            exit_reason=reason,
+            strategy=strategy
+        )
+
+    def stats(self) -> dict:
+        return {
+            "format": self.fmt,
+            "pending": len(self._ring),
+            "journaled": self.journaled,
+            "dropped": self.dropped,
+            "lost": self.lost,
+            "flushes": self.flushes,
+            "write_errors": self.write_errors,
+            "events": dict(self.events),
+        }
+
+
+def _day(ts_ns):
+    return datetime.date.fromtimestamp(ts_ns / 1e9).isoformat()
@@ -35,7 +35,7 @@ class TradeLogger:
                     "remarks"
                 ])
 
-    def log_trade(
+    def trade_row(
         self,
         instrument: str,
         side: str,
@@ -49,7 +49,7 @@ class TradeLogger:
         remarks: str = ""
     ):
         """
-        Append one completed trade to the master CSV.
+        One completed trade as a master CSV row.
         """
 
         pnl_pct = (
@@ -64,20 +64,57 @@ class TradeLogger:
             else (entry_price - exit_price) * quantity
         )
 
+        return [
+            entry_time.date().isoformat(),
+            entry_time.strftime("%H:%M:%S"),
+            exit_time.strftime("%H:%M:%S"),
+            instrument,
+            side,
+            quantity,
+            round(entry_price, 2),
+            round(exit_price, 2),
+            round(pnl_pct, 2),
+            round(pnl_amount, 2),
+            exit_reason,
+            strategy,
+            remarks
+        ]
+
+    def write_rows(self, rows):
+        """
+        Append a batch of rows with one open (TradeJournal's flusher).
+        """
         with open(self.file_path, mode="a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                entry_time.date().isoformat(),
-                entry_time.strftime("%H:%M:%S"),
-                exit_time.strftime("%H:%M:%S"),
-                instrument,
-                side,
-                quantity,
-                round(entry_price, 2),
-                round(exit_price, 2),
-                round(pnl_pct, 2),
-                round(pnl_amount, 2),
-                exit_reason,
-                strategy,
-                remarks
-            ])
+            csv.writer(f).writerows(rows)
+
+    def log_trade(self, **kwargs):
+        """
+        Append one completed trade to the master CSV
+        (same arguments as trade_row).
+        """
+        self.write_rows([self.trade_row(**kwargs)])
+
+    def log_closed_trade(
+        self,
+        trade,
+        exit_price: float,
+        exit_time: datetime.datetime,
+        exit_reason: str,
+        strategy: str = "elite_intraday_v1",
+        remarks: str = ""
+    ):
+        """
+        Append a closed TrackedTrade.
+        """
+        self.log_trade(
+            instrument=trade.inst_key,
+            side=trade.side,
+            quantity=trade.qty,
+            entry_price=trade.entry_price,
+            exit_price=exit_price,
+            entry_time=trade.open_time,
+            exit_time=exit_time,
+            exit_reason=exit_reason,
+            strategy=strategy,
+            remarks=remarks
+        )
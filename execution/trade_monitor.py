@@ -1,6 +1,9 @@
 # execution/trade_monitor.py
 
+import bisect
+import time
 from datetime import datetime
+from operator import itemgetter
 from execution.execution_config import (
     STOP_LOSS_PCT,
     TARGET_PCT,
@@ -9,11 +12,22 @@ from execution.execution_config import (
     PARTIAL_EXIT_LIMIT_PCT
 )
 
+ABOVE = "above"   # fires when ltp >= level
+BELOW = "below"   # fires when ltp <= level
+
+_level = itemgetter(0)
+
+
 class TrackedTrade:
     """
     Holds state for a live trade.
     """
 
+    __slots__ = (
+        "inst_key", "side", "entry_price", "qty", "stop_loss", "target",
+        "breakeven_level", "breakeven_moved", "partial_exit_done", "is_closed", "open_time", "open_ns"
+    )
+
     def __init__(self, inst_key, side, entry_price, qty):
         self.inst_key = inst_key
         self.side = side          # "BUY" or "SELL"
@@ -22,11 +36,16 @@ class TrackedTrade:
 
         self.stop_loss = self.calc_stop_loss(entry_price, side)
         self.target = self.calc_target(entry_price, side)
+
+        # Favourable-move level for the breakeven step
+        self.breakeven_level = self.calc_level(entry_price, side, BREAKEVEN_MOVE_PCT)
+
         self.breakeven_moved = False
         self.partial_exit_done = False
         self.is_closed = False
 
         self.open_time = datetime.now()
+        self.open_ns = time.time_ns()
 
     def calc_stop_loss(self, entry_price, side):
         if side == "BUY":
@@ -40,86 +59,256 @@ class TrackedTrade:
         else:
             return entry_price * (1 - TARGET_PCT)
 
+    @staticmethod
+    def calc_level(entry_price, side, move_pct):
+        if side == "BUY":
+            return entry_price * (1 + move_pct)
+        return entry_price * (1 - move_pct)
+
     def get_current_profit_pct(self, current_price):
         if self.side == "BUY":
             return (current_price - self.entry_price) / self.entry_price
         return (self.entry_price - current_price) / self.entry_price
 
+    def reached(self, ltp, level):
+        """
+        Price at or beyond `level` in the trade's favour.
+        """
+        return ltp >= level if self.side == "BUY" else ltp <= level
+
+    def fell_back(self, ltp, level):
+        """
+        Price at or beyond `level` against the trade.
+        """
+        return ltp <= level if self.side == "BUY" else ltp >= level
+
+    def to_state(self) -> dict:
+        """
+        Everything needed to rebuild this trade (see from_state).
+        """
+        return {name: getattr(self, name) for name in self.__slots__ if name != "open_time"}
+
+    @classmethod
+    def from_state(cls, state):
+        trade = cls(state["inst_key"], state["side"], state["entry_price"], state["qty"])
+        for name, value in state.items():
+            if name in cls.__slots__:
+                setattr(trade, name, value)
+        trade.open_time = datetime.fromtimestamp(trade.open_ns / 1e9)
+        return trade
+
+    def triggers(self):
+        """
+        Levels that can change this trade's state right now.
+
+        Returns:
+            list of (direction, level, kind)
+        """
+        up, down = (ABOVE, BELOW) if self.side == "BUY" else (BELOW, ABOVE)
+
+        levels = [(down, self.stop_loss, "STOP_LOSS"), (up, self.target, "TARGET")]
+        if not self.breakeven_moved:
+            levels.append((up, self.breakeven_level, "BREAKEVEN"))
+        return levels
+
+
+class TriggerIndex:
+    """
+    Trigger levels of open trades by instrument, each side kept sorted,
+    so a price update only visits trades whose level it crossed.
+
+        above[inst_key]  ascending [(level, trade_id, kind)], fire ltp >= level
+        below[inst_key]  ascending [(level, trade_id, kind)], fire ltp <= level
+    """
+
+    def __init__(self):
+        self.above = {}
+        self.below = {}
+
+    def add(self, inst_key, direction, level, trade_id, kind):
+        side = self.above if direction == ABOVE else self.below
+        bisect.insort(side.setdefault(inst_key, []), (level, trade_id, kind))
+
+    def remove(self, inst_key, direction, level, trade_id, kind):
+        side = self.above if direction == ABOVE else self.below
+        levels = side.get(inst_key)
+        if not levels:
+            return
+
+        entry = (level, trade_id, kind)
+        i = bisect.bisect_left(levels, entry)
+        if i < len(levels) and levels[i] == entry:
+            del levels[i]
+        if not levels:
+            del side[inst_key]
+
+    def crossed(self, inst_key, ltp):
+        """
+        Returns:
+            trade ids with at least one level crossed at ltp
+        """
+        hit = set()
+
+        levels = self.above.get(inst_key)
+        if levels:
+            for i in range(bisect.bisect_right(levels, ltp, key=_level)):
+                hit.add(levels[i][1])
+
+        levels = self.below.get(inst_key)
+        if levels:
+            for i in range(bisect.bisect_left(levels, ltp, key=_level), len(levels)):
+                hit.add(levels[i][1])
+
+        return hit
+
+    def __contains__(self, inst_key):
+        return inst_key in self.above or inst_key in self.below
+
+    def __len__(self):
+        return sum(map(len, self.above.values())) + sum(map(len, self.below.values()))
+
 
 class TradeMonitor:
     """
     Monitors live trades and triggers exit logic.
+
+    Open trades are indexed by instrument and trigger level (TriggerIndex),
+    so check_trades costs O(log n) per price update plus the trades that
+    actually crossed a level, not a pass over every open trade.
     """
 
-    def __init__(self):
+    def __init__(self, on_stop_moved=None, on_state_changed=None):
+        """
+        on_stop_moved: optional callable(trade_id, trade) after the stop
+                       is moved (e.g. to amend a broker-side stop leg)
+        on_state_changed: optional callable(trade_id, trade) after a check
+                          changed an open trade (breakeven step)
+        """
         self.active_trades = {}
+        self.on_stop_moved = on_stop_moved
+        self.on_state_changed = on_state_changed
+        self.index = TriggerIndex()
+        self._indexed = {}   # trade_id -> triggers currently in the index
+
+        self.checks = 0
+        self.evaluated = 0
 
     def add_trade(self, trade_id, inst_key, side, entry_price, qty):
-        self.active_trades[trade_id] = TrackedTrade(
-            inst_key, side, entry_price, qty
-        )
+        trade = TrackedTrade(inst_key, side, entry_price, qty)
+        self.active_trades[trade_id] = trade
+        self._reindex(trade_id, trade)
+        return trade
+
+    def restore_trade(self, trade_id, state):
+        """
+        Re-create (or overwrite) an open trade from TrackedTrade.to_state().
+        """
+        trade = TrackedTrade.from_state(state)
+        self.active_trades[trade_id] = trade
+        self._reindex(trade_id, trade)
+        return trade
 
     def remove_trade(self, trade_id):
         if trade_id in self.active_trades:
-            del self.active_trades[trade_id]
+            trade = self.active_trades.pop(trade_id)
+            self._unindex(trade_id, trade)
+
+    def has_position(self, inst_key):
+        """
+        Any open trade on this instrument (cheap; safe from the feed thread).
+        """
+        return inst_key in self.index
+
+    def open_instruments(self):
+        return len(set(self.index.above) | set(self.index.below))
+
+    def _unindex(self, trade_id, trade):
+        for direction, level, kind in self._indexed.pop(trade_id, ()):
+            self.index.remove(trade.inst_key, direction, level, trade_id, kind)
+
+    def _reindex(self, trade_id, trade):
+        self._unindex(trade_id, trade)
+        if trade.is_closed:
+            return
+
+        levels = trade.triggers()
+        for direction, level, kind in levels:
+            self.index.add(trade.inst_key, direction, level, trade_id, kind)
+        self._indexed[trade_id] = levels
 
     def check_trades(self, current_prices):
         """
-        Check each active trade against exit conditions.
+        Check trades on the updated instruments against exit conditions.
 
         current_prices: dict { inst_key: current_price }
+
+        Returns:
+            list of (trade_id, reason, exit_price)
         """
 
         exits = []
 
-        for trade_id, trade in list(self.active_trades.items()):
-            if trade.is_closed:
-                continue
-
-            ltp = current_prices.get(trade.inst_key)
+        for inst_key, ltp in current_prices.items():
             if ltp is None:
                 continue
 
-            profit_pct = trade.get_current_profit_pct(ltp)
+            self.checks += 1
+            for trade_id in self.index.crossed(inst_key, ltp):
+                trade = self.active_trades.get(trade_id)
+                if trade is None or trade.is_closed:
+                    continue
 
-            # 1) STOP LOSS
-            if trade.side == "BUY" and ltp <= trade.stop_loss:
-                exits.append((trade_id, "STOP_LOSS", ltp))
-                trade.is_closed = True
-                continue
-            if trade.side == "SELL" and ltp >= trade.stop_loss:
-                exits.append((trade_id, "STOP_LOSS", ltp))
-                trade.is_closed = True
-                continue
+                self.evaluated += 1
+                reason = self._evaluate(trade_id, trade, ltp)
+                if reason is not None:
+                    exits.append((trade_id, reason, ltp))
+                    trade.is_closed = True
+                elif self.on_state_changed is not None:
+                    # a crossed level that is not an exit moved the stop
+                    self.on_state_changed(trade_id, trade)
+                self._reindex(trade_id, trade)
 
-            # 2) TARGET
-            if trade.side == "BUY" and ltp >= trade.target:
-                exits.append((trade_id, "TARGET", ltp))
-                trade.is_closed = True
-                continue
-            if trade.side == "SELL" and ltp <= trade.target:
-                exits.append((trade_id, "TARGET", ltp))
-                trade.is_closed = True
-                continue
+        return exits
 
-            # 3) BREAKEVEN STEP
-            if not trade.breakeven_moved:
-                if profit_pct >= BREAKEVEN_MOVE_PCT:
-                    trade.stop_loss = trade.entry_price
-                    trade.breakeven_moved = True
-
-            # 4) PARTIAL EXIT (0.7 move then fail back)
-            if not trade.partial_exit_done:
-                if profit_pct >= PARTIAL_EXIT_MOVE_PCT:
-                    # reached the zone for partial exit
-                    # now check if retraces below threshold
-                    if trade.side == "BUY" and ltp <= trade.entry_price * (1 + PARTIAL_EXIT_LIMIT_PCT):
-                        exits.append((trade_id, "PARTIAL_EXIT", ltp))
-                        trade.is_closed = True
-                        continue
-                    if trade.side == "SELL" and ltp >= trade.entry_price * (1 - PARTIAL_EXIT_LIMIT_PCT):
-                        exits.append((trade_id, "PARTIAL_EXIT", ltp))
-                        trade.is_closed = True
-                        continue
+    def _evaluate(self, trade_id, trade, ltp):
+        """
+        Apply the exit rules to one trade at ltp.
 
-        return exits
+        Returns:
+            exit reason or None (state may still change)
+        """
+
+        # 1) STOP LOSS
+        if trade.fell_back(ltp, trade.stop_loss):
+            return "STOP_LOSS"
+
+        # 2) TARGET
+        if trade.reached(ltp, trade.target):
+            return "TARGET"
+
+        # 3) BREAKEVEN STEP
+        if not trade.breakeven_moved and trade.reached(ltp, trade.breakeven_level):
+            trade.stop_loss = trade.entry_price
+            trade.breakeven_moved = True
+            if self.on_stop_moved is not None:
+                self.on_stop_moved(trade_id, trade)
+
+        # 4) PARTIAL EXIT (0.7 move then fail back), the rule as it was
+        # before the index: move and retrace are tested on the same price,
+        # so it has no level of its own and is checked with the others
+        if not trade.partial_exit_done:
+            if trade.get_current_profit_pct(ltp) >= PARTIAL_EXIT_MOVE_PCT:
+                if trade.side == "BUY" and ltp <= trade.entry_price * (1 + PARTIAL_EXIT_LIMIT_PCT):
+                    return "PARTIAL_EXIT"
+                if trade.side == "SELL" and ltp >= trade.entry_price * (1 - PARTIAL_EXIT_LIMIT_PCT):
+                    return "PARTIAL_EXIT"
+
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "open_trades": len(self.active_trades),
+            "trigger_levels": len(self.index),
+            "price_checks": self.checks,
+            "trades_evaluated": self.evaluated,
+        }
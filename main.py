@@ -1,15 +1,46 @@
 # main.py
 
-from core.market_streamer import start_market_streamer
+from core.feed_shards import shard_stats
+from strategy.feature_cache import aggregate_stats
+
+# "async": core/async_runtime.py (feed / orders / exits as asyncio tasks)
+# "threaded": SDK streamer thread + sleep loop
+RUNTIME = "async"
+
+# Print pipeline health every N seconds
+STATS_INTERVAL_SEC = 60
 
 def start_system():
+    # imported here, not at module level: strategy worker processes
+    # re-import this file and must not build the live trading state
+    import core.market_streamer as ms
+
     print("Starting Trading System ...")
-    start_market_streamer()
+
+    if RUNTIME == "async":
+        from core.async_runtime import start_async_runtime
+        start_async_runtime(stats_interval=STATS_INTERVAL_SEC)
+        return
+
+    ms.start_market_streamer()
 
     # Keep the script running so WebSocket stays alive
     import time
+    elapsed = 0
     while True:
         time.sleep(1)
+        elapsed += 1
+        if elapsed % STATS_INTERVAL_SEC == 0:
+            print(f"[FeedShards] {shard_stats(ms.feed_shards)}")
+            print(f"[Pipeline] {ms.feed_pipeline.stats()}")
+            print(f"[FeatureCache] {aggregate_stats(list(ms.feature_caches.values()))}")
+            print(f"[Gates] {ms.strategy_pipeline.stats()}")
+            print(f"[TradeMonitor] {ms.trade_monitor.stats()}")
+            print(f"[ExitFirst] {ms.exit_scheduler.stats()}")
+            print(f"[TradeJournal] {ms.trade_journal.stats()}")
+            print(f"[StateJournal] {ms.state_journal.stats()}")
+            if ms.feed_recorder is not None:
+                print(f"[FeedRecorder] {ms.feed_recorder.stats()}")
 
 if __name__ == "__main__":
     start_system()
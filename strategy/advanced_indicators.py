@@ -1,7 +1,11 @@
 # strategy/advanced_indicators.py
 
-from collections import deque
-import math
+# TR / ATR / ADX live in one place now; ATR / ADX are re-exported here
+# for callers that still import them from this module
+from strategy.volatility_engine import compute_true_range as _true_ranges
+from strategy.volatility_engine import compute_atr, compute_adx
+
+__all__ = ["compute_macd", "compute_true_range", "compute_atr", "compute_adx"]
 
 def compute_macd(prices, short_period=12, long_period=26, signal_period=9):
     """
@@ -38,58 +42,9 @@ def compute_macd(prices, short_period=12, long_period=26, signal_period=9):
 
 def compute_true_range(highs, lows, closes):
     """
-    True Range = max(
-      current high - current low,
-      abs(current high - previous close),
-      abs(current low - previous close)
-    )
+    True ranges of the bars, or None with fewer than 2 bars (this module's
+    contract; volatility_engine.compute_true_range returns [] there).
     """
     if len(highs) < 2:
         return None
-    tr = []
-    for i in range(1, len(highs)):
-        tr.append(max(
-            highs[i] - lows[i],
-            abs(highs[i] - closes[i-1]),
-            abs(lows[i] - closes[i-1])
-        ))
-    return tr
-
-
-def compute_atr(highs, lows, closes, period=14):
-    """
-    Average True Range: measure of volatility.
-    """
-    trs = compute_true_range(highs, lows, closes)
-    if not trs or len(trs) < period:
-        return None
-    return sum(trs[-period:]) / period
-
-
-def compute_adx(highs, lows, closes, period=14):
-    """
-    Approximate ADX (Average Directional Index)
-    """
-    if len(highs) < period + 1:
-        return None
-
-    # Calculate directional moves
-    plus_dm, minus_dm = [], []
-    for i in range(1, len(highs)):
-        up_move = highs[i] - highs[i-1]
-        down_move = lows[i-1] - lows[i]
-        plus_dm.append(max(up_move, 0) if up_move > down_move else 0)
-        minus_dm.append(max(down_move, 0) if down_move > up_move else 0)
-
-    atr_val = compute_atr(highs, lows, closes, period)
-    if atr_val is None:
-        return None
-
-    plus_di = (sum(plus_dm[-period:]) / atr_val) * 100
-    minus_di = (sum(minus_dm[-period:]) / atr_val) * 100
-
-    dx = abs(plus_di - minus_di) / (plus_di + minus_di) * 100 if (plus_di + minus_di) != 0 else 0
-
-    # Smooth ADX over period
-    adx_val = sum([dx] * period) / period
-    return adx_val
+    return _true_ranges(highs, lows, closes)
@@ -0,0 +1,60 @@
+# strategy/bar_builder.py
+
+from core.records import BarRecord
+
+
+class BarBuilder:
+    """
+    Builds real 1-minute bars from the feed's forming-bar snapshots.
+
+    The feed sends the in-progress 1-min OHLC on every tick. The builder
+    keeps one in-progress bar per instrument, updates it in place, and
+    hands back the finished bar only when a snapshot with a newer bar
+    timestamp arrives (rollover).
+    """
+
+    # in-progress bar slots
+    TS, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+    def __init__(self):
+        self.current = {}
+        self.bars_closed = 0
+
+    def update(self, instrument, bar_ts, open_, high, low, close, volume):
+        """
+        Apply one snapshot of the forming bar.
+
+        Returns:
+            BarRecord of the bar that just closed, or None while the
+            same bar is still forming.
+        """
+        bar = self.current.get(instrument)
+
+        if bar is None:
+            self.current[instrument] = [bar_ts, open_, high, low, close, volume]
+            return None
+
+        # Late snapshot of an already closed bar
+        if bar_ts < bar[self.TS]:
+            return None
+
+        # Same bar -> update in place
+        if bar_ts == bar[self.TS]:
+            if high > bar[self.HIGH]:
+                bar[self.HIGH] = high
+            if low < bar[self.LOW]:
+                bar[self.LOW] = low
+            bar[self.CLOSE] = close
+            if volume > bar[self.VOLUME]:
+                bar[self.VOLUME] = volume
+            return None
+
+        # Rollover -> emit the finished bar, start the new one
+        finished = BarRecord(instrument, *bar)
+        bar[:] = [bar_ts, open_, high, low, close, volume]
+        self.bars_closed += 1
+        return finished
+
+    def get_forming_bar(self, instrument):
+        bar = self.current.get(instrument)
+        return BarRecord(instrument, *bar) if bar else None
@@ -0,0 +1,193 @@
+# strategy/batch_indicators.py
+
+"""
+Cross-sectional (whole universe at once) versions of the strategy
+indicators. Every function takes 2-D arrays shaped
+(n_instruments, n_bars), oldest bar first, where rows with shorter
+history are left-padded with NaN. Results are one value per instrument;
+NaN means "not enough history" (the scalar functions return None there).
+
+The formulas mirror strategy/indicators.py, strategy/market_regime.py
+and strategy/breakout_detector.py so batch and per-instrument results
+agree.
+"""
+
+import numpy as np
+
+
+def gather_windows(matrix, ends, counts, n):
+    """
+    Pull the last n values of every row out of a double-written ring
+    matrix (see strategy/ring_buffer.py).
+
+    matrix: (n_instruments, 2 * capacity) ring storage
+    ends: per-row index one past the latest value (head + capacity)
+    counts: per-row number of valid values
+    """
+    offsets = np.arange(-n, 0)
+    idx = ends[:, None] + offsets[None, :]
+    out = np.take_along_axis(matrix, idx, axis=1)
+
+    # left-pad rows that have fewer than n values
+    missing = (n - counts)[:, None] > np.arange(n)[None, :]
+    out[missing] = np.nan
+    return out
+
+
+def _valid_counts(values):
+    return np.count_nonzero(~np.isnan(values), axis=1)
+
+
+def batch_ema(prices, period):
+    """
+    EMA seeded with the SMA of each row's first `period` values,
+    same as indicators.exponential_moving_average.
+    """
+    n_inst, n_bars = prices.shape
+    counts = _valid_counts(prices)
+    start = n_bars - counts
+    seed_col = start + period - 1
+
+    filled = np.nan_to_num(prices)
+    csum = np.cumsum(filled, axis=1)
+
+    result = np.full(n_inst, np.nan)
+    has_seed = counts >= period
+    rows = np.nonzero(has_seed)[0]
+    if rows.size == 0:
+        return result
+
+    result[rows] = csum[rows, seed_col[rows]] / period
+
+    multiplier = 2 / (period + 1)
+    first = int(seed_col[rows].min()) + 1
+    for t in range(first, n_bars):
+        updated = (prices[:, t] - result) * multiplier + result
+        np.copyto(result, updated, where=seed_col < t)
+
+    return result
+
+
+def batch_rsi(prices, period=14):
+    """
+    RSI from the average gain / loss of the last `period` deltas,
+    same as indicators.relative_strength_index.
+    """
+    counts = _valid_counts(prices)
+    deltas = np.diff(prices[:, -(period + 1):], axis=1)
+
+    avg_gain = np.where(deltas > 0, deltas, 0.0).sum(axis=1) / period
+    avg_loss = np.where(deltas < 0, -deltas, 0.0).sum(axis=1) / period
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    rsi = np.where(avg_loss == 0, 100.0, rsi)
+    rsi[counts < period + 1] = np.nan
+    return rsi
+
+
+def _true_range(highs, lows, closes):
+    prev_close = closes[:, :-1]
+    return np.maximum.reduce([
+        highs[:, 1:] - lows[:, 1:],
+        np.abs(highs[:, 1:] - prev_close),
+        np.abs(lows[:, 1:] - prev_close),
+    ])
+
+
+def batch_atr(highs, lows, closes, period=14):
+    """
+    Mean of the last `period` true ranges, same as market_regime.compute_atr.
+    """
+    counts = _valid_counts(closes)
+    tail = slice(-(period + 1), None)
+    tr = _true_range(highs[:, tail], lows[:, tail], closes[:, tail])
+
+    atr = tr.mean(axis=1)
+    atr[counts < period + 1] = np.nan
+    return atr
+
+
+def _batch_dx(s_plus, s_minus, s_tr):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = 100 * s_plus / s_tr
+        minus_di = 100 * s_minus / s_tr
+        di_sum = plus_di + minus_di
+        dx = np.abs(plus_di - minus_di) / di_sum * 100
+    return np.where((s_tr == 0) | (di_sum == 0), 0.0, dx)
+
+
+def batch_adx(highs, lows, closes, period=14):
+    """
+    Classic Wilder ADX (Wilder-smoothed TR / +DM / -DM -> DX, DX smoothed
+    the same way) over each row's whole history, same as
+    volatility_engine.compute_wilder_adx, which the regime gate and
+    FeatureCache use. Needs 2 * period bars.
+    """
+    n_inst, n_bars = closes.shape
+    counts = _valid_counts(closes)
+    start = n_bars - counts
+
+    tr = _true_range(highs, lows, closes)
+    up = highs[:, 1:] - highs[:, :-1]
+    down = lows[:, :-1] - lows[:, 1:]
+    with np.errstate(invalid="ignore"):
+        plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+        minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+
+    s_tr = np.zeros(n_inst)
+    s_plus = np.zeros(n_inst)
+    s_minus = np.zeros(n_inst)
+    dx_sum = np.zeros(n_inst)
+    dx_count = np.zeros(n_inst, dtype=np.intp)
+    adx = np.full(n_inst, np.nan)
+
+    # column j of tr / dm is the move into bar j + 1; k = index in the row
+    first = int(start.min()) if n_inst else n_bars
+    for j in range(first, n_bars - 1):
+        k = j - start
+        tr_j, plus_j, minus_j = tr[:, j], plus_dm[:, j], minus_dm[:, j]
+
+        # seed with the plain sums of the first `period` moves
+        seeding = (k >= 0) & (k < period)
+        s_tr = np.where(seeding, s_tr + tr_j, s_tr)
+        s_plus = np.where(seeding, s_plus + plus_j, s_plus)
+        s_minus = np.where(seeding, s_minus + minus_j, s_minus)
+
+        smoothing = k >= period
+        s_tr = np.where(smoothing, s_tr - s_tr / period + tr_j, s_tr)
+        s_plus = np.where(smoothing, s_plus - s_plus / period + plus_j, s_plus)
+        s_minus = np.where(smoothing, s_minus - s_minus / period + minus_j, s_minus)
+
+        emit = k >= period - 1
+        if not emit.any():
+            continue
+        dx = _batch_dx(s_plus, s_minus, s_tr)
+
+        # first `period` DX values seed the ADX, later ones smooth it
+        full = dx_count >= period
+        seed = emit & ~full
+        dx_sum = np.where(seed, dx_sum + dx, dx_sum)
+        dx_count = dx_count + seed
+        adx = np.where(seed & (dx_count == period), dx_sum / period, adx)
+        adx = np.where(emit & full, (adx * (period - 1) + dx) / period, adx)
+
+    adx[counts < 2 * period] = np.nan
+    return adx
+
+
+def batch_compression(prices, lookback=20, compression_ratio=0.65):
+    """
+    Boolean per instrument, same as breakout_detector.detect_compression.
+    """
+    counts = _valid_counts(prices)
+    recent = prices[:, -lookback:]
+    previous = prices[:, -lookback * 2:-lookback]
+
+    recent_range = recent.max(axis=1) - recent.min(axis=1)
+    previous_range = previous.max(axis=1) - previous.min(axis=1)
+
+    with np.errstate(invalid="ignore"):
+        compressed = recent_range < previous_range * compression_ratio
+
+    return compressed & (previous_range != 0) & (counts >= lookback * 2)
@@ -1,22 +1,23 @@
 # strategy/breakout_detector.py
 
 from typing import Optional
-from strategy.volume_filter import volume_spike_confirmed
-from strategy.volatility_filter import compute_atr
+from strategy.feature_cache import FeatureCache
 
 
-def detect_compression(prices, lookback=20, compression_ratio=0.65):
+def detect_compression(prices=None, lookback=20, compression_ratio=0.65, features=None):
     """
     Detect controlled volatility contraction before expansion.
+
+    features: FeatureCache for the instrument (built over `prices` if omitted)
     """
-    if len(prices) < lookback * 2:
-        return False
+    if features is None:
+        features = FeatureCache.from_lists(prices=prices)
 
-    recent = prices[-lookback:]
-    previous = prices[-lookback * 2:-lookback]
+    ranges = features.get("compression_ranges", lookback)
+    if ranges is None:
+        return False
 
-    recent_range = max(recent) - min(recent)
-    previous_range = max(previous) - min(previous)
+    recent_range, previous_range = ranges
 
     if previous_range == 0:
         return False
@@ -24,60 +25,75 @@ def detect_compression(prices, lookback=20, compression_ratio=0.65):
     return recent_range < previous_range * compression_ratio
 
 
+def expansion_confirmed(features, vol_threshold=1.15, atr_multiplier=0.7):
+    """
+    ATR-based expansion (primary) or volume confirmation (secondary).
+    At least one must hold.
+    """
+    prev_price, current = features.get("tail", "price", 2)
+    recent_move = abs(current - prev_price)
+
+    atr = features.get("atr", 14)
+    if atr and recent_move >= atr * atr_multiplier:
+        return True
+
+    return bool(features.get("volume_spike", vol_threshold))
+
+
+def breakout_direction(features, breakout_pct=0.0012, lookback=20):
+    """
+    "LONG" / "SHORT" if the last price clears the prior range high / low.
+    """
+    levels = features.get("breakout_levels", lookback)
+    if levels is None:
+        return None
+    high, low = levels
+    current = features.get("tail", "price", 1)[-1]
+
+    if current > high * (1 + breakout_pct):
+        return "LONG"
+
+    if current < low * (1 - breakout_pct):
+        return "SHORT"
+
+    return None
+
+
 def breakout_signal_confirmed(
     inst_key: str,
-    prices: list[float],
+    prices: Optional[list[float]] = None,
     volume_history: Optional[list[float]] = None,
     high_prices: Optional[list[float]] = None,
     low_prices: Optional[list[float]] = None,
     close_prices: Optional[list[float]] = None,
     breakout_pct: float = 0.0012,
     vol_threshold: float = 1.15,
-    atr_multiplier: float = 0.7
+    atr_multiplier: float = 0.7,
+    features: Optional[FeatureCache] = None
 ):
     """
     EARLY breakout detection (institutional-style).
     Returns: "LONG", "SHORT", or None
+
+    features: FeatureCache for the instrument. If omitted one is built
+    over the history lists passed in.
     """
 
-    if len(prices) < 30:
+    if features is None:
+        features = FeatureCache.from_lists(
+            prices, high_prices, low_prices, close_prices, volume_history
+        )
+
+    if features.get("length") < 30:
         return None
 
     # --- 1️⃣ Compression (MANDATORY) ---
-    if not detect_compression(prices):
+    if not detect_compression(features=features):
         return None
 
-    # --- 2️⃣ ATR-based expansion (PRIMARY) ---
-    atr_ok = False
-    recent_move = abs(prices[-1] - prices[-2])
-
-    if high_prices and low_prices and close_prices:
-        atr = compute_atr(high_prices, low_prices, close_prices, period=14)
-        if atr and recent_move >= atr * atr_multiplier:
-            atr_ok = True
-
-    # --- 3️⃣ Volume confirmation (SECONDARY) ---
-    volume_ok = False
-    if volume_history and len(volume_history) >= 20:
-        volume_ok = volume_spike_confirmed(
-            volume_history,
-            threshold_multiplier=vol_threshold
-        )
-
-    # Require at least ONE confirmation
-    if not (atr_ok or volume_ok):
+    # --- 2️⃣ ATR expansion / 3️⃣ volume confirmation (at least ONE) ---
+    if not expansion_confirmed(features, vol_threshold, atr_multiplier):
         return None
 
     # --- 4️⃣ Directional breakout ---
-    recent_segment = prices[-20:]
-    high = max(recent_segment[:-1])
-    low = min(recent_segment[:-1])
-    current = recent_segment[-1]
-
-    if current > high * (1 + breakout_pct):
-        return "LONG"
-
-    if current < low * (1 - breakout_pct):
-        return "SHORT"
-
-    return None
+    return breakout_direction(features, breakout_pct)
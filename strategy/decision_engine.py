@@ -1,26 +1,93 @@
 # strategy/decision_engine.py
 
-from strategy.indicators import exponential_moving_average, relative_strength_index
+from strategy.feature_cache import FeatureCache
+
+
+# -----------------------------
+# Individual checks (also used as gates, see gate_pipeline.py)
+# -----------------------------
+
+def regime_allows_entry(market_regime):
+    return market_regime in ("TRENDING", "EARLY_TREND")
+
+
+def htf_aligned(breakout_signal, htf_bias):
+    """
+    HTF bias alignment (soft: weak bias is enough).
+    """
+    if breakout_signal == "LONG":
+        return htf_bias in ("BULLISH_STRONG", "BULLISH_WEAK")
+    if breakout_signal == "SHORT":
+        return htf_bias in ("BEARISH_STRONG", "BEARISH_WEAK")
+    return False
+
+
+def vwap_context_ok(breakout_signal, htf_bias, vwap_val, ltp):
+    """
+    VWAP context (NOT a hard gate): a weak VWAP violation is allowed
+    only when the HTF bias is strong in the trade direction.
+    """
+    vwap_ok = True
+    if vwap_val:
+        if breakout_signal == "LONG" and ltp < vwap_val * 0.997:
+            vwap_ok = False
+        if breakout_signal == "SHORT" and ltp > vwap_val * 1.003:
+            vwap_ok = False
+
+    if vwap_ok:
+        return True
+
+    if breakout_signal == "LONG":
+        return htf_bias == "BULLISH_STRONG"
+    if breakout_signal == "SHORT":
+        return htf_bias == "BEARISH_STRONG"
+    return False
+
+
+def momentum_confirmed(breakout_signal, features):
+    """
+    EMA 9/21 + RSI 14 agree with the breakout direction.
+    """
+    if features.get("length") < 30:
+        return False
+
+    ema9 = features.get("ema", 9)
+    ema21 = features.get("ema", 21)
+    rsi14 = features.get("rsi", 14)
+
+    if ema9 is None or ema21 is None or rsi14 is None:
+        return False
+
+    if breakout_signal == "LONG":
+        return ema9 > ema21 and rsi14 > 48
+
+    if breakout_signal == "SHORT":
+        return ema9 < ema21 and rsi14 < 52
+
+    return False
 
 
 def final_trade_decision(
     inst_key: str,
-    prices: list[float],
+    prices: list[float] | None,
     market_regime: str,
     htf_bias: str,
     breakout_signal: str,
     vwap_val: float,
-    ltp: float
+    ltp: float,
+    features=None
 ):
     """
     Institutional-grade final decision engine.
 
+    features: FeatureCache for the instrument (built over `prices` if omitted)
+
     Returns:
         "BUY", "SELL", or None
     """
 
     # --- 1️⃣ Market regime gate ---
-    if market_regime not in ("TRENDING", "EARLY_TREND"):
+    if not regime_allows_entry(market_regime):
         return None
 
     # --- 2️⃣ Breakout must exist ---
@@ -28,47 +95,19 @@ def final_trade_decision(
         return None
 
     # --- 3️⃣ HTF bias alignment (soft) ---
-    if breakout_signal == "LONG":
-        if htf_bias not in ("BULLISH_STRONG", "BULLISH_WEAK"):
-            return None
-
-    if breakout_signal == "SHORT":
-        if htf_bias not in ("BEARISH_STRONG", "BEARISH_WEAK"):
-            return None
+    if not htf_aligned(breakout_signal, htf_bias):
+        return None
 
     # --- 4️⃣ VWAP context (NOT a hard gate) ---
-    vwap_ok = True
-    if vwap_val:
-        if breakout_signal == "LONG" and ltp < vwap_val * 0.997:
-            vwap_ok = False
-        if breakout_signal == "SHORT" and ltp > vwap_val * 1.003:
-            vwap_ok = False
-
-    # Allow weak VWAP violation only if HTF is strong
-    if not vwap_ok:
-        if breakout_signal == "LONG" and htf_bias != "BULLISH_STRONG":
-            return None
-        if breakout_signal == "SHORT" and htf_bias != "BEARISH_STRONG":
-            return None
-
-    # --- 5️⃣ Momentum confirmation ---
-    if len(prices) < 30:
+    if not vwap_context_ok(breakout_signal, htf_bias, vwap_val, ltp):
         return None
 
-    ema9 = exponential_moving_average(prices, 9)
-    ema21 = exponential_moving_average(prices, 21)
-    rsi14 = relative_strength_index(prices, 14)
+    # --- 5️⃣ Momentum confirmation ---
+    if features is None:
+        features = FeatureCache.from_lists(prices=prices)
 
-    if ema9 is None or ema21 is None or rsi14 is None:
+    if not momentum_confirmed(breakout_signal, features):
         return None
 
     # --- 6️⃣ Entry logic ---
-    if breakout_signal == "LONG":
-        if ema9 > ema21 and rsi14 > 48:
-            return "BUY"
-
-    if breakout_signal == "SHORT":
-        if ema9 < ema21 and rsi14 < 52:
-            return "SELL"
-
-    return None
+    return "BUY" if breakout_signal == "LONG" else "SELL"
@@ -0,0 +1,264 @@
+# strategy/feature_cache.py
+
+"""
+Per-instrument, per-bar feature cache shared by the strategy modules.
+
+Regime, HTF bias, breakout and decision all need overlapping inputs
+(EMAs, ATR, ranges, ...). Each feature is computed on first request and
+reused by every later stage on the same bar; the cache empties itself
+as soon as the scanner commits a new bar for the instrument.
+
+Features come from the streaming state (InstrumentIndicators,
+VolatilityEngine, InstrumentRanges) when it covers the requested
+parameters, otherwise from the list-based reference functions.
+"""
+
+from strategy.indicators import exponential_moving_average, relative_strength_index
+from strategy.volatility_engine import compute_atr, compute_wilder_adx
+from strategy.volume_filter import volume_spike_confirmed
+
+
+class FeatureCache:
+    """
+    Lazy feature store for one instrument.
+
+    Usage:
+        features.get("ema", 20)
+        features.get("atr", 14)
+    """
+
+    def __init__(
+        self,
+        inst_key,
+        scanner=None,
+        indicators=None,
+        vol_engine=None,
+        ranges=None,
+        vwap=None
+    ):
+        self.inst_key = inst_key
+        self.scanner = scanner
+        self.indicators = indicators
+        self.vol_engine = vol_engine
+        self.ranges = ranges
+        self.vwap = vwap
+
+        # list-backed caches (see from_lists) keep their series here
+        self.series = None
+
+        self.bar_seq = None
+        self._values = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_lists(cls, prices=None, highs=None, lows=None, closes=None, volumes=None):
+        """
+        Cache over plain lists, for callers that still pass raw history.
+        """
+        cache = cls(inst_key=None)
+        cache.series = {
+            "price": list(prices or []),
+            "high": list(highs or []),
+            "low": list(lows or []),
+            "close": list(closes or []),
+            "volume": list(volumes or []),
+        }
+        return cache
+
+    def _current_seq(self):
+        if self.scanner is None:
+            return 0
+        return self.scanner.bar_count(self.inst_key)
+
+    def get(self, name, *args):
+        seq = self._current_seq()
+        if seq != self.bar_seq:
+            # new bar -> everything cached is stale
+            self._values.clear()
+            self.bar_seq = seq
+
+        key = (name, args) if args else name
+        try:
+            value = self._values[key]
+            self.hits += 1
+            return value
+        except KeyError:
+            pass
+
+        self.misses += 1
+        value = FEATURES[name](self, *args)
+        self._values[key] = value
+        return value
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+def aggregate_stats(caches) -> dict:
+    hits = sum(c.hits for c in caches)
+    misses = sum(c.misses for c in caches)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 3) if total else 0.0,
+    }
+
+
+# -----------------------------
+# Feature definitions
+# -----------------------------
+
+def _series(cache, field):
+    """
+    Full history of a field as a list (reference computations only).
+    """
+    if cache.series is not None:
+        return cache.series[field]
+    return cache.scanner.get_window(cache.inst_key, field).tolist()
+
+
+def _tail(cache, field, n):
+    """
+    Last n values of a field as a small list.
+    """
+    if cache.series is not None:
+        return cache.series[field][-n:]
+    return cache.scanner.get_window(cache.inst_key, field, n).tolist()
+
+
+def _length(cache):
+    if cache.series is not None:
+        return len(cache.series["price"])
+    return cache.scanner.length(cache.inst_key)
+
+
+def _ema(cache, period):
+    ind = cache.indicators
+    if ind is not None and period in ind.emas:
+        return ind.ema(period)
+    return exponential_moving_average(cache.get("series", "price"), period)
+
+
+def _rsi(cache, period):
+    ind = cache.indicators
+    if ind is not None and ind.rsi.period == period:
+        return ind.rsi_value()
+    return relative_strength_index(cache.get("series", "price"), period)
+
+
+def _ohlc(cache):
+    return cache.get("series", "high"), cache.get("series", "low"), cache.get("series", "close")
+
+
+def _atr(cache, period):
+    eng = cache.vol_engine
+    if eng is not None and eng.period == period:
+        return eng.atr
+    return compute_atr(*_ohlc(cache), period)
+
+
+def _adx(cache, period):
+    eng = cache.vol_engine
+    if eng is not None and eng.period == period:
+        return eng.adx
+    return compute_wilder_adx(*_ohlc(cache), period)
+
+
+def _range_of(values):
+    return max(values) - min(values)
+
+
+def _compression_ranges(cache, lookback):
+    """
+    (recent_range, previous_range) of prices[-lookback:] and
+    prices[-2*lookback:-lookback], or None without enough history.
+    """
+    rng = cache.ranges
+    if rng is not None and rng.price_recent.window == lookback:
+        if not rng.price_previous.ready:
+            return None
+        return rng.price_recent.range, rng.price_previous.range
+
+    prices = cache.get("tail", "price", lookback * 2)
+    if len(prices) < lookback * 2:
+        return None
+    return _range_of(prices[lookback:]), _range_of(prices[:lookback])
+
+
+def _breakout_levels(cache, lookback):
+    """
+    (high, low) of prices[-lookback:-1], or None without enough history.
+    """
+    rng = cache.ranges
+    if rng is not None and rng.price_breakout.window == lookback - 1:
+        if not rng.price_breakout.ready:
+            return None
+        return rng.price_breakout.max, rng.price_breakout.min
+
+    prices = cache.get("tail", "price", lookback)[:-1]
+    if len(prices) < lookback - 1:
+        return None
+    return max(prices), min(prices)
+
+
+def _regime_ranges(cache, lookback):
+    """
+    High-low range of the last `lookback` bars and of the `lookback`
+    bars before them, or None without enough history.
+    """
+    rng = cache.ranges
+    if rng is not None and rng.high_recent.window == lookback:
+        if not (rng.high_previous.ready and rng.low_previous.ready):
+            return None
+        return (
+            rng.high_recent.max - rng.low_recent.min,
+            rng.high_previous.max - rng.low_previous.min
+        )
+
+    highs = cache.get("tail", "high", lookback * 2)
+    lows = cache.get("tail", "low", lookback * 2)
+    if len(highs) < lookback * 2 or len(lows) < lookback * 2:
+        return None
+    return (
+        max(highs[-lookback:]) - min(lows[-lookback:]),
+        max(highs[:-lookback]) - min(lows[:-lookback])
+    )
+
+
+def _volume_spike(cache, threshold, lookback=20, rising_bars=3):
+    volumes = cache.get("tail", "volume", lookback + rising_bars)
+    return volume_spike_confirmed(
+        volumes,
+        threshold_multiplier=threshold,
+        lookback=lookback,
+        rising_bars=rising_bars
+    )
+
+
+def _vwap(cache):
+    if cache.vwap is None:
+        return None
+    return cache.vwap.get_vwap()
+
+
+FEATURES = {
+    "length": _length,
+    "series": _series,
+    "tail": _tail,
+    "ema": _ema,
+    "rsi": _rsi,
+    "atr": _atr,
+    "adx": _adx,
+    "compression_ranges": _compression_ranges,
+    "breakout_levels": _breakout_levels,
+    "regime_ranges": _regime_ranges,
+    "volume_spike": _volume_spike,
+    "vwap": _vwap,
+}
@@ -0,0 +1,199 @@
+# strategy/gate_pipeline.py
+
+"""
+Entry strategy as an ordered list of gates.
+
+Every gate is a yes/no check; an entry needs all of them to pass, so the
+order does not change the decision, only how much work is done before
+the first rejection. Each gate's time and pass rate are measured and the
+gates are periodically re-sorted so the cheapest, most selective ones run
+first. Inputs (regime, HTF bias, direction, ...) are computed lazily by
+GateContext, so a rejected instrument never pays for the later ones.
+"""
+
+import threading
+import time
+
+from strategy.breakout_detector import detect_compression, expansion_confirmed, breakout_direction
+from strategy.decision_engine import (
+    regime_allows_entry,
+    htf_aligned,
+    vwap_context_ok,
+    momentum_confirmed
+)
+from strategy.htf_bias import get_htf_bias
+from strategy.market_regime import detect_market_regime
+
+_UNSET = object()
+
+
+class GateContext:
+    """
+    Lazily computed inputs for one instrument on one bar.
+    """
+
+    def __init__(self, features, ltp):
+        self.features = features
+        self.ltp = ltp
+        self._direction = _UNSET
+        self._regime = _UNSET
+        self._htf_bias = _UNSET
+
+    @property
+    def direction(self):
+        if self._direction is _UNSET:
+            self._direction = breakout_direction(self.features)
+        return self._direction
+
+    @property
+    def regime(self):
+        if self._regime is _UNSET:
+            self._regime = detect_market_regime(features=self.features)
+        return self._regime
+
+    @property
+    def vwap(self):
+        return self.features.get("vwap")
+
+    @property
+    def htf_bias(self):
+        if self._htf_bias is _UNSET:
+            self._htf_bias = get_htf_bias(vwap_value=self.vwap, features=self.features)
+        return self._htf_bias
+
+
+class Gate:
+    """
+    One named check with its running cost / selectivity numbers.
+    """
+
+    # EWMA weight for the cost estimate
+    ALPHA = 0.05
+
+    def __init__(self, name, check, pinned=False):
+        """
+        check: callable(GateContext) -> bool
+        pinned: keep this gate at the front (e.g. a guard other gates rely on)
+        """
+        self.name = name
+        self.check = check
+        self.pinned = pinned
+
+        self.evaluated = 0
+        self.passed = 0
+        self.total_ns = 0
+        self.cost_ns = None
+
+    def record(self, passed, elapsed_ns):
+        # not thread-safe: GatePipeline calls this under its lock
+        self.evaluated += 1
+        if passed:
+            self.passed += 1
+        self.total_ns += elapsed_ns
+        if self.cost_ns is None:
+            self.cost_ns = float(elapsed_ns)
+        else:
+            self.cost_ns += self.ALPHA * (elapsed_ns - self.cost_ns)
+
+    @property
+    def pass_rate(self):
+        # optimistic-neutral prior until we have data
+        return (self.passed + 1) / (self.evaluated + 2)
+
+    @property
+    def rank(self):
+        """
+        Expected cost per rejection; lower runs earlier.
+        """
+        cost = self.cost_ns if self.cost_ns is not None else 0.0
+        return cost / max(1.0 - self.pass_rate, 1e-6)
+
+
+def default_gates():
+    return [
+        Gate("history", lambda ctx: ctx.features.get("length") >= 30, pinned=True),
+        Gate("compression", lambda ctx: detect_compression(features=ctx.features)),
+        Gate("expansion", lambda ctx: expansion_confirmed(ctx.features)),
+        Gate("direction", lambda ctx: ctx.direction is not None),
+        Gate("regime", lambda ctx: regime_allows_entry(ctx.regime)),
+        Gate("htf_alignment", lambda ctx: htf_aligned(ctx.direction, ctx.htf_bias)),
+        Gate("vwap_context", lambda ctx: vwap_context_ok(ctx.direction, ctx.htf_bias, ctx.vwap, ctx.ltp)),
+        Gate("momentum", lambda ctx: momentum_confirmed(ctx.direction, ctx.features)),
+    ]
+
+
+class GatePipeline:
+    """
+    Runs the gates cheapest-and-most-selective first and keeps stats.
+    """
+
+    def __init__(self, gates=None, reorder_every=500):
+        """
+        gates: list of Gate, in initial order (default: default_gates())
+        reorder_every: re-sort gates after this many evaluations
+        """
+        self.gates = gates if gates is not None else default_gates()
+        self.reorder_every = reorder_every
+        self.evaluations = 0
+        self.signals = 0
+        self._lock = threading.Lock()
+
+    def evaluate(self, features, ltp):
+        """
+        Returns:
+            "BUY", "SELL" or None
+        """
+        ctx = GateContext(features, ltp)
+
+        # checks run unlocked; worker threads share the counters, so the
+        # results are committed together under the lock
+        results = []
+        for gate in self.gates:
+            start = time.perf_counter_ns()
+            ok = bool(gate.check(ctx))
+            results.append((gate, ok, time.perf_counter_ns() - start))
+            if not ok:
+                break
+        else:
+            ok = True
+
+        with self._lock:
+            for gate, passed, elapsed_ns in results:
+                gate.record(passed, elapsed_ns)
+            self.evaluations += 1
+            if ok:
+                self.signals += 1
+            reorder = self.evaluations % self.reorder_every == 0
+
+        if reorder:
+            self.reorder()
+
+        if not ok:
+            return None
+        return "BUY" if ctx.direction == "LONG" else "SELL"
+
+    def reorder(self):
+        with self._lock:
+            pinned = [g for g in self.gates if g.pinned]
+            rest = sorted((g for g in self.gates if not g.pinned), key=lambda g: g.rank)
+            self.gates = pinned + rest
+
+    def stats(self) -> dict:
+        """
+        Per-gate pass rate and time, in current evaluation order.
+        """
+        with self._lock:
+            gates = []
+            for g in self.gates:
+                gates.append({
+                    "gate": g.name,
+                    "evaluated": g.evaluated,
+                    "pass_rate": round(g.passed / g.evaluated, 3) if g.evaluated else None,
+                    "mean_us": round(g.total_ns / g.evaluated / 1000, 2) if g.evaluated else None,
+                    "total_ms": round(g.total_ns / 1e6, 2),
+                })
+            return {
+                "evaluations": self.evaluations,
+                "signals": self.signals,
+                "gates": gates,
+            }
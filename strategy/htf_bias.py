@@ -1,14 +1,15 @@
 # strategy/htf_bias.py
 
-from strategy.indicators import exponential_moving_average
+from strategy.feature_cache import FeatureCache
 
 
 def get_htf_bias(
-    prices,
+    prices=None,
     vwap_value=None,
     short_period=20,
     long_period=50,
-    vwap_tolerance=0.002
+    vwap_tolerance=0.002,
+    features=None
 ):
     """
     Institutional-style HTF bias.
@@ -19,18 +20,23 @@ def get_htf_bias(
         BEARISH_STRONG
         BEARISH_WEAK
         NEUTRAL
+
+    features: FeatureCache for the instrument (built over `prices` if omitted)
     """
 
-    if len(prices) < long_period:
+    if features is None:
+        features = FeatureCache.from_lists(prices=prices)
+
+    if features.get("length") < long_period:
         return "NEUTRAL"
 
-    ema_short = exponential_moving_average(prices, short_period)
-    ema_long = exponential_moving_average(prices, long_period)
+    ema_short = features.get("ema", short_period)
+    ema_long = features.get("ema", long_period)
 
     if ema_short is None or ema_long is None:
         return "NEUTRAL"
 
-    price = prices[-1]
+    price = features.get("tail", "price", 1)[-1]
 
     # EMA-based bias
     if ema_short > ema_long:
@@ -1,81 +1,41 @@
 # strategy/market_regime.py
 
-from typing import List
+from typing import List, Optional
 
-# -----------------------------
-# Core Calculations
-# -----------------------------
-
-def compute_true_range(highs: List[float], lows: List[float], closes: List[float]) -> List[float]:
-    if len(highs) < 2:
-        return []
-
-    tr = []
-    for i in range(1, len(highs)):
-        tr.append(
-            max(
-                highs[i] - lows[i],
-                abs(highs[i] - closes[i - 1]),
-                abs(lows[i] - closes[i - 1])
-            )
-        )
-    return tr
-
-
-def compute_atr(highs: List[float], lows: List[float], closes: List[float], period: int = 14):
-    tr = compute_true_range(highs, lows, closes)
-    if len(tr) < period:
-        return None
-    return sum(tr[-period:]) / period
-
-
-def compute_adx(highs: List[float], lows: List[float], closes: List[float], period: int = 14):
-    if len(highs) < period + 1:
-        return None
-
-    plus_dm, minus_dm = [], []
+# TR / ATR / ADX are shared, see volatility_engine.py; re-exported here
+# for callers that still import them from this module
+from strategy.volatility_engine import compute_true_range, compute_atr, compute_adx
+from strategy.feature_cache import FeatureCache
 
-    for i in range(1, len(highs)):
-        up = highs[i] - highs[i - 1]
-        down = lows[i - 1] - lows[i]
-
-        plus_dm.append(up if up > down and up > 0 else 0)
-        minus_dm.append(down if down > up and down > 0 else 0)
-
-    atr = compute_atr(highs, lows, closes, period)
-    if atr is None or atr == 0:
-        return None
-
-    plus_di = (sum(plus_dm[-period:]) / atr) * 100
-    minus_di = (sum(minus_dm[-period:]) / atr) * 100
-
-    if plus_di + minus_di == 0:
-        return 0
-
-    dx = abs(plus_di - minus_di) / (plus_di + minus_di) * 100
-    return dx  # lightweight ADX for intraday
-        
+__all__ = ["detect_market_regime", "compute_true_range", "compute_atr", "compute_adx"]
 
 # -----------------------------
 # Market Regime Logic
 # -----------------------------
 
 def detect_market_regime(
-    highs: List[float],
-    lows: List[float],
-    closes: List[float],
+    highs: Optional[List[float]] = None,
+    lows: Optional[List[float]] = None,
+    closes: Optional[List[float]] = None,
     adx_trend: float = 18,
-    adx_early: float = 14
+    adx_early: float = 14,
+    features: Optional[FeatureCache] = None
 ) -> str:
     """
     Returns:
         TRENDING       -> strong trend
         EARLY_TREND    -> start of expansion (ideal for entries)
         SIDEWAYS       -> no trade
+
+    ADX is the Wilder-smoothed ADX.
+    features: FeatureCache for the instrument (built over the lists if omitted)
     """
 
-    adx = compute_adx(highs, lows, closes)
-    atr = compute_atr(highs, lows, closes)
+    if features is None:
+        features = FeatureCache.from_lists(highs=highs, lows=lows, closes=closes)
+
+    adx = features.get("adx", 14)
+    atr = features.get("atr", 14)
 
     if adx is None or atr is None:
         return "SIDEWAYS"
@@ -85,8 +45,10 @@ def detect_market_regime(
         return "TRENDING"
 
     # --- Early expansion detection ---
-    recent_range = max(highs[-10:]) - min(lows[-10:])
-    previous_range = max(highs[-20:-10]) - min(lows[-20:-10])
+    ranges = features.get("regime_ranges", 10)
+    if ranges is None:
+        return "SIDEWAYS"
+    recent_range, previous_range = ranges
 
     if adx >= adx_early and recent_range > previous_range * 1.3:
         return "EARLY_TREND"
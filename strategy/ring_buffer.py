@@ -0,0 +1,72 @@
+# strategy/ring_buffer.py
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-capacity float64 ring with zero-copy window views.
+
+    Storage is preallocated at 2 x capacity and every value is written
+    twice (slot i and slot i + capacity). The last n values are then
+    always one contiguous slice, so reading a window never copies.
+    """
+
+    def __init__(self, capacity, storage=None):
+        """
+        capacity: max number of values kept
+        storage: optional preallocated float64 array of length 2 * capacity
+                 (lets several rings share one big block of memory)
+        """
+        if storage is None:
+            storage = np.zeros(2 * capacity, dtype=np.float64)
+        elif storage.shape != (2 * capacity,):
+            raise ValueError("storage must have length 2 * capacity")
+
+        self.capacity = capacity
+        self._buf = storage
+        self._head = 0      # next write slot, in [0, capacity)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def head(self):
+        """
+        Next write slot. The latest value sits at head + capacity - 1.
+        """
+        return self._head
+
+    def append(self, value):
+        head = self._head
+        self._buf[head] = value
+        self._buf[head + self.capacity] = value
+
+        head += 1
+        self._head = 0 if head == self.capacity else head
+
+        if self._count < self.capacity:
+            self._count += 1
+
+    def view(self, n=None):
+        """
+        Read-only view of the last n values (all values if n is None),
+        oldest first.
+        """
+        if n is None or n > self._count:
+            n = self._count
+
+        end = self._head + self.capacity
+        window = self._buf[end - n:end]
+        window.flags.writeable = False
+        return window
+
+    def last(self):
+        if self._count == 0:
+            return None
+        return float(self._buf[self._head + self.capacity - 1])
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
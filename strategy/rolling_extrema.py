@@ -0,0 +1,99 @@
+# strategy/rolling_extrema.py
+
+from collections import deque
+
+
+class RollingExtrema:
+    """
+    Rolling max / min over the last `window` values with amortized O(1)
+    updates (monotonic deques), so range checks never slice or rescan.
+
+    lag: ignore the newest `lag` values, i.e. track values[-(window + lag):-lag]
+         (lag=20, window=20 gives the "previous 20 bars" window)
+    """
+
+    def __init__(self, window, lag=0):
+        self.window = window
+        self.lag = lag
+
+        self._max = deque()     # (index, value), values decreasing
+        self._min = deque()     # (index, value), values increasing
+        self._delay = deque()
+        self._n = 0             # values that reached the window
+
+    def update(self, value):
+        if self.lag:
+            self._delay.append(value)
+            if len(self._delay) <= self.lag:
+                return
+            value = self._delay.popleft()
+
+        i = self._n
+        self._n += 1
+
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((i, value))
+
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((i, value))
+
+        oldest = i - self.window
+        if self._max[0][0] <= oldest:
+            self._max.popleft()
+        if self._min[0][0] <= oldest:
+            self._min.popleft()
+
+    @property
+    def ready(self):
+        """
+        True once a full window of values is in.
+        """
+        return self._n >= self.window
+
+    @property
+    def max(self):
+        return self._max[0][1] if self._max else None
+
+    @property
+    def min(self):
+        return self._min[0][1] if self._min else None
+
+    @property
+    def range(self):
+        if not self._max:
+            return None
+        return self._max[0][1] - self._min[0][1]
+
+
+class InstrumentRanges:
+    """
+    The rolling windows the strategy checks, for one instrument.
+    Fed once per closed bar.
+
+        price_recent / price_previous   compression: prices[-20:] vs prices[-40:-20]
+        price_breakout                  breakout levels: prices[-20:-1]
+        high_recent / low_recent        regime: highs / lows [-10:]
+        high_previous / low_previous    regime: highs / lows [-20:-10]
+    """
+
+    def __init__(self, compression_lookback=20, breakout_lookback=20, regime_lookback=10):
+        self.price_recent = RollingExtrema(compression_lookback)
+        self.price_previous = RollingExtrema(compression_lookback, lag=compression_lookback)
+        self.price_breakout = RollingExtrema(breakout_lookback - 1, lag=1)
+
+        self.high_recent = RollingExtrema(regime_lookback)
+        self.low_recent = RollingExtrema(regime_lookback)
+        self.high_previous = RollingExtrema(regime_lookback, lag=regime_lookback)
+        self.low_previous = RollingExtrema(regime_lookback, lag=regime_lookback)
+
+    def update(self, price, high, low):
+        self.price_recent.update(price)
+        self.price_previous.update(price)
+        self.price_breakout.update(price)
+
+        self.high_recent.update(high)
+        self.low_recent.update(low)
+        self.high_previous.update(high)
+        self.low_previous.update(low)
@@ -1,67 +1,205 @@
 # strategy/scanner.py
 
-from collections import deque
+import numpy as np
+from strategy.ring_buffer import RingBuffer
+from strategy import batch_indicators as bi
+
+FIELDS = ("price", "high", "low", "close", "volume")
+
+_EMPTY = np.empty(0, dtype=np.float64)
+_EMPTY.flags.writeable = False
+
 
 class MarketScanner:
     """
     Enhanced scanner storing market data for multiple symbols.
+
+    Each field of each instrument lives in a preallocated float64
+    RingBuffer, so reading a window is a zero-copy view.
+
+    If a universe is given, the rings of those instruments are rows of
+    one (n_instruments, 2 * max_len) matrix per field, which lets
+    compute_batch_indicators() evaluate every instrument in a few numpy
+    calls. Instruments outside the universe still get their own rings.
     """
 
-    def __init__(self, window_size=50, max_len=None):
+    def __init__(self, window_size=50, max_len=None, universe=None, matrix=None):
         """
         window_size: fallback history length
         max_len: explicit history length if provided
+        universe: optional list of instrument keys to keep in the matrix
+        matrix: optional preallocated field -> (n_instruments, 2 * max_len)
+                float64 arrays for the universe (e.g. shared memory)
         """
         self.max_len = max_len if max_len is not None else window_size
 
-        # store recent values
+        # store recent values (instrument -> RingBuffer)
         self.prices = {}
         self.highs = {}
         self.lows = {}
         self.closes = {}
         self.volumes = {}
 
+        # total bars ever committed per instrument (never wraps)
+        self.bar_counts = {}
+
+        self._stores = {
+            "price": self.prices,
+            "high": self.highs,
+            "low": self.lows,
+            "close": self.closes,
+            "volume": self.volumes,
+        }
+
+        # dense instrument -> row map for the universe matrix
+        self.instrument_keys = list(universe) if universe else []
+        self.instrument_index = {k: i for i, k in enumerate(self.instrument_keys)}
+        self.matrix = {}
+
+        if self.instrument_keys:
+            shape = (len(self.instrument_keys), 2 * self.max_len)
+            if matrix is not None:
+                if any(matrix[field].shape != shape for field in FIELDS):
+                    raise ValueError(f"matrix arrays must have shape {shape}")
+                self.matrix = {field: matrix[field] for field in FIELDS}
+            else:
+                self.matrix = {field: np.zeros(shape, dtype=np.float64) for field in FIELDS}
+
     # internal helper
-    def _init_store(self, store, inst):
-        if inst not in store:
-            store[inst] = deque(maxlen=self.max_len)
+    def _init_instrument(self, inst):
+        row = self.instrument_index.get(inst)
+        for field, store in self._stores.items():
+            storage = self.matrix[field][row] if row is not None else None
+            store[inst] = RingBuffer(self.max_len, storage=storage)
 
     def update(self, instrument, price, high, low, close, volume):
         """
         Update price & OHLC + volume for an instrument.
-        Should be called on each new tick or bar.
+        Should be called once per closed bar.
         """
-        # prices
-        self._init_store(self.prices, instrument)
-        self.prices[instrument].append(price)
+        if instrument not in self.prices:
+            self._init_instrument(instrument)
 
-        # high
-        self._init_store(self.highs, instrument)
+        self.prices[instrument].append(price)
         self.highs[instrument].append(high)
-
-        # low
-        self._init_store(self.lows, instrument)
         self.lows[instrument].append(low)
-
-        # close
-        self._init_store(self.closes, instrument)
         self.closes[instrument].append(close)
-
-        # volume
-        self._init_store(self.volumes, instrument)
         self.volumes[instrument].append(volume)
 
+        self.bar_counts[instrument] = self.bar_counts.get(instrument, 0) + 1
+
+    def update_bar(self, bar):
+        """
+        Same as update() for a closed BarRecord (price = close).
+        """
+        self.update(bar.inst_key, bar.close, bar.high, bar.low, bar.close, bar.volume)
+
+    def load_history(self, instrument, windows, bar_count):
+        """
+        Refill an instrument's rings from saved windows (field -> values,
+        oldest first, e.g. get_window copies) and set its bar count.
+        """
+        if instrument not in self.prices:
+            self._init_instrument(instrument)
+
+        for field, store in self._stores.items():
+            ring = store[instrument]
+            ring.clear()
+            for value in windows[field][-self.max_len:]:
+                ring.append(value)
+
+        self.bar_counts[instrument] = bar_count
+
+    def bar_count(self, instrument):
+        """
+        Monotonic bar sequence number for the instrument.
+        """
+        return self.bar_counts.get(instrument, 0)
+
+    def length(self, instrument):
+        ring = self.prices.get(instrument)
+        return len(ring) if ring is not None else 0
+
+    def get_window(self, instrument, field, n=None):
+        """
+        Zero-copy, read-only numpy view of the last n values of a field
+        ("price", "high", "low", "close" or "volume"). Oldest first.
+        """
+        ring = self._stores[field].get(instrument)
+        if ring is None:
+            return _EMPTY
+        return ring.view(n)
+
+    def get_matrix_window(self, field, n=None):
+        """
+        (n_instruments, n) array with the last n values of a field for every
+        universe instrument, rows in instrument_keys order. Rows with
+        shorter history are left-padded with NaN.
+        """
+        if n is None:
+            n = self.max_len
+
+        ends = np.empty(len(self.instrument_keys), dtype=np.intp)
+        counts = np.empty(len(self.instrument_keys), dtype=np.intp)
+        store = self._stores[field]
+
+        for row, inst in enumerate(self.instrument_keys):
+            ring = store.get(inst)
+            if ring is None:
+                ends[row] = self.max_len
+                counts[row] = 0
+            else:
+                ends[row] = ring.head + self.max_len
+                counts[row] = len(ring)
+
+        return bi.gather_windows(self.matrix[field], ends, counts, n)
+
+    def compute_batch_indicators(
+        self,
+        ema_periods=(9, 21, 20, 50),
+        rsi_period=14,
+        atr_period=14,
+        compression_lookback=20
+    ) -> dict:
+        """
+        Evaluate the strategy indicators for the whole universe at once.
+
+        Returns:
+            dict of name -> numpy vector (one value per instrument, in
+            instrument_keys order; NaN where history is too short), plus
+            "instruments" with the row order.
+        """
+        if not self.instrument_keys:
+            raise ValueError("compute_batch_indicators needs a universe")
+
+        prices = self.get_matrix_window("price")
+        highs = self.get_matrix_window("high")
+        lows = self.get_matrix_window("low")
+        closes = self.get_matrix_window("close")
+
+        result = {"instruments": self.instrument_keys}
+        for period in ema_periods:
+            result[f"ema{period}"] = bi.batch_ema(prices, period)
+
+        result[f"rsi{rsi_period}"] = bi.batch_rsi(prices, rsi_period)
+        result[f"atr{atr_period}"] = bi.batch_atr(highs, lows, closes, atr_period)
+        result[f"adx{atr_period}"] = bi.batch_adx(highs, lows, closes, atr_period)
+        result["compression"] = bi.batch_compression(prices, compression_lookback)
+        return result
+
+    # list getters kept for existing callers (one C-level copy each)
+
     def get_prices(self, instrument):
-        return list(self.prices.get(instrument, []))
+        return self.get_window(instrument, "price").tolist()
 
     def get_highs(self, instrument):
-        return list(self.highs.get(instrument, []))
+        return self.get_window(instrument, "high").tolist()
 
     def get_lows(self, instrument):
-        return list(self.lows.get(instrument, []))
+        return self.get_window(instrument, "low").tolist()
 
     def get_closes(self, instrument):
-        return list(self.closes.get(instrument, []))
+        return self.get_window(instrument, "close").tolist()
 
     def get_volumes(self, instrument):
-        return list(self.volumes.get(instrument, []))
+        return self.get_window(instrument, "volume").tolist()
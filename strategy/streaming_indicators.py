@@ -0,0 +1,186 @@
+# strategy/streaming_indicators.py
+
+"""
+Incremental versions of the indicators in strategy/indicators.py.
+
+Each object is fed one value per closed bar and does constant work per
+update; the current value can be read at any time. They give the same
+numbers as the list-based functions on the same history (EMA can differ
+in the far decimals once the scanner window starts rolling, because the
+list version re-seeds from the window start).
+"""
+
+from collections import deque
+from strategy.indicators import exponential_moving_average, relative_strength_index
+
+
+class StreamingEMA:
+    """
+    EMA seeded with the SMA of the first `period` values.
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self.multiplier = 2 / (period + 1)
+        self.value = None
+
+        self._seed_sum = 0.0
+        self._count = 0
+
+    def update(self, price):
+        if self.value is None:
+            self._seed_sum += price
+            self._count += 1
+            if self._count == self.period:
+                self.value = self._seed_sum / self.period
+        else:
+            self.value = (price - self.value) * self.multiplier + self.value
+        return self.value
+
+
+class StreamingRSI:
+    """
+    RSI over the last `period` price changes.
+
+    wilder=False: simple average of gains / losses in the window
+                  (same as relative_strength_index)
+    wilder=True:  Wilder smoothing of average gain / loss
+    """
+
+    def __init__(self, period=14, wilder=False):
+        self.period = period
+        self.wilder = wilder
+        self.value = None
+
+        self._prev = None
+        self._deltas = deque(maxlen=period)
+        self._gain_sum = 0.0
+        self._loss_sum = 0.0
+        self._loss_bars = 0     # deltas in window with a real loss
+        self._avg_gain = None
+        self._avg_loss = None
+
+    def update(self, price):
+        if self._prev is None:
+            self._prev = price
+            return None
+
+        delta = price - self._prev
+        self._prev = price
+
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        if self.wilder and self._avg_gain is not None:
+            self._avg_gain = (self._avg_gain * (self.period - 1) + gain) / self.period
+            self._avg_loss = (self._avg_loss * (self.period - 1) + loss) / self.period
+            self.value = self._rsi(self._avg_gain, self._avg_loss, self._avg_loss == 0)
+            return self.value
+
+        # rolling window of the last `period` deltas
+        if len(self._deltas) == self.period:
+            old_gain, old_loss = self._deltas[0]
+            self._gain_sum -= old_gain
+            self._loss_sum -= old_loss
+            if old_loss > 0:
+                self._loss_bars -= 1
+
+        self._deltas.append((gain, loss))
+        self._gain_sum += gain
+        self._loss_sum += loss
+        if loss > 0:
+            self._loss_bars += 1
+
+        if len(self._deltas) < self.period:
+            return None
+
+        avg_gain = self._gain_sum / self.period
+        avg_loss = self._loss_sum / self.period
+
+        if self.wilder:
+            # first full window seeds the Wilder averages
+            self._avg_gain = avg_gain
+            self._avg_loss = avg_loss
+
+        self.value = self._rsi(avg_gain, avg_loss, self._loss_bars == 0)
+        return self.value
+
+    @staticmethod
+    def _rsi(avg_gain, avg_loss, no_losses):
+        if no_losses:
+            return 100
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+
+class InstrumentIndicators:
+    """
+    Per-instrument set of streaming indicators, updated once per closed bar.
+
+    With reference=True every update also runs the list-based functions on
+    the same history and records the largest deviation seen, to prove the
+    streaming values match.
+    """
+
+    def __init__(self, ema_periods=(9, 20, 21, 50), rsi_period=14,
+                 reference=False, max_len=600):
+        self.emas = {p: StreamingEMA(p) for p in ema_periods}
+        self.rsi = StreamingRSI(rsi_period)
+        self.bars = 0
+
+        self.reference = reference
+        self.max_deviation = {}
+        self._history = deque(maxlen=max_len) if reference else None
+
+    def update(self, price):
+        self.bars += 1
+        for ema in self.emas.values():
+            ema.update(price)
+        self.rsi.update(price)
+
+        if self.reference:
+            self._history.append(price)
+            self._check_reference(list(self._history))
+
+    def ema(self, period):
+        return self.emas[period].value
+
+    def rsi_value(self):
+        return self.rsi.value
+
+    def _check_reference(self, prices):
+        expected = {f"ema{p}": exponential_moving_average(prices, p) for p in self.emas}
+        expected[f"rsi{self.rsi.period}"] = relative_strength_index(prices, self.rsi.period)
+
+        actual = {f"ema{p}": ema.value for p, ema in self.emas.items()}
+        actual[f"rsi{self.rsi.period}"] = self.rsi.value
+
+        for name, ref in expected.items():
+            got = actual[name]
+            if (ref is None) != (got is None):
+                dev = float("inf")
+            elif ref is None:
+                dev = 0.0
+            else:
+                dev = abs(got - ref)
+            self.max_deviation[name] = max(self.max_deviation.get(name, 0.0), dev)
+
+
+def verify_against_batch(prices, ema_periods=(9, 20, 21, 50), rsi_period=14, max_len=600):
+    """
+    Replay a recorded price series through the streaming indicators in
+    reference mode.
+
+    Returns:
+        dict of indicator name -> max absolute deviation from the list-based
+        functions over the whole series
+    """
+    indicators = InstrumentIndicators(
+        ema_periods=ema_periods,
+        rsi_period=rsi_period,
+        reference=True,
+        max_len=max_len
+    )
+    for price in prices:
+        indicators.update(price)
+    return indicators.max_deviation
@@ -0,0 +1,299 @@
+# strategy/volatility_engine.py
+
+"""
+Single home for True Range / ATR / ADX.
+
+The list-based functions are the reference implementations (the other
+strategy modules re-export them). VolatilityEngine keeps the same
+quantities incrementally with O(1) work per closed bar.
+"""
+
+from collections import deque
+from typing import List
+
+
+# -----------------------------
+# List-based (reference) calculations
+# -----------------------------
+
+def compute_true_range(highs: List[float], lows: List[float], closes: List[float]) -> List[float]:
+    if len(highs) < 2:
+        return []
+
+    tr = []
+    for i in range(1, len(highs)):
+        tr.append(
+            max(
+                highs[i] - lows[i],
+                abs(highs[i] - closes[i - 1]),
+                abs(lows[i] - closes[i - 1])
+            )
+        )
+    return tr
+
+
+def compute_atr(highs: List[float], lows: List[float], closes: List[float], period: int = 14):
+    """
+    Average True Range: mean of the last `period` true ranges.
+    """
+    tr = compute_true_range(highs, lows, closes)
+    if len(tr) < period:
+        return None
+    return sum(tr[-period:]) / period
+
+
+def _directional_moves(highs, lows):
+    plus_dm, minus_dm = [], []
+
+    for i in range(1, len(highs)):
+        up = highs[i] - highs[i - 1]
+        down = lows[i - 1] - lows[i]
+
+        plus_dm.append(up if up > down and up > 0 else 0)
+        minus_dm.append(down if down > up and down > 0 else 0)
+
+    return plus_dm, minus_dm
+
+
+def compute_adx(highs: List[float], lows: List[float], closes: List[float], period: int = 14):
+    """
+    Lightweight intraday ADX: a single DX over the last `period` bars.
+    """
+    if len(highs) < period + 1:
+        return None
+
+    plus_dm, minus_dm = _directional_moves(highs, lows)
+
+    atr = compute_atr(highs, lows, closes, period)
+    if atr is None or atr == 0:
+        return None
+
+    plus_di = (sum(plus_dm[-period:]) / atr) * 100
+    minus_di = (sum(minus_dm[-period:]) / atr) * 100
+
+    if plus_di + minus_di == 0:
+        return 0
+
+    dx = abs(plus_di - minus_di) / (plus_di + minus_di) * 100
+    return dx
+
+
+def compute_wilder_adx(highs: List[float], lows: List[float], closes: List[float], period: int = 14):
+    """
+    Classic Wilder ADX: Wilder-smoothed TR / +DM / -DM -> DI -> DX,
+    then DX smoothed the same way. Needs 2 * period bars.
+    """
+    if len(highs) < 2 * period:
+        return None
+
+    tr = compute_true_range(highs, lows, closes)
+    plus_dm, minus_dm = _directional_moves(highs, lows)
+
+    s_tr = sum(tr[:period])
+    s_plus = sum(plus_dm[:period])
+    s_minus = sum(minus_dm[:period])
+
+    dx_values = [_dx(s_plus, s_minus, s_tr)]
+    for i in range(period, len(tr)):
+        s_tr = s_tr - s_tr / period + tr[i]
+        s_plus = s_plus - s_plus / period + plus_dm[i]
+        s_minus = s_minus - s_minus / period + minus_dm[i]
+        dx_values.append(_dx(s_plus, s_minus, s_tr))
+
+    adx = sum(dx_values[:period]) / period
+    for dx in dx_values[period:]:
+        adx = (adx * (period - 1) + dx) / period
+    return adx
+
+
+def _dx(s_plus, s_minus, s_tr):
+    if s_tr == 0:
+        return 0.0
+    plus_di = 100 * s_plus / s_tr
+    minus_di = 100 * s_minus / s_tr
+    if plus_di + minus_di == 0:
+        return 0.0
+    return abs(plus_di - minus_di) / (plus_di + minus_di) * 100
+
+
+# -----------------------------
+# Streaming engine
+# -----------------------------
+
+class VolatilityEngine:
+    """
+    Incremental TR / ATR / +DM / -DM / DI / ADX for one instrument.
+    Call update() once per closed bar.
+
+    Readable values (None until warmed up):
+        tr        latest true range
+        atr       mean of last `period` TRs (same as compute_atr)
+        fast_dx   single-window DX (same as compute_adx)
+        plus_di / minus_di   Wilder-smoothed directional indicators
+        adx       Wilder-smoothed ADX (same as compute_wilder_adx)
+    """
+
+    def __init__(self, period=14):
+        self.period = period
+        self.bars = 0
+
+        self.tr = None
+        self.atr = None
+        self.fast_dx = None
+        self.plus_di = None
+        self.minus_di = None
+        self.dx = None
+        self.adx = None
+
+        self._prev_high = None
+        self._prev_low = None
+        self._prev_close = None
+
+        # rolling window of the last `period` moves
+        self._window = deque(maxlen=period)
+        self._tr_sum = 0.0
+        self._plus_sum = 0.0
+        self._minus_sum = 0.0
+        self._since_resync = 0
+        self._nonzero_tr = 0    # exact zero checks on flat stretches
+        self._nonzero_dm = 0
+
+        # Wilder smoothed sums
+        self._s_tr = None
+        self._s_plus = None
+        self._s_minus = None
+        self._dx_seed = []
+
+    def update(self, high, low, close):
+        self.bars += 1
+
+        if self._prev_close is None:
+            self._prev_high, self._prev_low, self._prev_close = high, low, close
+            return
+
+        tr = max(
+            high - low,
+            abs(high - self._prev_close),
+            abs(low - self._prev_close)
+        )
+        up = high - self._prev_high
+        down = self._prev_low - low
+        plus_dm = up if up > down and up > 0 else 0.0
+        minus_dm = down if down > up and down > 0 else 0.0
+
+        self._prev_high, self._prev_low, self._prev_close = high, low, close
+        self.tr = tr
+
+        self._update_window(tr, plus_dm, minus_dm)
+        self._update_wilder(tr, plus_dm, minus_dm)
+
+    def _update_window(self, tr, plus_dm, minus_dm):
+        period = self.period
+
+        if len(self._window) == period:
+            old_tr, old_plus, old_minus = self._window[0]
+            self._tr_sum -= old_tr
+            self._plus_sum -= old_plus
+            self._minus_sum -= old_minus
+            self._nonzero_tr -= old_tr != 0
+            self._nonzero_dm -= (old_plus != 0) or (old_minus != 0)
+
+        self._window.append((tr, plus_dm, minus_dm))
+        self._tr_sum += tr
+        self._plus_sum += plus_dm
+        self._minus_sum += minus_dm
+        self._nonzero_tr += tr != 0
+        self._nonzero_dm += (plus_dm != 0) or (minus_dm != 0)
+
+        # re-add from scratch once per window so rounding never drifts;
+        # amortized O(1)
+        self._since_resync += 1
+        if self._since_resync >= period:
+            self._since_resync = 0
+            self._tr_sum = sum(w[0] for w in self._window)
+            self._plus_sum = sum(w[1] for w in self._window)
+            self._minus_sum = sum(w[2] for w in self._window)
+
+        if len(self._window) < period:
+            return
+
+        if self._nonzero_tr == 0:
+            self.atr = 0.0
+            self.fast_dx = None
+            return
+
+        atr = self._tr_sum / period
+        self.atr = atr
+
+        if self._nonzero_dm == 0:
+            self.fast_dx = 0
+            return
+
+        plus_di = self._plus_sum / atr * 100
+        minus_di = self._minus_sum / atr * 100
+        self.fast_dx = abs(plus_di - minus_di) / (plus_di + minus_di) * 100
+
+    def _update_wilder(self, tr, plus_dm, minus_dm):
+        period = self.period
+
+        if self._s_tr is None:
+            # seed with the plain sums of the first full window
+            if len(self._window) < period:
+                return
+            self._s_tr = self._tr_sum
+            self._s_plus = self._plus_sum
+            self._s_minus = self._minus_sum
+        else:
+            self._s_tr = self._s_tr - self._s_tr / period + tr
+            self._s_plus = self._s_plus - self._s_plus / period + plus_dm
+            self._s_minus = self._s_minus - self._s_minus / period + minus_dm
+
+        if self._s_tr > 0:
+            self.plus_di = 100 * self._s_plus / self._s_tr
+            self.minus_di = 100 * self._s_minus / self._s_tr
+        else:
+            self.plus_di = self.minus_di = 0.0
+
+        self.dx = _dx(self._s_plus, self._s_minus, self._s_tr)
+
+        if self.adx is None:
+            self._dx_seed.append(self.dx)
+            if len(self._dx_seed) == period:
+                self.adx = sum(self._dx_seed) / period
+                self._dx_seed = []
+        else:
+            self.adx = (self.adx * (period - 1) + self.dx) / period
+
+
+def verify_against_batch(highs, lows, closes, period=14):
+    """
+    Replay recorded bars through VolatilityEngine and compare every step
+    with the list-based functions on the full history so far.
+
+    Returns:
+        dict of name -> max absolute deviation
+    """
+    engine = VolatilityEngine(period)
+    checks = {
+        "atr": (compute_atr, "atr"),
+        "fast_dx": (compute_adx, "fast_dx"),
+        "adx": (compute_wilder_adx, "adx"),
+    }
+    max_dev = {name: 0.0 for name in checks}
+
+    for i in range(len(closes)):
+        engine.update(highs[i], lows[i], closes[i])
+        h, l, c = highs[:i + 1], lows[:i + 1], closes[:i + 1]
+
+        for name, (fn, attr) in checks.items():
+            ref = fn(h, l, c, period)
+            got = getattr(engine, attr)
+            if (ref is None) != (got is None):
+                dev = float("inf")
+            elif ref is None:
+                dev = 0.0
+            else:
+                dev = abs(got - ref)
+            max_dev[name] = max(max_dev[name], dev)
+
+    return max_dev
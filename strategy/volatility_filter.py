@@ -1,26 +1,10 @@
 # strategy/volatility_filter.py
 
-def compute_true_range(highs, lows, closes):
-    if len(highs) < 2:
-        return []
-
-    tr_values = []
-    for i in range(1, len(highs)):
-        tr_values.append(
-            max(
-                highs[i] - lows[i],
-                abs(highs[i] - closes[i - 1]),
-                abs(lows[i] - closes[i - 1])
-            )
-        )
-    return tr_values
-
-
-def compute_atr(highs, lows, closes, period=14):
-    tr = compute_true_range(highs, lows, closes)
-    if len(tr) < period:
-        return None
-    return sum(tr[-period:]) / period
+# TR / ATR live in volatility_engine.py; re-exported here for callers
+# that still import them from this module
+from strategy.volatility_engine import compute_true_range, compute_atr
+
+__all__ = ["volatility_breakout_confirmed", "compute_true_range", "compute_atr"]
 
 
 def volatility_breakout_confirmed(
@@ -0,0 +1,114 @@
+# tests/test_conflating_buffer.py
+
+import threading
+import time
+
+from core.conflating_buffer import ConflatingBuffer
+from core.feed_pipeline import FeedPipeline
+from core.records import TickRecord
+
+
+def make_tick(inst_key, bar_ts, ltp):
+    return TickRecord(inst_key, ltp, ltp, ltp, ltp, ltp, 1.0, bar_ts, None, None, None, None, 0)
+
+
+def test_latest_snapshot_per_key_keeps_its_place():
+    buf = ConflatingBuffer()
+    buf.put("A", 1)
+    buf.put("B", 2)
+    buf.put("A", 3)
+
+    assert buf.get()[1] == 3
+    assert buf.get()[1] == 2
+    assert buf.conflated == 1
+
+
+def test_overflow_is_rejected_and_counted():
+    buf = ConflatingBuffer(max_keys=1)
+    assert buf.put("A", 1)
+    assert buf.put("A", 2)
+    assert not buf.put("B", 3)
+    assert buf.overflow_dropped == 1
+
+
+def test_stale_snapshots_are_shed():
+    buf = ConflatingBuffer(max_age=0.05)
+    buf.put("A", 1, enqueued_at=time.perf_counter() - 1.0)
+    buf.put("B", 2)
+
+    assert buf.get()[1] == 2
+    assert buf.stale_dropped == 1
+
+
+def test_stale_snapshot_closing_a_bar_is_kept():
+    buf = ConflatingBuffer(max_age=0.05, series=lambda key: key[0])
+    old = time.perf_counter() - 1.0
+    buf.put(("A", 0), "A last of bar 0", enqueued_at=old)
+    buf.put(("B", 0), "B stale", enqueued_at=old)
+    buf.put(("A", 60000), "A bar 1", enqueued_at=old)
+
+    # A's bar 0 is followed by its bar 1: delivered however old
+    assert buf.get()[1] == "A last of bar 0"
+    buf.put(("C", 0), "C fresh")
+    assert buf.get()[1] == "C fresh"
+    assert buf.stale_dropped == 2
+    assert buf.qsize() == 0
+
+
+def run_pipeline(ticks, max_age=None):
+    seen = []
+    release = threading.Event()
+
+    def handler(tick):
+        release.wait()
+        seen.append((tick.bar_ts, tick.ltp))
+
+    pipeline = FeedPipeline(handler, num_shards=1, max_age=max_age)
+    pipeline.start()
+
+    # the worker holds the first tick while the rest pile up
+    pipeline.submit(ticks[0])
+    time.sleep(0.05)
+    for tick in ticks[1:]:
+        pipeline.submit(tick)
+    if max_age:
+        # let what piled up go stale
+        time.sleep(max_age * 2)
+
+    release.set()
+    assert pipeline.wait_idle(timeout=5)
+    return seen, pipeline
+
+
+def test_conflation_never_crosses_a_bar_rollover():
+    ticks = [
+        make_tick("A", 0, 1.0),
+        make_tick("A", 0, 2.0),
+        make_tick("A", 0, 3.0),
+        make_tick("A", 60000, 4.0),
+        make_tick("A", 60000, 5.0),
+    ]
+    seen, pipeline = run_pipeline(ticks)
+
+    # the closing minute's last update is handled, before the new minute
+    assert seen == [(0, 1.0), (0, 3.0), (60000, 5.0)]
+    assert pipeline.stats()["conflated"] == 2
+
+
+def test_instruments_do_not_conflate_with_each_other():
+    ticks = [make_tick("A", 0, 1.0), make_tick("B", 0, 2.0), make_tick("C", 0, 3.0)]
+    seen, _ = run_pipeline(ticks)
+    assert sorted(ltp for _, ltp in seen) == [1.0, 2.0, 3.0]
+
+
+def test_stale_shedding_never_crosses_a_bar_rollover():
+    ticks = [
+        make_tick("A", 0, 1.0),
+        make_tick("A", 0, 2.0),
+        make_tick("A", 60000, 3.0),
+    ]
+    # everything behind the held first tick goes stale
+    seen, pipeline = run_pipeline(ticks, max_age=0.03)
+
+    assert seen == [(0, 1.0), (0, 2.0)]
+    assert pipeline.stats()["stale_dropped"] == 1
@@ -0,0 +1,68 @@
+# tests/test_feed_decoder.py
+
+from google.protobuf import json_format
+from upstox_client.feeder.proto import MarketDataFeedV3_pb2 as pb
+
+from core.feed_decoder import decode_frame
+from core.feed_pipeline import normalize_full_feed
+
+BAR_TS = 1767336300000
+
+
+def full_feed(feed, ltp=101.5, bars=True, quotes=True, vol=1200):
+    data = feed.fullFeed.marketFF
+    if ltp is not None:
+        data.ltpc.ltp = ltp
+        data.ltpc.ltt = BAR_TS + 1500
+    if bars:
+        data.marketOHLC.ohlc.add(interval="1d", open=99.0, high=102.0, low=98.5, close=101.5, vol=90000, ts=BAR_TS - 3600000)
+        data.marketOHLC.ohlc.add(interval="I1", open=101.0, high=101.8, low=100.9, close=101.5, vol=vol, ts=BAR_TS)
+    if quotes:
+        data.marketLevel.bidAskQuote.add(bidQ=40, bidP=101.45, askQ=25, askP=101.55)
+
+
+def frame():
+    response = pb.FeedResponse(type=pb.Type.live_feed, currentTs=BAR_TS + 2000)
+
+    full_feed(response.feeds["NSE_EQ|FULL"])
+    full_feed(response.feeds["NSE_EQ|NO_QUOTES"], quotes=False)
+    full_feed(response.feeds["NSE_EQ|BAR_OPENED"], vol=0)
+    # incomplete feeds: both paths must drop them
+    full_feed(response.feeds["NSE_EQ|NO_LTPC"], ltp=None)
+    full_feed(response.feeds["NSE_EQ|ZERO_LTP"], ltp=0.0)
+    full_feed(response.feeds["NSE_EQ|NO_BARS"], bars=False)
+    response.feeds["NSE_EQ|LTPC_ONLY"].ltpc.ltp = 101.5
+    response.feeds["NSE_INDEX|NIFTY"].fullFeed.indexFF.ltpc.ltp = 24000.0
+
+    return response.SerializeToString()
+
+
+def dict_path(raw):
+    message = json_format.MessageToDict(pb.FeedResponse.FromString(raw))
+    ticks = []
+    for inst_key, feed_info in message.get("feeds", {}).items():
+        tick = normalize_full_feed(inst_key, feed_info)
+        if tick is not None:
+            ticks.append(tick)
+    return ticks
+
+
+def test_proto_and_dict_decode_agree():
+    raw = frame()
+    by_key = lambda t: t.inst_key
+
+    proto_ticks = sorted(decode_frame(raw), key=by_key)
+    assert proto_ticks == sorted(dict_path(raw), key=by_key)
+    assert [t.inst_key for t in proto_ticks] == ["NSE_EQ|BAR_OPENED", "NSE_EQ|FULL", "NSE_EQ|NO_QUOTES"]
+
+
+def test_one_minute_bar_and_top_of_book():
+    ticks = {t.inst_key: t for t in decode_frame(frame())}
+
+    tick = ticks["NSE_EQ|FULL"]
+    assert (tick.ltp, tick.open, tick.high, tick.low, tick.close, tick.volume, tick.bar_ts) == (
+        101.5, 101.0, 101.8, 100.9, 101.5, 1200.0, BAR_TS
+    )
+    assert (tick.bid, tick.bid_qty, tick.ask, tick.ask_qty) == (101.45, 40, 101.55, 25)
+    assert ticks["NSE_EQ|NO_QUOTES"].bid is None
+    assert ticks["NSE_EQ|BAR_OPENED"].volume == 0.0
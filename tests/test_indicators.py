@@ -0,0 +1,112 @@
+# tests/test_indicators.py
+
+import math
+
+import numpy as np
+import pytest
+
+from strategy.batch_indicators import batch_adx, batch_atr, batch_compression, batch_ema, batch_rsi
+from strategy.breakout_detector import breakout_direction, detect_compression
+from strategy.feature_cache import FeatureCache
+from strategy.market_regime import detect_market_regime
+from strategy.rolling_extrema import InstrumentRanges
+from strategy.indicators import exponential_moving_average, relative_strength_index
+from strategy.scanner import MarketScanner
+from strategy.streaming_indicators import verify_against_batch as verify_streaming
+from strategy.volatility_engine import compute_atr, compute_wilder_adx
+from strategy.volatility_engine import verify_against_batch as verify_volatility
+
+MAX_LEN = 120
+
+
+def random_bars(seed, n):
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.cumprod(1 + rng.normal(0, 0.004, n))
+    spread = np.abs(rng.normal(0, 0.002, n)) * closes
+    return (closes + spread).tolist(), (closes - spread).tolist(), closes.tolist()
+
+
+@pytest.fixture
+def universe():
+    """
+    Scanner with instruments of different history lengths (some shorter
+    than the indicator periods, one longer than the ring).
+    """
+    lengths = {"A": 200, "B": 60, "C": 29, "D": 14, "E": 3}
+    scanner = MarketScanner(max_len=MAX_LEN, universe=list(lengths))
+    for seed, (key, n) in enumerate(lengths.items()):
+        highs, lows, closes = random_bars(seed, n)
+        for h, l, c in zip(highs, lows, closes):
+            scanner.update(key, c, h, l, c, 1.0)
+    return scanner
+
+
+def assert_same(batch_value, scalar_value):
+    if scalar_value is None:
+        assert math.isnan(batch_value)
+    else:
+        assert batch_value == pytest.approx(scalar_value, rel=1e-9, abs=1e-9)
+
+
+def test_batch_matches_scalar_indicators(universe):
+    prices = universe.get_matrix_window("price")
+    highs = universe.get_matrix_window("high")
+    lows = universe.get_matrix_window("low")
+    closes = universe.get_matrix_window("close")
+
+    ema9, ema21 = batch_ema(prices, 9), batch_ema(prices, 21)
+    rsi, atr, adx = batch_rsi(prices), batch_atr(highs, lows, closes), batch_adx(highs, lows, closes)
+    compression = batch_compression(prices)
+
+    for row, key in enumerate(universe.instrument_keys):
+        p = universe.get_prices(key)
+        h, l, c = universe.get_highs(key), universe.get_lows(key), universe.get_closes(key)
+
+        assert_same(ema9[row], exponential_moving_average(p, 9))
+        assert_same(ema21[row], exponential_moving_average(p, 21))
+        assert_same(rsi[row], relative_strength_index(p))
+        assert_same(atr[row], compute_atr(h, l, c))
+        assert_same(adx[row], compute_wilder_adx(h, l, c))
+        assert bool(compression[row]) == bool(detect_compression(p))
+
+
+def test_compute_batch_indicators_rows_follow_the_universe(universe):
+    result = universe.compute_batch_indicators()
+    assert result["instruments"] == ["A", "B", "C", "D", "E"]
+    assert_same(result["adx14"][1], compute_wilder_adx(
+        universe.get_highs("B"), universe.get_lows("B"), universe.get_closes("B")))
+
+
+def test_streaming_ema_rsi_match_list_functions():
+    # history within max_len: the list functions see every bar too
+    _, _, closes = random_bars(7, 300)
+    deviations = verify_streaming(closes, max_len=600)
+    assert deviations
+    assert max(deviations.values()) < 1e-9
+
+
+def test_volatility_engine_matches_list_functions():
+    highs, lows, closes = random_bars(11, 150)
+    deviations = verify_volatility(highs, lows, closes)
+    assert max(deviations.values()) < 1e-9
+
+
+def test_range_features_wait_for_full_windows():
+    highs, lows, closes = random_bars(5, 45)
+    ranges = InstrumentRanges()
+
+    for n in range(1, len(closes) + 1):
+        ranges.update(closes[n - 1], highs[n - 1], lows[n - 1])
+        lists = FeatureCache.from_lists(prices=closes[:n], highs=highs[:n], lows=lows[:n], closes=closes[:n])
+        streaming = FeatureCache.from_lists(prices=closes[:n], highs=highs[:n], lows=lows[:n], closes=closes[:n])
+        streaming.ranges = ranges
+
+        for name, lookback in (("regime_ranges", 10), ("breakout_levels", 20)):
+            expected = lists.get(name, lookback)
+            assert streaming.get(name, lookback) == expected
+            # regime: 2 x 10 bars, breakout: 19 bars before the current one
+            assert (expected is not None) == (n >= 20)
+
+        # short history: no TypeError, just no signal
+        assert breakout_direction(streaming) in (None, "LONG", "SHORT")
+        assert detect_market_regime(adx_early=0, features=streaming) in ("TRENDING", "EARLY_TREND", "SIDEWAYS")
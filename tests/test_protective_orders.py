@@ -0,0 +1,129 @@
+# tests/test_protective_orders.py
+
+import time
+
+from execution.fake_order_api import FakeOrderApi
+from execution.order_executor import OrderExecutor
+from execution.protective_orders import ProtectiveOrderManager
+from execution.trade_monitor import TradeMonitor
+
+INST = "NSE_EQ|TEST"
+
+
+def make_manager(leg_poll=None):
+    """
+    Manager over a fake broker; broker exits close the trade in the
+    monitor and are recorded. leg_poll=None: legs are only checked by
+    reconcile().
+    """
+    api = FakeOrderApi()
+    executor = OrderExecutor(order_api=api)
+    monitor = TradeMonitor()
+    closed = []
+
+    def broker_exit(trade_id, reason, price):
+        if trade_id not in monitor.active_trades:
+            return False
+        monitor.remove_trade(trade_id)
+        closed.append((trade_id, reason, price))
+        return True
+
+    manager = ProtectiveOrderManager(executor, on_broker_exit=broker_exit, leg_poll=leg_poll)
+    return api, executor, monitor, manager, closed
+
+
+def open_trade(executor, monitor, manager, side="BUY"):
+    order = executor.place_limit_order(INST, side, 100.0, qty=10)
+    trade_id = order["order_id"]
+    trade = monitor.add_trade(trade_id, INST, side, 100.0, 10)
+    manager.on_entry(trade_id, trade)
+    assert manager.wait_idle(timeout=5)
+    assert set(manager.legs[trade_id]) == {"stop", "target"}
+    return trade_id, trade
+
+
+def last_order(api):
+    return list(api.orders.values())[-1]
+
+
+def test_leg_fired_off_feed_closes_the_trade_and_cancels_the_sibling():
+    api, executor, monitor, manager, closed = make_manager(leg_poll=0.01)
+    trade_id, trade = open_trade(executor, monitor, manager)
+
+    # the exchange prints through the target; our feed never sees it
+    price = trade.target + 0.5
+    assert len(api.check_triggers(INST, price)) == 1
+
+    deadline = time.monotonic() + 5
+    while not closed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert manager.wait_idle(timeout=5)
+
+    assert closed == [(trade_id, "TARGET", price)]
+    assert trade_id not in manager.legs
+    assert api.active_gtts(INST) == []
+    stats = manager.stats()
+    assert stats["broker_exits"] == 1
+    assert stats["exit_orders"] == 0
+    assert stats["errors"] == 0
+
+
+def test_both_legs_executed_reverses_the_excess():
+    api, executor, monitor, manager, closed = make_manager()
+    trade_id, trade = open_trade(executor, monitor, manager)
+
+    # stop and target both fire before we look: the sibling cancel fails
+    api.check_triggers(INST, trade.stop_loss - 0.5)
+    api.check_triggers(INST, trade.target + 0.5)
+    orders_before = len(api.orders)
+    manager.reconcile(trade_id, trade)
+    assert manager.wait_idle(timeout=5)
+
+    assert len(closed) == 1
+    assert trade_id not in manager.legs
+    # the position is short 10 after both SELL legs: buy it back
+    assert len(api.orders) == orders_before + 1
+    order = last_order(api)
+    assert order["transaction_type"] == "BUY"
+    assert order["quantity"] == 10
+    assert manager.stats()["errors"] >= 1
+
+
+def test_reconcile_after_restore_closes_a_trade_stopped_while_down():
+    api, executor, monitor, manager, closed = make_manager()
+    trade_id, trade = open_trade(executor, monitor, manager)
+    legs = dict(manager.legs[trade_id])
+
+    # crash; the stop fires while we are down
+    api.check_triggers(INST, trade.stop_loss - 0.2)
+
+    restored = TradeMonitor()
+    restored.restore_trade(trade_id, trade.to_state())
+    closed.clear()
+
+    def broker_exit(tid, reason, price):
+        restored.remove_trade(tid)
+        closed.append((tid, reason, price))
+        return True
+
+    manager = ProtectiveOrderManager(executor, on_broker_exit=broker_exit, leg_poll=None)
+    manager.legs[trade_id] = legs
+    manager.reconcile(trade_id, restored.active_trades[trade_id])
+    assert manager.wait_idle(timeout=5)
+
+    assert closed == [(trade_id, "STOP_LOSS", trade.stop_loss - 0.2)]
+    assert restored.active_trades == {}
+    assert api.active_gtts(INST) == []
+    assert manager.stats()["legs_cancelled"] == 1
+
+
+def test_reconcile_keeps_untouched_legs_resting():
+    api, executor, monitor, manager, closed = make_manager()
+    trade_id, trade = open_trade(executor, monitor, manager)
+
+    manager.reconcile(trade_id, trade)
+    assert manager.wait_idle(timeout=5)
+
+    assert closed == []
+    assert set(manager.legs[trade_id]) == {"stop", "target"}
+    assert len(api.active_gtts(INST)) == 2
@@ -0,0 +1,55 @@
+# tests/test_ring_buffer.py
+
+import numpy as np
+import pytest
+
+from strategy.ring_buffer import RingBuffer
+from strategy.scanner import MarketScanner
+
+
+def test_view_is_the_last_values_oldest_first_across_wraps():
+    ring = RingBuffer(4)
+    for value in range(1, 11):
+        ring.append(value)
+
+    assert len(ring) == 4
+    assert ring.view().tolist() == [7, 8, 9, 10]
+    assert ring.view(2).tolist() == [9, 10]
+    assert ring.last() == 10
+
+
+def test_view_is_read_only_and_does_not_copy():
+    ring = RingBuffer(3)
+    for value in (1, 2, 3, 4):
+        ring.append(value)
+
+    window = ring.view()
+    assert np.shares_memory(window, ring._buf)
+    with pytest.raises(ValueError):
+        window[0] = 0
+
+
+def test_short_history():
+    ring = RingBuffer(5)
+    assert ring.last() is None
+    ring.append(1.5)
+    assert ring.view(3).tolist() == [1.5]
+
+
+def test_shared_storage_must_be_twice_the_capacity():
+    with pytest.raises(ValueError):
+        RingBuffer(4, storage=np.zeros(4))
+
+
+def test_matrix_window_matches_per_instrument_rings():
+    keys = ["A", "B", "C"]
+    scanner = MarketScanner(max_len=8, universe=keys)
+    for i in range(13):
+        scanner.update("A", i, i, i, i, i)
+        if i % 2:
+            scanner.update("B", -i, -i, -i, -i, -i)
+
+    window = scanner.get_matrix_window("price", 5)
+    assert window[0].tolist() == scanner.get_window("A", "price", 5).tolist()
+    assert window[1].tolist() == scanner.get_window("B", "price", 5).tolist()
+    assert np.isnan(window[2]).all()
@@ -0,0 +1,87 @@
+# tests/test_state_journal.py
+
+import os
+
+from execution.state_journal import SNAPSHOT_FILE, StateJournal
+
+DAY = "2026-01-02"
+
+
+def journal(tmp_path):
+    return StateJournal(str(tmp_path), fsync_interval=0, day=DAY)
+
+
+def segment_paths(j):
+    return [os.path.join(j.path, name) for name in j._segments()]
+
+
+def test_records_come_back_in_order(tmp_path):
+    j = journal(tmp_path)
+    for i in range(3):
+        j.append("signal", day=DAY, inst_key=f"K{i}")
+    j.close(checkpoint=False)
+
+    snapshot, records = journal(tmp_path).recover()
+    assert snapshot is None
+    assert [r["seq"] for r in records] == [1, 2, 3]
+    assert [r["inst_key"] for r in records] == ["K0", "K1", "K2"]
+
+
+def test_torn_write_is_truncated_and_the_log_continues(tmp_path):
+    j = journal(tmp_path)
+    j.append("signal", day=DAY, inst_key="A")
+    j.append("signal", day=DAY, inst_key="B")
+    j.close(checkpoint=False)
+
+    # crash in the middle of the third record
+    path = segment_paths(j)[-1]
+    size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b'{"seq":3,"kind":"sig')
+
+    j = journal(tmp_path)
+    _, records = j.recover()
+    assert [r["inst_key"] for r in records] == ["A", "B"]
+    assert os.path.getsize(path) == size
+
+    j.append("halt")
+    j.close(checkpoint=False)
+    _, records = journal(tmp_path).recover()
+    assert [r["seq"] for r in records] == [1, 2, 3]
+    assert records[-1]["kind"] == "halt"
+
+
+def test_snapshot_covers_earlier_segments(tmp_path):
+    j = journal(tmp_path)
+    j.append("signal", day=DAY, inst_key="A")
+    seq, captured = j.rotate(lambda: {"signals": ["A"]})
+    j.write_snapshot(seq, captured)
+    j.append("signal", day=DAY, inst_key="B")
+    j.close(checkpoint=False)
+
+    snapshot, records = journal(tmp_path).recover()
+    assert snapshot["trading"] == {"signals": ["A"]}
+    assert [r["inst_key"] for r in records] == ["B"]
+    assert len(segment_paths(j)) == 1
+
+
+def test_unreadable_snapshot_never_reuses_seq_numbers(tmp_path):
+    j = journal(tmp_path)
+    for key in "AB":
+        j.append("signal", day=DAY, inst_key=key)
+    seq, captured = j.rotate(lambda: {})
+    j.write_snapshot(seq, captured)
+    j.append("signal", day=DAY, inst_key="C")
+    j.close(checkpoint=False)
+
+    with open(os.path.join(j.path, SNAPSHOT_FILE), "wb") as f:
+        f.write(b"not a pickle")
+
+    j = journal(tmp_path)
+    assert j.recover() == (None, [])
+    j.append("signal", day=DAY, inst_key="D")
+    j.close(checkpoint=False)
+
+    _, records = journal(tmp_path).recover()
+    assert [(r["seq"], r["inst_key"]) for r in records] == [(4, "D")]
+    assert any(name.startswith("unrecovered-") for name in os.listdir(j.path))
@@ -0,0 +1,98 @@
+# tests/test_trade_monitor.py
+
+import random
+
+from execution.execution_config import BREAKEVEN_MOVE_PCT, STOP_LOSS_PCT, TARGET_PCT
+from execution.trade_monitor import ABOVE, BELOW, TradeMonitor, TriggerIndex
+
+
+def test_crossed_returns_only_trades_past_their_level():
+    index = TriggerIndex()
+    index.add("A", ABOVE, 105.0, "t1", "TARGET")
+    index.add("A", ABOVE, 110.0, "t2", "TARGET")
+    index.add("A", BELOW, 95.0, "t1", "STOP_LOSS")
+    index.add("A", BELOW, 90.0, "t2", "STOP_LOSS")
+
+    assert index.crossed("A", 100.0) == set()
+    assert index.crossed("A", 105.0) == {"t1"}
+    assert index.crossed("A", 111.0) == {"t1", "t2"}
+    assert index.crossed("A", 92.0) == {"t1"}
+    assert index.crossed("B", 1.0) == set()
+
+    index.remove("A", ABOVE, 105.0, "t1", "TARGET")
+    assert index.crossed("A", 106.0) == set()
+    assert len(index) == 3
+
+
+def test_stop_loss_and_target():
+    monitor = TradeMonitor()
+    monitor.add_trade("buy", "A", "BUY", 100.0, 1)
+    monitor.add_trade("sell", "B", "SELL", 100.0, 1)
+
+    assert monitor.check_trades({"A": 100.1, "B": 99.9}) == []
+
+    stop = 100.0 * (1 - STOP_LOSS_PCT)
+    assert monitor.check_trades({"A": stop}) == [("buy", "STOP_LOSS", stop)]
+
+    target = 100.0 * (1 - TARGET_PCT)
+    assert monitor.check_trades({"B": target}) == [("sell", "TARGET", target)]
+
+    # closed trades do not fire again
+    assert monitor.check_trades({"A": stop, "B": target}) == []
+
+
+def test_breakeven_moves_the_stop_before_any_later_exit():
+    moved = []
+    monitor = TradeMonitor(on_stop_moved=lambda trade_id, trade: moved.append((trade_id, trade.stop_loss)))
+    monitor.add_trade("t", "A", "BUY", 100.0, 1)
+
+    assert monitor.check_trades({"A": 100.0 * (1 + BREAKEVEN_MOVE_PCT)}) == []
+    assert moved == [("t", 100.0)]
+
+    # the old stop level is no longer indexed; the entry price is
+    assert monitor.check_trades({"A": 100.0 * (1 - STOP_LOSS_PCT / 2)}) != []
+
+
+def full_scan(trades, inst_key, ltp):
+    """
+    Reference: every open trade on the instrument, rules in order.
+    """
+    exits = []
+    for trade_id, t in trades.items():
+        if t["closed"] or t["inst"] != inst_key:
+            continue
+        buy = t["side"] == "BUY"
+        if (ltp <= t["stop"]) if buy else (ltp >= t["stop"]):
+            exits.append((trade_id, "STOP_LOSS", ltp))
+        elif (ltp >= t["target"]) if buy else (ltp <= t["target"]):
+            exits.append((trade_id, "TARGET", ltp))
+        else:
+            if not t["moved"] and ((ltp >= t["breakeven"]) if buy else (ltp <= t["breakeven"])):
+                t["stop"], t["moved"] = t["entry"], True
+            continue
+        t["closed"] = True
+    return exits
+
+
+def test_index_gives_the_same_exits_as_a_full_scan():
+    rng = random.Random(5)
+    monitor = TradeMonitor()
+    reference = {}
+    prices = {k: 100.0 for k in "ABC"}
+
+    for step in range(20000):
+        key = rng.choice("ABC")
+        prices[key] *= 1 + rng.gauss(0, 0.002)
+        ltp = prices[key]
+
+        if rng.random() < 0.02:
+            trade_id = f"t{step}"
+            side = rng.choice(("BUY", "SELL"))
+            trade = monitor.add_trade(trade_id, key, side, ltp, 1)
+            reference[trade_id] = {
+                "inst": key, "side": side, "entry": ltp, "stop": trade.stop_loss,
+                "target": trade.target, "breakeven": trade.breakeven_level,
+                "moved": False, "closed": False,
+            }
+
+        assert sorted(monitor.check_trades({key: ltp})) == sorted(full_scan(reference, key, ltp))
@@ -0,0 +1,195 @@
+# utils/measure_records.py
+
+"""
+Memory / allocation footprint of the pipeline records for one full
+NIFTY500 session, old representation vs new.
+
+    bars     480 instruments x 375 one-minute bars, kept all day
+    ticks    per-tick cost; a session is ~1 update / instrument / second
+             (SDK message dicts, then containers over the same values)
+    trades   TrackedTrade with and without __slots__
+    decode   allocations while decoding feed frames (dict vs protobuf)
+
+Usage:
+    python -m utils.measure_records
+"""
+
+import datetime
+import json
+import random
+import tracemalloc
+
+from google.protobuf import json_format
+
+from core.feed_decoder import decode_frame, pb
+from core.feed_pipeline import normalize_full_feed
+from core.mock_feed_server import SyntheticMarket
+from core.records import BarRecord, TickRecord, BAR_DTYPE, TICK_DTYPE, to_array
+from execution.trade_monitor import TrackedTrade
+
+INSTRUMENTS = 480
+BARS_PER_DAY = 375
+SESSION_SECONDS = BARS_PER_DAY * 60
+TICK_SAMPLE = 100000
+
+
+def measure(build):
+    """
+    Returns:
+        (bytes still allocated, blocks still allocated, result)
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    size = sum(s.size_diff for s in stats)
+    blocks = sum(s.count_diff for s in stats)
+    return size, blocks, result
+
+
+def measure_peak(run):
+    """
+    Returns:
+        peak traced bytes over the run
+    """
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def mb(n):
+    return round(n / 1e6, 2)
+
+
+class UnslottedTrade:
+    """
+    TrackedTrade's fields in a plain class (the pre-__slots__ layout).
+    """
+
+    def __init__(self, inst_key, side, entry_price, qty):
+        self.inst_key = inst_key
+        self.side = side
+        self.entry_price = entry_price
+        self.qty = qty
+        self.stop_loss = trade_level(entry_price, side, -0.0045)
+        self.target = trade_level(entry_price, side, 0.012)
+        self.breakeven_level = trade_level(entry_price, side, 0.005)
+        self.breakeven_moved = False
+        self.partial_exit_done = False
+        self.is_closed = False
+        self.open_time = datetime.datetime.now()
+        self.open_ns = 0
+
+
+def trade_level(entry_price, side, pct):
+    return entry_price * (1 + pct) if side == "BUY" else entry_price * (1 - pct)
+
+
+def bar_rows(keys):
+    rng = random.Random(1)
+    rows = []
+    for key in keys:
+        price = rng.uniform(50, 5000)
+        for i in range(BARS_PER_DAY):
+            price *= 1 + rng.gauss(0, 0.001)
+            rows.append((key, 1700000000000 + i * 60000, price, price * 1.001, price * 0.999, price, float(rng.randint(1, 10000))))
+    return rows
+
+
+def main():
+    with open("data/nifty500_keys.json", "r") as f:
+        keys = json.load(f)[:INSTRUMENTS]
+
+    report = {}
+
+    # ---------------- bars ----------------
+    rows = bar_rows(keys)
+    n_bars = len(rows)
+
+    size, blocks, _ = measure(lambda: [r[1:] for r in rows])
+    report["bars_tuple"] = (mb(size), blocks)
+
+    size, blocks, bars = measure(lambda: [BarRecord(*r) for r in rows])
+    report["bars_slotted"] = (mb(size), blocks)
+
+    size, blocks, _ = measure(lambda: to_array(bars, BAR_DTYPE))
+    report["bars_structured"] = (mb(size), blocks)
+
+    # ---------------- ticks ----------------
+    market = SyntheticMarket(keys, depth_levels=5, seed=3)
+    frames = [market.frame(keys[i % 24 * 20:i % 24 * 20 + 20]) for i in range(TICK_SAMPLE // 20)]
+    messages = [json_format.MessageToDict(pb.FeedResponse.FromString(raw)) for raw in frames]
+    feeds = [(k, v) for m in messages for k, v in m["feeds"].items()]
+
+    size, blocks, _ = measure(lambda: [json_format.MessageToDict(pb.FeedResponse.FromString(raw)) for raw in frames])
+    report["ticks_sdk_dict"] = (mb(size), blocks)
+
+    # containers over the same (already parsed) field values
+    ticks = [normalize_full_feed(k, v) for k, v in feeds]
+    fields = TickRecord.__slots__
+    values = [tuple(getattr(t, f) for f in fields) for t in ticks]
+
+    size, blocks, _ = measure(lambda: [dict(zip(fields, v)) for v in values])
+    report["ticks_dict"] = (mb(size), blocks)
+
+    size, blocks, _ = measure(lambda: [tuple([*v]) for v in values])
+    report["ticks_tuple"] = (mb(size), blocks)
+
+    size, blocks, _ = measure(lambda: [TickRecord(*v) for v in values])
+    report["ticks_slotted"] = (mb(size), blocks)
+
+    size, blocks, _ = measure(lambda: to_array(ticks, TICK_DTYPE))
+    report["ticks_structured"] = (mb(size), blocks)
+
+    # ---------------- trades ----------------
+    size, blocks, _ = measure(lambda: [UnslottedTrade(k, "BUY", 100.0, 10) for k in keys * 2])
+    report["trades_dict"] = (size, blocks)
+
+    size, blocks, _ = measure(lambda: [TrackedTrade(k, "BUY", 100.0, 10) for k in keys * 2])
+    report["trades_slotted"] = (size, blocks)
+
+    # ---------------- decode churn ----------------
+    def dict_decode():
+        for raw in frames[:1000]:
+            message = json_format.MessageToDict(pb.FeedResponse.FromString(raw))
+            for k, v in message["feeds"].items():
+                normalize_full_feed(k, v)
+
+    def proto_decode():
+        for raw in frames[:1000]:
+            decode_frame(raw)
+
+    report["decode_peak_dict"] = measure_peak(dict_decode)
+    report["decode_peak_proto"] = measure_peak(proto_decode)
+
+    # ---------------- print ----------------
+    session_ticks = INSTRUMENTS * SESSION_SECONDS
+    print(f"[Records] bars: {n_bars} ({INSTRUMENTS} x {BARS_PER_DAY}), MB / blocks")
+    for name in ("bars_tuple", "bars_slotted", "bars_structured"):
+        print(f"  {name:18s} {report[name][0]:8.2f} MB  {report[name][1]:>9} blocks")
+
+    print(f"[Records] ticks: sample {len(ticks)}, per tick, and extrapolated to {session_ticks:,} ticks / session")
+    for name in ("ticks_sdk_dict", "ticks_dict", "ticks_tuple", "ticks_slotted", "ticks_structured"):
+        size_mb, blocks = report[name]
+        per_tick = size_mb * 1e6 / len(ticks)
+        print(f"  {name:18s} {per_tick:8.1f} B/tick  {blocks / len(ticks):6.2f} blocks/tick  "
+              f"{per_tick * session_ticks / 1e9:8.2f} GB / session allocated")
+
+    print(f"[Records] trades: {len(keys) * 2} TrackedTrade")
+    for name in ("trades_dict", "trades_slotted"):
+        size, blocks = report[name]
+        print(f"  {name:18s} {size / (len(keys) * 2):8.1f} B/trade  {blocks:>9} blocks")
+
+    print("[Records] decode 1000 frames (20 instruments each), peak traced memory")
+    print(f"  dict path          {mb(report['decode_peak_dict']):8.2f} MB")
+    print(f"  protobuf path      {mb(report['decode_peak_proto']):8.2f} MB")
+
+
+if __name__ == "__main__":
+    main()